@@ -1,30 +1,64 @@
-from typing import Any
+from typing import Any, List, Type
 
+from django import forms
+from django.db.models import Count, Exists, OuterRef, QuerySet
 from django_filters.rest_framework import FilterSet, filters
 
-from recipes.models import Recipe, Tag
+from core.constants import INGREDIENT_FILTER_ID_LIMIT
+from core.models import UserRecipeModel
+from recipes.index import get_recipe_ingredient_index
+from recipes.models import (
+    Favorite,
+    Purchase,
+    Recipe,
+    RecipeIngredient,
+    RecipeTag,
+)
+from recipes.registry import get_registry, get_tag_choices
 from users.models import User
 
 
+class IntegerFilter(filters.NumberFilter):
+    """Фильтр по целому числу."""
+
+    field_class = forms.IntegerField
+
+
+class IntegerInFilter(filters.BaseInFilter, IntegerFilter):
+    """Фильтр по списку целых чисел, перечисленных через запятую."""
+
+
 class RecipeFilterSet(FilterSet):
     """Фильтр для моделей рецептов."""
 
-    tags = filters.ModelMultipleChoiceFilter(
-        queryset=Tag.objects.all(),
-        to_field_name='slug',
-        field_name='tags__slug',
-    )
-    is_favorited = filters.BooleanFilter(
-        field_name='is_favorited',
+    tags = filters.MultipleChoiceFilter(
+        choices=get_tag_choices,
+        method='filter_tags',
     )
+    is_favorited = filters.BooleanFilter(method='filter_is_favorited')
     is_in_shopping_cart = filters.BooleanFilter(
-        field_name='is_in_shopping_cart',
+        method='filter_is_in_shopping_cart',
     )
     author = filters.ModelChoiceFilter(queryset=User.objects.all())
+    ingredients = IntegerInFilter(method='filter_ingredients')
+    pantry = IntegerInFilter(method='filter_pantry')
+    max_missing = IntegerFilter(method='filter_max_missing', min_value=0)
+    exclude_ingredients = IntegerInFilter(
+        method='filter_exclude_ingredients',
+    )
 
     class Meta:
         model = Recipe
-        fields = ('tags', 'author', 'is_favorited', 'is_in_shopping_cart')
+        fields = (
+            'tags',
+            'author',
+            'is_favorited',
+            'is_in_shopping_cart',
+            'ingredients',
+            'pantry',
+            'max_missing',
+            'exclude_ingredients',
+        )
 
     def __init__(self, *args: Any, **kwargs: Any) -> None:
         data = kwargs['data']
@@ -35,3 +69,234 @@ class RecipeFilterSet(FilterSet):
             data['author'] = kwargs['request'].user.id
             data._mutable = _mutable
         super(RecipeFilterSet, self).__init__(*args, **kwargs)
+
+    def filter_tags(
+        self,
+        queryset: QuerySet,
+        name: str,
+        value: List[str],
+    ) -> QuerySet:
+        """Фильтрация рецептов, у которых есть хотя бы один из тегов.
+
+        Слаги переводятся в id без запроса к базе данных, а рецепты
+        выбираются полусоединением с RecipeTag, поэтому рецепт с
+        несколькими подходящими тегами не повторяется в выдаче.
+
+        Args:
+            queryset: Фильтруемые рецепты.
+            name: Название параметра фильтрации.
+            value: Слаги тегов.
+
+        Returns:
+            Рецепты с переданными тегами.
+        """
+        return queryset.filter(
+            id__in=RecipeTag.objects.filter(
+                tag_id__in=get_registry().tags.get_ids(value),
+            ).values('recipe_id'),
+        )
+
+    def filter_user_recipes(
+        self,
+        queryset: QuerySet,
+        model: Type[UserRecipeModel],
+        value: bool,
+    ) -> QuerySet:
+        """Фильтрация рецептов по наличию связи с текущим пользователем.
+
+        Наличие связи проверяется соединением с таблицей связей по id
+        пользователя, поэтому выборка начинается с немногих связей
+        пользователя, а не со всех рецептов. Отсутствие связи проверяется
+        коррелированным NOT EXISTS по тому же индексу.
+
+        Args:
+            queryset: Фильтруемые рецепты.
+            model: Модель связи пользователя и рецепта.
+            value: Значение параметра фильтрации.
+
+        Returns:
+            Рецепты, отфильтрованные по наличию связи.
+        """
+        user = self.request.user
+        if not user.is_authenticated:
+            return queryset.none() if value else queryset
+        if value:
+            return queryset.filter(
+                **{f'{model._meta.default_related_name}__user': user},
+            )
+        return queryset.filter(
+            ~Exists(model.objects.filter(user=user, recipe=OuterRef('pk'))),
+        )
+
+    def filter_is_favorited(
+        self,
+        queryset: QuerySet,
+        name: str,
+        value: bool,
+    ) -> QuerySet:
+        """Фильтрация рецептов по наличию в избранном.
+
+        Args:
+            queryset: Фильтруемые рецепты.
+            name: Название параметра фильтрации.
+            value: Значение параметра фильтрации.
+
+        Returns:
+            Рецепты, отфильтрованные по наличию в избранном.
+        """
+        return self.filter_user_recipes(queryset, Favorite, value)
+
+    def filter_is_in_shopping_cart(
+        self,
+        queryset: QuerySet,
+        name: str,
+        value: bool,
+    ) -> QuerySet:
+        """Фильтрация рецептов по наличию в списке покупок.
+
+        Args:
+            queryset: Фильтруемые рецепты.
+            name: Название параметра фильтрации.
+            value: Значение параметра фильтрации.
+
+        Returns:
+            Рецепты, отфильтрованные по наличию в списке покупок.
+        """
+        return self.filter_user_recipes(queryset, Purchase, value)
+
+    def filter_recipe_ids(
+        self,
+        queryset: QuerySet,
+        recipe_ids: List[int],
+        subquery: QuerySet,
+        exclude: bool = False,
+    ) -> QuerySet:
+        """Фильтрация рецептов по id, найденным в индексе ингредиентов.
+
+        Небольшой список id передается в запрос как есть. Если найденных
+        рецептов больше INGREDIENT_FILTER_ID_LIMIT, вместо списка
+        используется равносильный подзапрос к RecipeIngredient, чтобы не
+        передавать в базу данных огромный IN.
+
+        Args:
+            queryset: Фильтруемые рецепты.
+            recipe_ids: id рецептов, найденных в индексе.
+            subquery: Подзапрос, возвращающий те же id рецептов.
+            exclude: Исключить найденные рецепты вместо их выбора.
+
+        Returns:
+            Отфильтрованные рецепты.
+        """
+        if len(recipe_ids) > INGREDIENT_FILTER_ID_LIMIT:
+            recipe_ids = subquery
+        if exclude:
+            return queryset.exclude(id__in=recipe_ids)
+        return queryset.filter(id__in=recipe_ids)
+
+    def filter_ingredients(
+        self,
+        queryset: QuerySet,
+        name: str,
+        value: List[int],
+    ) -> QuerySet:
+        """Фильтрация рецептов, содержащих все ингредиенты.
+
+        Args:
+            queryset: Фильтруемые рецепты.
+            name: Название параметра фильтрации.
+            value: id ингредиентов.
+
+        Returns:
+            Рецепты, в которых есть все переданные ингредиенты.
+        """
+        ingredient_ids = set(value)
+        return self.filter_recipe_ids(
+            queryset,
+            get_recipe_ingredient_index().with_all(ingredient_ids),
+            RecipeIngredient.objects.filter(ingredient_id__in=ingredient_ids)
+            .values('recipe_id')
+            .annotate(matched=Count('id'))
+            .filter(matched=len(ingredient_ids))
+            .values('recipe_id')
+            .order_by(),
+        )
+
+    def filter_pantry(
+        self,
+        queryset: QuerySet,
+        name: str,
+        value: List[int],
+    ) -> QuerySet:
+        """Фильтрация рецептов, которые можно приготовить из имеющегося.
+
+        Количество недостающих ингредиентов ограничивается параметром
+        max_missing, по умолчанию недостающих ингредиентов быть не должно.
+        Для большой выдачи исключаются рецепты, в которых недостающих
+        ингредиентов больше max_missing.
+
+        Args:
+            queryset: Фильтруемые рецепты.
+            name: Название параметра фильтрации.
+            value: id имеющихся ингредиентов.
+
+        Returns:
+            Рецепты, для которых не хватает не больше max_missing
+            ингредиентов.
+        """
+        max_missing = self.form.cleaned_data.get('max_missing') or 0
+        recipe_ids = get_recipe_ingredient_index().cookable(value, max_missing)
+        if len(recipe_ids) <= INGREDIENT_FILTER_ID_LIMIT:
+            return queryset.filter(id__in=recipe_ids)
+        return queryset.filter(
+            id__in=RecipeIngredient.objects.values('recipe_id'),
+        ).exclude(
+            id__in=RecipeIngredient.objects.exclude(ingredient_id__in=value)
+            .values('recipe_id')
+            .annotate(missing=Count('id'))
+            .filter(missing__gt=max_missing)
+            .values('recipe_id')
+            .order_by(),
+        )
+
+    def filter_max_missing(
+        self,
+        queryset: QuerySet,
+        name: str,
+        value: int,
+    ) -> QuerySet:
+        """Параметр max_missing применяется вместе с параметром pantry.
+
+        Args:
+            queryset: Фильтруемые рецепты.
+            name: Название параметра фильтрации.
+            value: Допустимое количество недостающих ингредиентов.
+
+        Returns:
+            Рецепты без изменений.
+        """
+        return queryset
+
+    def filter_exclude_ingredients(
+        self,
+        queryset: QuerySet,
+        name: str,
+        value: List[int],
+    ) -> QuerySet:
+        """Исключение рецептов с ингредиентами, например аллергенами.
+
+        Args:
+            queryset: Фильтруемые рецепты.
+            name: Название параметра фильтрации.
+            value: id исключаемых ингредиентов.
+
+        Returns:
+            Рецепты без переданных ингредиентов.
+        """
+        return self.filter_recipe_ids(
+            queryset,
+            get_recipe_ingredient_index().with_any(value),
+            RecipeIngredient.objects.filter(
+                ingredient_id__in=value,
+            ).values('recipe_id'),
+            exclude=True,
+        )
@@ -1,26 +1,59 @@
-from collections import OrderedDict
-from typing import Any, Dict, List, Optional, Union
+from collections import Counter, OrderedDict
+from operator import itemgetter
+from typing import Any, Dict, Iterable, List, Optional, Tuple, Type, Union
 
 from django.core.exceptions import ValidationError
-from drf_extra_fields.fields import Base64ImageField
+from django.db import transaction
+from django.db.models import (
+    Manager,
+    Model,
+    Prefetch,
+    prefetch_related_objects,
+)
 from rest_framework import exceptions, serializers
+from rest_framework.request import Request
 
 from core.constants import (
     MAX_POSITIVE_INTEGER_VALUE,
     MIN_POSITIVE_INTEGER_VALUE,
 )
+from core.fields import StreamingImageField
 from core.types import ComplexSerializerData
+from core.viewer import get_viewer_context
+from recipes.cart import change_recipe_in_carts
+from recipes.images import IMAGE_VARIANT_FIELDS, schedule_image_processing
+from recipes.index import recipe_ingredients_changed
 from recipes.models import (
+    CartIngredient,
     Favorite,
     Ingredient,
     Purchase,
     Recipe,
     RecipeIngredient,
+    RecipeTag,
     Tag,
 )
+from recipes.previews import load_recipe_previews
+from recipes.registry import IngredientIndex, get_registry
+from recipes.similarity import index_recipe
 from users.models import Following, User
 
 
+def get_recipe_prefetches() -> List[Union[str, Prefetch]]:
+    """Функция для получения связей, загружаемых вместе с рецептами.
+
+    Returns:
+        Список связей для prefetch_related.
+    """
+    return [
+        'tags',
+        Prefetch(
+            'recipe_ingredient',
+            queryset=RecipeIngredient.objects.order_by(),
+        ),
+    ]
+
+
 class FavoriteSerializer(serializers.ModelSerializer):
     """Сериализатор для модели избранного."""
 
@@ -114,14 +147,39 @@ class UserSerializer(serializers.ModelSerializer):
         Returns:
             Наличие подписки текущего пользователя на данного.
         """
-        return self.context['request'].user in obj.followers.all()
+        return get_viewer_context(self.context['request']).is_subscribed(
+            obj.id,
+        )
+
+
+def get_recipes_limit(request: Request) -> Optional[int]:
+    """Функция для получения ограничения количества рецептов автора.
+
+    Args:
+        request: Передаваемый запрос.
+
+    Raises:
+        ParseError: Параметр recipes_limit не является целым числом.
+
+    Returns:
+        Значение параметра recipes_limit или None, если он не передан.
+    """
+    recipes_limit = request.query_params.get('recipes_limit')
+    if not recipes_limit:
+        return None
+    try:
+        return int(recipes_limit)
+    except ValueError:
+        raise exceptions.ParseError(
+            'recipes_limit должен быть целым числом',
+        )
 
 
 class FollowingSerializer(UserSerializer):
     """Сериализатор для отображения подписки."""
 
     recipes = serializers.SerializerMethodField('paginated_recipes')
-    recipes_count = serializers.IntegerField(source='recipes.count')
+    recipes_count = serializers.IntegerField(read_only=True)
 
     class Meta:
         model = User
@@ -139,27 +197,26 @@ class FollowingSerializer(UserSerializer):
     def paginated_recipes(self, obj: User) -> List[Dict[str, Union[str, int]]]:
         """Формирование списка рецептов пользователя.
 
+        Рецепты берутся из контекста, если они загружены для всей
+        страницы подписок, иначе загружаются для одного пользователя.
+
         Args:
             obj: Модель пользователя.
 
         Returns:
             Список рецептов пользователя.
         """
-        recipes_limit = self.context['request'].query_params.get(
-            'recipes_limit',
-        )
-        if recipes_limit:
-            try:
-                recipes_limit = int(recipes_limit)
-            except ValueError:
-                raise exceptions.ParseError(
-                    'recipes_limit должен быть целым числом',
-                )
-            return RecipeNestedSerializer(
-                obj.recipes.order_by('id')[: int(recipes_limit)],
-                many=True,
-            ).data
-        return RecipeNestedSerializer(obj.recipes.all(), many=True).data
+        previews = self.context.get('recipe_previews')
+        if previews is None:
+            previews = load_recipe_previews(
+                [obj.id],
+                get_recipes_limit(self.context['request']),
+            )
+        return RecipeNestedSerializer(
+            previews.get(obj.id, []),
+            many=True,
+            context=self.context,
+        ).data
 
 
 class IngredientSerializer(serializers.ModelSerializer):
@@ -174,6 +231,35 @@ class IngredientSerializer(serializers.ModelSerializer):
         )
 
 
+class IngredientListSerializer(serializers.ListSerializer):
+    """Сериализатор списка ингредиентов, упорядоченного по названию."""
+
+    def to_representation(
+        self,
+        data: Iterable[RecipeIngredient],
+    ) -> List[Dict[str, Any]]:
+        """Функция для представления списка ингредиентов.
+
+        Справочник ингредиентов запрашивается один раз на весь ответ и
+        сохраняется в общем контексте сериализаторов.
+
+        Args:
+            data: Связи с ингредиентами.
+
+        Returns:
+            Список ингредиентов с количеством, упорядоченный по названию.
+        """
+        index = self.context.get('ingredient_index')
+        if index is None:
+            index = get_registry().ingredients
+            self.context['ingredient_index'] = index
+        items = data.all() if isinstance(data, Manager) else data
+        return sorted(
+            (self.child.represent(item, index) for item in items),
+            key=itemgetter('name'),
+        )
+
+
 class IngredientNestedSerializer(serializers.ModelSerializer):
     """Сериализатор для отображения модели ингредиента."""
 
@@ -195,16 +281,53 @@ class IngredientNestedSerializer(serializers.ModelSerializer):
             'measurement_unit',
             'amount',
         )
+        list_serializer_class = IngredientListSerializer
+
+    @staticmethod
+    def represent(
+        instance: RecipeIngredient,
+        index: IngredientIndex,
+    ) -> Dict[str, Any]:
+        """Функция для представления ингредиента по справочнику процесса.
+
+        Ингредиент, которого еще нет в справочнике, запрашивается из базы
+        данных.
+
+        Args:
+            instance: Связь с ингредиентом.
+            index: Справочник ингредиентов.
+
+        Returns:
+            Ингредиент с количеством.
+        """
+        ingredient = index.by_id.get(instance.ingredient_id)
+        if ingredient is None:
+            ingredient = IngredientSerializer(instance.ingredient).data
+        return {**ingredient, 'amount': instance.amount}
+
+    def to_representation(self, instance: RecipeIngredient) -> Dict[str, Any]:
+        """Функция для представления ингредиента.
+
+        Args:
+            instance: Связь с ингредиентом.
+
+        Returns:
+            Ингредиент с количеством.
+        """
+        return self.represent(instance, get_registry().ingredients)
+
+
+class CartIngredientSerializer(IngredientNestedSerializer):
+    """Сериализатор для отображения ингредиента списка покупок."""
+
+    class Meta(IngredientNestedSerializer.Meta):
+        model = CartIngredient
 
 
 class IngredientWriteSerializer(serializers.ModelSerializer):
     """Класс для создания связи ингредиента и рецепта."""
 
-    id = serializers.PrimaryKeyRelatedField(
-        source='ingredient.id',
-        read_only=False,
-        queryset=Ingredient.objects.all(),
-    )
+    id = serializers.IntegerField(min_value=MIN_POSITIVE_INTEGER_VALUE)
     amount = serializers.IntegerField(
         min_value=MIN_POSITIVE_INTEGER_VALUE,
         max_value=MAX_POSITIVE_INTEGER_VALUE,
@@ -231,16 +354,69 @@ class TagSerializer(serializers.ModelSerializer):
         )
 
 
+class ImageVariantField(serializers.Field):
+    """Поле для ссылки на уменьшенную копию картинки рецепта.
+
+    Пока копия не создана, возвращается ссылка на исходную картинку.
+    """
+
+    def __init__(self, variant: Optional[str] = None, **kwargs: Any) -> None:
+        self.variant = variant
+        kwargs['source'] = '*'
+        kwargs['read_only'] = True
+        super().__init__(**kwargs)
+
+    def get_url(self, recipe: Recipe, variant: str) -> Optional[str]:
+        """Функция для получения ссылки на копию картинки.
+
+        Args:
+            recipe: Модель рецепта.
+            variant: Название копии.
+
+        Returns:
+            Абсолютную ссылку на копию или исходную картинку.
+        """
+        image = getattr(recipe, IMAGE_VARIANT_FIELDS[variant]) or recipe.image
+        if not image:
+            return None
+        request = self.context.get('request')
+        if request is None:
+            return image.url
+        return request.build_absolute_uri(image.url)
+
+    def to_representation(
+        self,
+        recipe: Recipe,
+    ) -> Union[Optional[str], Dict[str, Optional[str]]]:
+        """Формирование ссылок на копии картинки.
+
+        Args:
+            recipe: Модель рецепта.
+
+        Returns:
+            Ссылку на заданную копию или, если копия не задана, словарь
+            ссылок на все копии.
+        """
+        if self.variant is not None:
+            return self.get_url(recipe, self.variant)
+        return {
+            variant: self.get_url(recipe, variant)
+            for variant in IMAGE_VARIANT_FIELDS
+        }
+
+
 class RecipeNestedSerializer(serializers.ModelSerializer):
     """Сериализатор для модели рецепта."""
 
-    image = Base64ImageField(required=False, allow_null=True)
+    image = ImageVariantField('card')
+    images = ImageVariantField()
 
     class Meta:
         fields = (
             'id',
             'name',
             'image',
+            'images',
             'cooking_time',
         )
         model = Recipe
@@ -250,9 +426,10 @@ class RecipeReadSerializer(serializers.ModelSerializer):
     """Сериализатор для модели рецепта."""
 
     author = UserSerializer(read_only=True)
-    image = Base64ImageField(required=False, allow_null=True)
-    is_in_shopping_cart = serializers.BooleanField(read_only=True)
-    is_favorited = serializers.BooleanField(read_only=True)
+    image = ImageVariantField('full')
+    images = ImageVariantField()
+    is_in_shopping_cart = serializers.SerializerMethodField()
+    is_favorited = serializers.SerializerMethodField()
     ingredients = IngredientNestedSerializer(
         source='recipe_ingredient',
         many=True,
@@ -269,25 +446,50 @@ class RecipeReadSerializer(serializers.ModelSerializer):
             'is_in_shopping_cart',
             'name',
             'image',
+            'images',
             'text',
             'cooking_time',
         )
         model = Recipe
 
+    def get_is_favorited(self, obj: Recipe) -> bool:
+        """Формирование значения поля is_favorited.
+
+        Args:
+            obj: Модель рецепта.
+
+        Returns:
+            Наличие рецепта в избранном текущего пользователя.
+        """
+        return get_viewer_context(self.context['request']).is_favorited(
+            obj.id,
+        )
+
+    def get_is_in_shopping_cart(self, obj: Recipe) -> bool:
+        """Формирование значения поля is_in_shopping_cart.
+
+        Args:
+            obj: Модель рецепта.
+
+        Returns:
+            Наличие рецепта в списке покупок текущего пользователя.
+        """
+        viewer = get_viewer_context(self.context['request'])
+        return viewer.is_in_shopping_cart(obj.id)
+
 
 class RecipeWriteSerializer(serializers.ModelSerializer):
     """Сериализатор для модели рецепта."""
 
     author = UserSerializer(read_only=True)
-    image = Base64ImageField(required=False, allow_null=True)
+    image = StreamingImageField(required=False, allow_null=True)
     ingredients = IngredientWriteSerializer(
         many=True,
         required=True,
         error_messages={'required': 'Выберите хотя бы 1 ингредиент'},
     )
-    tags = serializers.PrimaryKeyRelatedField(
-        many=True,
-        queryset=Tag.objects.all(),
+    tags = serializers.ListField(
+        child=serializers.IntegerField(min_value=MIN_POSITIVE_INTEGER_VALUE),
         required=True,
         error_messages={'required': 'Выберите хотя бы 1 тег'},
     )
@@ -309,6 +511,22 @@ class RecipeWriteSerializer(serializers.ModelSerializer):
         )
         model = Recipe
 
+    def save(self, **kwargs: Any) -> Recipe:
+        """Сохранение рецепта с закрытием временного файла картинки.
+
+        Args:
+            **kwargs: Дополнительные данные для сохранения.
+
+        Returns:
+            Сохраненную модель рецепта.
+        """
+        try:
+            return super().save(**kwargs)
+        finally:
+            image = self.validated_data.get('image')
+            if image is not None:
+                image.close()
+
     def to_representation(self, instance: Recipe) -> Recipe:
         """Преобразование сериализатора для чтения.
 
@@ -318,77 +536,209 @@ class RecipeWriteSerializer(serializers.ModelSerializer):
         Returns:
             Представление сериализатора для чтения.
         """
+        prefetch_related_objects([instance], *get_recipe_prefetches())
         return RecipeReadSerializer(instance, context=self.context).data
 
+    @staticmethod
+    def resolve_ids(
+        model: Type[Model],
+        catalog: Dict[int, Dict[str, Any]],
+        ids: List[int],
+        label: str,
+    ) -> Tuple[Dict[int, Model], List[str]]:
+        """Функция для получения объектов по списку id из справочника.
+
+        Объекты, которых нет в справочнике, ищутся в базе данных одним
+        запросом: они могли быть добавлены после загрузки справочника.
+
+        Args:
+            model: Модель, объекты которой создаются.
+            catalog: Справочник процесса вида {id: поля объекта}.
+            ids: Переданные id в порядке передачи.
+            label: Название объектов для сообщений об ошибках.
+
+        Returns:
+            Словарь найденных объектов вида {id: объект} и список
+            сообщений о повторяющихся и отсутствующих id.
+        """
+        errors = []
+        duplicates = sorted(
+            object_id for object_id, count in Counter(ids).items() if count > 1
+        )
+        if duplicates:
+            errors.append(
+                f'{label} не уникальны: повторяются id '
+                + ', '.join(map(str, duplicates)),
+            )
+        objects = {
+            object_id: model(**catalog[object_id])
+            for object_id in set(ids)
+            if object_id in catalog
+        }
+        missing = set(ids) - objects.keys()
+        if missing:
+            objects.update(model.objects.in_bulk(missing))
+            missing = sorted(set(ids) - objects.keys())
+        if missing:
+            errors.append(
+                f'{label} не найдены: нет id ' + ', '.join(map(str, missing)),
+            )
+        return objects, errors
+
     def validate(self, data: ComplexSerializerData) -> ComplexSerializerData:
-        """Валидация данных поля ingredients.
+        """Валидация переданных ингредиентов и тегов.
+
+        id ингредиентов и тегов проверяются по справочникам процесса без
+        запросов к базе данных, а созданные по справочникам объекты
+        подставляются в данные для записи рецепта.
 
         Args:
-            data: Информация из поля ingredients.
+            data: Данные рецепта.
 
         Raises:
-            ValidationError: Ингредиентов с заданными параметрами нет.
+            ValidationError: Есть повторяющиеся или отсутствующие id.
 
         Returns:
-            Информация из поля ingredients, если не было ошибки.
+            Данные рецепта с найденными ингредиентами и тегами.
         """
-        ingredients_data = data.get('ingredients')
-        ingredient_ids = set()
-        for ingredient_data in ingredients_data:  # type:ignore[union-attr]
-            ingredient = ingredient_data.get(
-                'ingredient',
-            ).get(  # type:ignore[union-attr]
-                'id',
+        errors = {}
+        registry = get_registry()
+        if 'ingredients' in data:
+            ingredients, errors['ingredients'] = self.resolve_ids(
+                Ingredient,
+                registry.ingredients.by_id,
+                [item['id'] for item in data['ingredients']],
+                'Ингредиенты',
             )
-            ingredient_id = ingredient.id
-            if ingredient_id in ingredient_ids:
-                raise ValidationError(
-                    'Ингредиенты не уникальны:'
-                    f' минимум два с id {ingredient_id}',
-                )
-            ingredient_ids.add(ingredient_id)
-        tags_data = data.get('tags')
-        tag_ids = set()
-        for tag in tags_data:  # type:ignore[union-attr]
-            tag_id = tag.id
-            if tag_id in tag_ids:
-                raise ValidationError(
-                    f'Теги не уникальны: минимум два с id {tag_id}',
-                )
-            tag_ids.add(tag_id)
-        super().validate(data)
-        return data
+            data['ingredients'] = [
+                {'ingredient': ingredients.get(item['id']), **item}
+                for item in data['ingredients']
+            ]
+        if 'tags' in data:
+            tags, errors['tags'] = self.resolve_ids(
+                Tag,
+                registry.tags.by_id,
+                data['tags'],
+                'Теги',
+            )
+            data['tags'] = [tags.get(tag_id) for tag_id in data['tags']]
+        errors = {field: error for field, error in errors.items() if error}
+        if errors:
+            raise ValidationError(errors)
+        return super().validate(data)
+
+    @staticmethod
+    def get_ingredient_amounts(
+        ingredients_data: List[OrderedDict[str, Any]],
+    ) -> Dict[int, int]:
+        """Функция для получения количества переданных ингредиентов.
+
+        Args:
+            ingredients_data: Информация об ингредиентах.
+
+        Returns:
+            Словарь вида {id ингредиента: количество}.
+        """
+        return {
+            ingredient_data['ingredient'].id: ingredient_data['amount']
+            for ingredient_data in ingredients_data
+        }
 
-    def add_ingredients(
+    def set_ingredients(
         self,
         instance: Recipe,
-        ingredients_data: List[OrderedDict[str, Any]],
-    ) -> None:
-        """Функция для создания связи рецептов и ингредиентов.
+        amounts: Dict[int, int],
+        created: bool = False,
+    ) -> Dict[int, int]:
+        """Функция для приведения связей рецепта и ингредиентов к новым.
+
+        Существующие связи сравниваются с переданными, после чего пакетно
+        создаются, изменяются и удаляются только отличающиеся связи.
 
         Args:
-            instance: Модель рецепта, дли которой создаются связи.
-            Ingredients_data: Информация об ингредиентах.
+            instance: Модель рецепта, для которой изменяются связи.
+            amounts: Словарь вида {id ингредиента: количество}.
+            created: Рецепт только что создан и связей у него нет.
+
+        Returns:
+            Словарь с количеством ингредиентов до изменения.
         """
-        recipeingredients = sorted(
+        existing = (
+            {}
+            if created
+            else {
+                item.ingredient_id: item
+                for item in RecipeIngredient.objects.filter(recipe=instance)
+            }
+        )
+        old_amounts = {
+            ingredient_id: item.amount
+            for ingredient_id, item in existing.items()
+        }
+        to_update = []
+        for ingredient_id, item in existing.items():
+            amount = amounts.get(ingredient_id, item.amount)
+            if amount != item.amount:
+                item.amount = amount
+                to_update.append(item)
+        RecipeIngredient.objects.bulk_create(
             [
-                RecipeIngredient(  # type:ignore[misc]
+                RecipeIngredient(
                     recipe=instance,
-                    ingredient_id=ingredient_data.get(
-                        'ingredient',
-                    )
-                    .get(  # type:ignore[union-attr]
-                        'id',
-                    )
-                    .id,
-                    amount=ingredient_data.get('amount'),
+                    ingredient_id=ingredient_id,
+                    amount=amount,
                 )
-                for ingredient_data in ingredients_data
+                for ingredient_id, amount in amounts.items()
+                if ingredient_id not in existing
+            ],
+        )
+        RecipeIngredient.objects.bulk_update(to_update, ['amount'])
+        removed = [
+            item.id
+            for ingredient_id, item in existing.items()
+            if ingredient_id not in amounts
+        ]
+        if removed:
+            RecipeIngredient.objects.filter(id__in=removed).delete()
+        return old_amounts
+
+    def set_tags(
+        self,
+        instance: Recipe,
+        tags: List[Tag],
+        created: bool = False,
+    ) -> None:
+        """Функция для приведения связей рецепта и тегов к новым.
+
+        Args:
+            instance: Модель рецепта, для которой изменяются связи.
+            tags: Новые теги рецепта.
+            created: Рецепт только что создан и связей у него нет.
+        """
+        tag_ids = {tag.id for tag in tags}
+        existing = (
+            set()
+            if created
+            else set(
+                RecipeTag.objects.filter(recipe=instance).values_list(
+                    'tag_id',
+                    flat=True,
+                ),
+            )
+        )
+        RecipeTag.objects.bulk_create(
+            [
+                RecipeTag(recipe=instance, tag_id=tag_id)
+                for tag_id in tag_ids - existing
             ],
-            key=lambda obj: obj.ingredient.name,
         )
-        RecipeIngredient.objects.bulk_create(recipeingredients)
+        if existing - tag_ids:
+            RecipeTag.objects.filter(
+                recipe=instance,
+                tag_id__in=existing - tag_ids,
+            ).delete()
 
+    @transaction.atomic
     def update(
         self,
         instance: Recipe,
@@ -396,6 +746,12 @@ class RecipeWriteSerializer(serializers.ModelSerializer):
     ) -> Recipe:
         """Изменение существующего рецепта.
 
+        Связи с ингредиентами и тегами изменяются, только если они
+        переданы, и только в отличающейся части. При изменении набора
+        ингредиентов обновляются индексы похожих рецептов и рецептов по
+        ингредиентам, а для новой картинки заново создаются уменьшенные
+        копии.
+
         Args:
             instance: Существующая модель рецепта.
             validated_data: Прошедшие валидацию данные.
@@ -403,14 +759,25 @@ class RecipeWriteSerializer(serializers.ModelSerializer):
         Returns:
             Преобразованную модель рецепта
         """
-        ingredients_data = validated_data.pop('ingredients', [])
-        instance.recipe_ingredient.all().delete()
-        self.add_ingredients(instance, ingredients_data)
-        tags = validated_data.pop('tags', [])
-        instance.recipe_tag.all().delete()
-        instance.tags.set(tags)
-        return super().update(instance, validated_data)
-
+        if 'ingredients' in validated_data:
+            amounts = self.get_ingredient_amounts(
+                validated_data.pop('ingredients'),
+            )
+            old_amounts = self.set_ingredients(instance, amounts)
+            change_recipe_in_carts(instance.id, old_amounts, amounts)
+            if old_amounts.keys() != amounts.keys():
+                index_recipe(instance.id, amounts)
+                recipe_ingredients_changed([instance.id])
+        if 'tags' in validated_data:
+            self.set_tags(instance, validated_data.pop('tags'))
+        if 'image' not in validated_data:
+            return super().update(instance, validated_data)
+        validated_data.update(dict.fromkeys(IMAGE_VARIANT_FIELDS.values(), ''))
+        instance = super().update(instance, validated_data)
+        schedule_image_processing(instance)
+        return instance
+
+    @transaction.atomic
     def create(self, validated_data: ComplexSerializerData) -> Recipe:
         """Создание нового рецепта.
 
@@ -420,12 +787,17 @@ class RecipeWriteSerializer(serializers.ModelSerializer):
         Returns:
             Созданную модель рецепта
         """
-        ingredients_data = validated_data.pop('ingredients', [])
+        amounts = self.get_ingredient_amounts(
+            validated_data.pop('ingredients', []),
+        )
         tags = validated_data.pop('tags', [])
         recipe = Recipe.objects.create(
             **validated_data,
             author=self.context['request'].user,
         )
-        recipe.tags.set(tags)
-        self.add_ingredients(recipe, ingredients_data)
+        self.set_tags(recipe, tags, created=True)
+        self.set_ingredients(recipe, amounts, created=True)
+        index_recipe(recipe.id, amounts)
+        recipe_ingredients_changed([recipe.id])
+        schedule_image_processing(recipe)
         return recipe
@@ -1,15 +1,32 @@
-from django.db.models import Exists, OuterRef, QuerySet, Sum
-from django.http import FileResponse, HttpResponse
+from typing import Any, Type
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import (
+    Exists,
+    Model,
+    OuterRef,
+    QuerySet,
+    prefetch_related_objects,
+)
+from django.http import HttpResponse
 from django.shortcuts import get_object_or_404
+from django.utils.cache import get_conditional_response
+from django.utils.http import quote_etag
 from django_filters.rest_framework import DjangoFilterBackend
 from rest_framework import generics, permissions, status, views, viewsets
 from rest_framework.decorators import action
+from rest_framework.exceptions import NotFound, ValidationError
+from rest_framework.parsers import JSONParser, MultiPartParser
+from rest_framework.renderers import JSONRenderer
+from rest_framework.request import Request
 from rest_framework.response import Response
 from rest_framework.serializers import Serializer
 
 from api.v1.filters import RecipeFilterSet
 from api.v1.permissions import AuthorOrReadOnly
 from api.v1.serializers import (
+    CartIngredientSerializer,
     FavoriteSerializer,
     FollowingCreateSerializer,
     FollowingSerializer,
@@ -18,18 +35,33 @@ from api.v1.serializers import (
     RecipeNestedSerializer,
     RecipeWriteSerializer,
     TagSerializer,
+    get_recipe_prefetches,
+    get_recipes_limit,
 )
-from core.filters import NameStartsSearchFilter
+from core.constants import INGREDIENT_SEARCH_LIMIT
+from core.filters import NameSearchFilter
+from core.pagination import CursorLimitPagination, FeedPagination
+from core.renderers import CSVRenderer, PDFRenderer, PlainTextRenderer
 from core.types import AuthenticatedHttpRequest
-from core.utils import shopping_file
+from core.utils import (
+    cached_shopping_file,
+    streaming_shopping_file,
+)
+from core.versions import get_version
+from recipes.feed import get_feed
 from recipes.models import (
+    CartIngredient,
     Favorite,
     Ingredient,
     Purchase,
     Recipe,
-    RecipeIngredient,
+    RecipeRanking,
+    RecipeTag,
     Tag,
 )
+from recipes.previews import load_recipe_previews
+from recipes.registry import REFERENCE_VERSION, get_registry
+from recipes.similarity import find_similar
 from users.models import Following, User
 
 
@@ -90,6 +122,7 @@ class FollowingViewSet(generics.ListAPIView):
 
     serializer_class = FollowingSerializer
     permission_classes = [permissions.IsAuthenticated]
+    pagination_class = FeedPagination
 
     def get_queryset(self) -> QuerySet:
         """Функция для получения подписок пользователя.
@@ -99,6 +132,30 @@ class FollowingViewSet(generics.ListAPIView):
         """
         return User.objects.filter(followers__user=self.request.user)
 
+    def list(self, request: Request) -> Response:
+        """Функция для получения страницы подписок.
+
+        Рецепты всех авторов страницы загружаются одним запросом.
+
+        Args:
+            request: Передаваемый запрос.
+
+        Returns:
+            Страницу авторов с их рецептами.
+        """
+        queryset = self.filter_queryset(self.get_queryset())
+        page = self.paginate_queryset(queryset)
+        authors = list(queryset if page is None else page)
+        context = self.get_serializer_context()
+        context['recipe_previews'] = load_recipe_previews(
+            [author.id for author in authors],
+            get_recipes_limit(request),
+        )
+        serializer = self.get_serializer(authors, many=True, context=context)
+        if page is None:
+            return Response(serializer.data)
+        return self.get_paginated_response(serializer.data)
+
 
 class IngredientViewSet(viewsets.ReadOnlyModelViewSet):
     """ViewSet для модели ингредиента."""
@@ -106,8 +163,78 @@ class IngredientViewSet(viewsets.ReadOnlyModelViewSet):
     queryset = Ingredient.objects.all()
     serializer_class = IngredientSerializer
     pagination_class = None
-    filter_backends = (NameStartsSearchFilter,)
-    search_fields = ('^name',)
+    filter_backends = (NameSearchFilter,)
+    lookup_value_regex = r'\d+'
+
+    def list(
+        self,
+        request: Request,
+        *args: Any,
+        **kwargs: Any,
+    ) -> HttpResponse:
+        """Получение списка ингредиентов.
+
+        Без параметра name ингредиенты берутся из справочника процесса.
+        При наличии параметра name возвращается не более
+        INGREDIENT_SEARCH_LIMIT ингредиентов. Если INGREDIENT_SEARCH_BACKEND
+        равен memory, поиск по началу названия выполняется в справочнике
+        процесса без обращения к базе данных, иначе - в базе данных по
+        нормализованному названию с нечетким поиском в PostgreSQL.
+
+        Args:
+            request: Передаваемый запрос.
+            *args: Передаваемые позиционные аргументы.
+            **kwargs: Передаваемые именованные аргументы.
+
+        Returns:
+            Список ингредиентов.
+        """
+        name = request.query_params.get('name')
+        index = get_registry().ingredients
+        if not name:
+            return Response(index.all())
+        if settings.INGREDIENT_SEARCH_BACKEND == 'memory':
+            return Response(index.search(name, INGREDIENT_SEARCH_LIMIT))
+        queryset = self.filter_queryset(self.get_queryset())
+        return Response(
+            self.get_serializer(
+                queryset[:INGREDIENT_SEARCH_LIMIT],
+                many=True,
+            ).data,
+        )
+
+    def retrieve(
+        self,
+        request: Request,
+        *args: Any,
+        **kwargs: Any,
+    ) -> HttpResponse:
+        """Получение ингредиента из справочника процесса.
+
+        Ингредиент, которого нет в справочнике, ищется в базе данных: он
+        мог быть добавлен после загрузки справочника.
+
+        Args:
+            request: Передаваемый запрос.
+            *args: Передаваемые позиционные аргументы.
+            **kwargs: Передаваемые именованные аргументы.
+
+        Raises:
+            NotFound: Ингредиент не найден.
+
+        Returns:
+            Ингредиент.
+        """
+        ingredient_id = int(kwargs[self.lookup_field])
+        ingredient = get_registry().ingredients.by_id.get(ingredient_id)
+        if ingredient is None:
+            ingredient = Ingredient.objects.in_bulk([ingredient_id]).get(
+                ingredient_id,
+            )
+            if ingredient is None:
+                raise NotFound
+            ingredient = self.get_serializer(ingredient).data
+        return Response(ingredient)
 
 
 class RecipeViewSet(viewsets.ModelViewSet):
@@ -118,28 +245,22 @@ class RecipeViewSet(viewsets.ModelViewSet):
     permission_classes = [AuthorOrReadOnly]
     filter_backends = (DjangoFilterBackend,)
     filterset_class = RecipeFilterSet
+    pagination_class = FeedPagination
+    parser_classes = (JSONParser, MultiPartParser)
+    lookup_value_regex = r'\d+'
 
     def get_queryset(self) -> QuerySet:
-        """Функция для добавления к рецептам дополнительных полей.
+        """Функция для загрузки связанных с рецептами объектов.
+
+        Связанные авторы, теги и ингредиенты загружаются заранее, поэтому
+        количество запросов не зависит от числа рецептов на странице.
 
         Returns:
-            QuerySet, содержащий рецепты с дополнительными полями.
+            QuerySet, содержащий рецепты со связанными объектами.
         """
         queryset = super(RecipeViewSet, self).get_queryset()
-        user_id = self.request.user.id
-        return queryset.annotate(
-            is_in_shopping_cart=Exists(
-                Purchase.objects.filter(
-                    user_id=user_id,
-                    recipe__id=OuterRef('id'),
-                ),
-            ),
-            is_favorited=Exists(
-                Favorite.objects.filter(
-                    user_id=user_id,
-                    recipe__id=OuterRef('id'),
-                ),
-            ),
+        return queryset.select_related('author').prefetch_related(
+            *get_recipe_prefetches(),
         )
 
     def create_connection(
@@ -157,7 +278,8 @@ class RecipeViewSet(viewsets.ModelViewSet):
         """
         serializer = serializer(data={'user': request.user.id, 'recipe': pk})
         serializer.is_valid(raise_exception=True)
-        serializer.save()
+        with transaction.atomic():
+            serializer.save()
         recipe = get_object_or_404(Recipe, id=pk)
         return Response(
             RecipeNestedSerializer(
@@ -167,6 +289,22 @@ class RecipeViewSet(viewsets.ModelViewSet):
             status=status.HTTP_201_CREATED,
         )
 
+    def delete_connection(
+        self,
+        model: Type[Model],
+        request: AuthenticatedHttpRequest,
+        pk: str,
+    ) -> HttpResponse:
+        """Функция для удаления объектов связи пользователя и рецепта.
+
+        Args:
+            model: Модель связи пользователя и рецепта.
+            request: Передаваемый запрос.
+            pk: Уникальный id рецепта.
+        """
+        get_object_or_404(model, recipe__id=pk, user=request.user).delete()
+        return Response(status=status.HTTP_204_NO_CONTENT)
+
     @action(detail=True, methods=['post'])
     def favorite(
         self,
@@ -203,8 +341,7 @@ class RecipeViewSet(viewsets.ModelViewSet):
             Ничего: в случае удаления рецепта.
             Информацию об ошибке: в прочих случаях.
         """
-        get_object_or_404(Favorite, recipe__id=pk, user=request.user).delete()
-        return Response(status=status.HTTP_204_NO_CONTENT)
+        return self.delete_connection(Favorite, request, pk)
 
     @action(detail=True, methods=['post'])
     def shopping_cart(
@@ -242,31 +379,205 @@ class RecipeViewSet(viewsets.ModelViewSet):
             Ничего: в случае удаления рецепта.
             Информацию об ошибке: в прочих случаях.
         """
-        get_object_or_404(Purchase, recipe__id=pk, user=request.user).delete()
-        return Response(status=status.HTTP_204_NO_CONTENT)
-
-    @action(detail=False, methods=['get'])
+        return self.delete_connection(Purchase, request, pk)
+
+    @action(
+        detail=False,
+        methods=['get'],
+        permission_classes=[permissions.IsAuthenticated],
+        renderer_classes=[
+            PDFRenderer,
+            PlainTextRenderer,
+            CSVRenderer,
+            JSONRenderer,
+        ],
+    )
     def download_shopping_cart(
         self,
         request: AuthenticatedHttpRequest,
-    ) -> FileResponse:
+    ) -> HttpResponse:
         """Обработка запросов к списку покупок.
 
+        Формат файла выбирается параметром format: pdf (по умолчанию), txt,
+        csv или json. Текстовые форматы отдаются потоком, PDF кешируется
+        по версии списка покупок пользователя и версии справочников, так как
+        в файл попадают названия и единицы измерения ингредиентов. При
+        совпадении заголовка If-None-Match возвращается статус 304.
+
         Args:
             request: Передаваемый запрос.
 
         Returns:
             Файл со списком покупок пользователя.
         """
-        cart = (
-            RecipeIngredient.objects.filter(
-                recipe__purchases__user=request.user,
+        user = request.user
+        file_format = request.accepted_renderer.format
+        reference_version = get_version(REFERENCE_VERSION)
+        version = (
+            f'{user.id}-{user.shopping_cart_version}-{reference_version}-'
+            f'{file_format}'
+        )
+        etag = quote_etag(version)
+        response = get_conditional_response(request, etag=etag)
+        if response is None:
+            cart = (
+                CartIngredient.objects.filter(user=user)
+                .values(
+                    'ingredient__name',
+                    'ingredient__measurement_unit',
+                    'amount',
+                )
+                .order_by('ingredient__name')
             )
-            .values('ingredient__name', 'ingredient__measurement_unit')
-            .annotate(amount=Sum('amount'))
-            .order_by('ingredient__name')
+            if file_format == PDFRenderer.format:
+                response = cached_shopping_file(
+                    cart,
+                    f'shopping-file-{version}',
+                )
+            else:
+                response = streaming_shopping_file(cart, file_format)
+        response['ETag'] = etag
+        return response
+
+    @action(
+        detail=False,
+        methods=['get'],
+        permission_classes=[permissions.IsAuthenticated],
+    )
+    def shopping_cart_summary(
+        self,
+        request: AuthenticatedHttpRequest,
+    ) -> HttpResponse:
+        """Обработка запросов к суммарному списку покупок.
+
+        Args:
+            request: Передаваемый запрос.
+
+        Returns:
+            Список ингредиентов из списка покупок с их количеством.
+        """
+        cart = CartIngredient.objects.filter(user=request.user)
+        return Response(CartIngredientSerializer(cart, many=True).data)
+
+    @action(detail=True, methods=['get'])
+    def recommendations(self, request: Request, pk: str) -> HttpResponse:
+        """Обработка запросов к рецептам, которые добавляют вместе с данным.
+
+        Рекомендации рассчитываются командой recommend_recipes и читаются
+        одним запросом по индексу.
+
+        Args:
+            request: Передаваемый запрос.
+            pk: id рецепта.
+
+        Returns:
+            Список рекомендуемых рецептов в порядке убывания сходства.
+        """
+        get_object_or_404(Recipe, id=pk)
+        recipes = Recipe.objects.filter(
+            recommended_for__recipe_id=pk,
+        ).order_by('recommended_for__position')
+        return Response(
+            RecipeNestedSerializer(
+                recipes,
+                many=True,
+                context={'request': request},
+            ).data,
+        )
+
+    @action(detail=True, methods=['get'])
+    def similar(self, request: Request, pk: str) -> HttpResponse:
+        """Обработка запросов к рецептам с похожим набором ингредиентов.
+
+        Args:
+            request: Передаваемый запрос.
+            pk: id рецепта.
+
+        Returns:
+            Список похожих рецептов в порядке убывания сходства.
+        """
+        recipe = get_object_or_404(Recipe, id=pk)
+        recipe_ids = [recipe_id for recipe_id, _ in find_similar(recipe.id)]
+        recipes = Recipe.objects.in_bulk(recipe_ids)
+        return Response(
+            RecipeNestedSerializer(
+                [
+                    recipes[recipe_id]
+                    for recipe_id in recipe_ids
+                    if recipe_id in recipes
+                ],
+                many=True,
+                context={'request': request},
+            ).data,
         )
-        return shopping_file(cart)
+
+    @action(detail=False, methods=['get'])
+    def popular(self, request: Request) -> HttpResponse:
+        """Обработка запросов к рейтингу популярных рецептов.
+
+        Рейтинг читается из заранее рассчитанной таблицы и разбивается на
+        страницы по курсору на месте рецепта в рейтинге.
+
+        Args:
+            request: Передаваемый запрос.
+
+        Raises:
+            ValidationError: Передан неизвестный период.
+
+        Returns:
+            Страницу рецептов в порядке рейтинга.
+        """
+        period = request.query_params.get('period', RecipeRanking.WEEK)
+        if period not in dict(RecipeRanking.PERIODS):
+            raise ValidationError(
+                {'period': f'Неизвестный период: {period}'},
+            )
+        rankings = RecipeRanking.objects.filter(period=period).select_related(
+            'recipe__author',
+        )
+        tags = request.query_params.getlist('tags')
+        if tags:
+            rankings = rankings.filter(
+                Exists(
+                    RecipeTag.objects.filter(
+                        recipe_id=OuterRef('recipe_id'),
+                        tag_id__in=get_registry().tags.get_ids(tags),
+                    ),
+                ),
+            )
+        paginator = CursorLimitPagination()
+        page = paginator.paginate_queryset(rankings, request, view=self)
+        recipes = [ranking.recipe for ranking in page]
+        prefetch_related_objects(recipes, *get_recipe_prefetches())
+        serializer = self.get_serializer(recipes, many=True)
+        return paginator.get_paginated_response(serializer.data)
+
+    @action(
+        detail=False,
+        methods=['get'],
+        permission_classes=[permissions.IsAuthenticated],
+    )
+    def feed(self, request: AuthenticatedHttpRequest) -> HttpResponse:
+        """Обработка запросов к ленте рецептов авторов из подписок.
+
+        Лента всегда разбивается на страницы по курсору, поэтому время
+        получения страницы не зависит от ее номера.
+
+        Args:
+            request: Передаваемый запрос.
+
+        Returns:
+            Страницу рецептов авторов, на которых подписан пользователь.
+        """
+        queryset = self.filter_queryset(
+            get_feed(request.user)
+            .select_related('author')
+            .prefetch_related(*get_recipe_prefetches()),
+        )
+        paginator = CursorLimitPagination()
+        page = paginator.paginate_queryset(queryset, request, view=self)
+        serializer = self.get_serializer(page, many=True)
+        return paginator.get_paginated_response(serializer.data)
 
 
 class TagViewSet(viewsets.ReadOnlyModelViewSet):
@@ -275,3 +586,53 @@ class TagViewSet(viewsets.ReadOnlyModelViewSet):
     queryset = Tag.objects.all()
     serializer_class = TagSerializer
     pagination_class = None
+    lookup_value_regex = r'\d+'
+
+    def list(
+        self,
+        request: Request,
+        *args: Any,
+        **kwargs: Any,
+    ) -> HttpResponse:
+        """Получение списка тегов из справочника процесса.
+
+        Args:
+            request: Передаваемый запрос.
+            *args: Передаваемые позиционные аргументы.
+            **kwargs: Передаваемые именованные аргументы.
+
+        Returns:
+            Список тегов.
+        """
+        return Response(get_registry().tags.all())
+
+    def retrieve(
+        self,
+        request: Request,
+        *args: Any,
+        **kwargs: Any,
+    ) -> HttpResponse:
+        """Получение тега из справочника процесса.
+
+        Тег, которого нет в справочнике, ищется в базе данных: он мог быть
+        добавлен после загрузки справочника.
+
+        Args:
+            request: Передаваемый запрос.
+            *args: Передаваемые позиционные аргументы.
+            **kwargs: Передаваемые именованные аргументы.
+
+        Raises:
+            NotFound: Тег не найден.
+
+        Returns:
+            Тег.
+        """
+        tag_id = int(kwargs[self.lookup_field])
+        tag = get_registry().tags.by_id.get(tag_id)
+        if tag is None:
+            tag = Tag.objects.in_bulk([tag_id]).get(tag_id)
+            if tag is None:
+                raise NotFound
+            tag = self.get_serializer(tag).data
+        return Response(tag)
@@ -18,6 +18,7 @@ INSTALLED_APPS = [
     'django.contrib.sessions',
     'django.contrib.messages',
     'django.contrib.staticfiles',
+    'django.contrib.postgres',
 
     'colorfield',
     'django_filters',
@@ -81,6 +82,16 @@ else:
         },
     }
 
+CACHES = {
+    'default': {
+        'BACKEND': config(
+            'CACHE_BACKEND',
+            default='django.core.cache.backends.locmem.LocMemCache',
+        ),
+        'LOCATION': config('CACHE_LOCATION', default=''),
+    },
+}
+
 AUTH_PASSWORD_VALIDATORS = [
     {
         'NAME': 'django.contrib.auth.password_validation.'
@@ -146,6 +157,35 @@ MEDIA_URL = '/media/'
 
 MEDIA_ROOT = str(BASE_DIR / 'media')
 
+VERSION_CHECK_INTERVAL = config(
+    'VERSION_CHECK_INTERVAL',
+    default=1,
+    cast=int,
+)
+
+INGREDIENT_SEARCH_BACKEND = config(
+    'INGREDIENT_SEARCH_BACKEND',
+    default='memory',
+)
+
+IMAGE_PROCESSING_WORKERS = config(
+    'IMAGE_PROCESSING_WORKERS',
+    default=2,
+    cast=int,
+)
+
+RECIPE_IMAGE_MAX_SIZE = config(
+    'RECIPE_IMAGE_MAX_SIZE',
+    default=10 * 1024 * 1024,
+    cast=int,
+)
+
+RECIPE_IMAGE_MAX_PIXELS = config(
+    'RECIPE_IMAGE_MAX_PIXELS',
+    default=25_000_000,
+    cast=int,
+)
+
 DATA_IMPORT_LOCATION = str(
     (BASE_DIR / 'data/'),
 )
@@ -7,3 +7,43 @@ USER_FIELDS_LENGTH = 150
 MIN_POSITIVE_INTEGER_VALUE = 1
 
 MAX_POSITIVE_INTEGER_VALUE = 32767
+
+SHOPPING_FONT_NAME = 'DejaVuSerif'
+
+SHOPPING_FONT_FILE = 'DejaVuSerif.ttf'
+
+SHOPPING_FILE_MARGIN = 40
+
+SHOPPING_FILE_MAX_MEMORY_SIZE = 1024 * 1024
+
+SHOPPING_FILE_CACHE_MAX_SIZE = 512 * 1024
+
+SHOPPING_FILE_CACHE_TIMEOUT = 60 * 60
+
+INGREDIENT_SEARCH_LIMIT = 50
+
+INGREDIENT_FILTER_ID_LIMIT = 1000
+
+IMAGE_VARIANT_SIZES = {
+    'thumbnail': (160, 160),
+    'card': (480, 480),
+    'full': (1280, 1280),
+}
+
+IMAGE_VARIANT_QUALITY = 80
+
+FEED_MAX_LENGTH = 1000
+
+FEED_FANOUT_LIMIT = 1000
+
+POPULAR_RANKING_SIZE = 1000
+
+RECOMMENDATIONS_SIZE = 10
+
+MINHASH_PERMUTATIONS = 64
+
+MINHASH_BANDS = 16
+
+SIMILAR_RECIPES_CANDIDATES = 100
+
+SIMILAR_RECIPES_SIZE = 10
@@ -0,0 +1,147 @@
+import binascii
+import uuid
+from base64 import b64decode
+from typing import Any, Optional
+
+from django.conf import settings
+from django.core.files.uploadedfile import (
+    TemporaryUploadedFile,
+    UploadedFile,
+)
+from PIL import Image, UnidentifiedImageError
+from rest_framework import serializers
+
+BASE64_CHUNK_SIZE = 64 * 1024
+
+BASE64_SEPARATOR = ';base64,'
+
+BASE64_WHITESPACE = ' \t\r\n'
+
+BASE64_WHITESPACE_TABLE = dict.fromkeys(map(ord, BASE64_WHITESPACE))
+
+IMAGE_FORMATS = {
+    'GIF': 'gif',
+    'JPEG': 'jpg',
+    'PNG': 'png',
+    'WEBP': 'webp',
+}
+
+
+class StreamingImageField(serializers.ImageField):
+    """Поле картинки, принимающее base64-строку или загруженный файл.
+
+    Base64-строка декодируется частями во временный файл, поэтому
+    декодированная картинка не хранится в памяти целиком. Размер файла
+    и количество пикселей проверяются до декодирования картинки: размеры
+    читаются только из заголовка файла.
+    """
+
+    default_error_messages = {
+        'invalid_image': 'Загрузите корректную картинку.',
+        'invalid_base64': 'Картинка должна быть передана в base64.',
+        'invalid_format': 'Поддерживаются картинки форматов {formats}.',
+        'max_size': 'Размер картинки не может быть больше {max_size} байт.',
+        'max_pixels': (
+            'Картинка не может содержать больше {max_pixels} пикселей.'
+        ),
+    }
+
+    def to_internal_value(self, data: Any) -> Optional[UploadedFile]:
+        """Преобразование переданной картинки в файл.
+
+        Args:
+            data: Base64-строка, возможно с заголовком data URL,
+                или загруженный файл.
+
+        Returns:
+            Загруженный файл или None для пустой строки.
+        """
+        if data == '':
+            return None
+        if isinstance(data, str):
+            data = self.decode(data)
+        elif not isinstance(data, UploadedFile):
+            self.fail('invalid_base64')
+        self.check_size(data.size)
+        data.name = self.check_image(data)
+        return super().to_internal_value(data)
+
+    def decode(self, data: str) -> TemporaryUploadedFile:
+        """Функция для декодирования base64-строки во временный файл.
+
+        Пробельные символы, например переносы строк через каждые 76
+        символов, пропускаются. Символы, не составившие полную группу из
+        четырех, переносятся в следующую часть строки.
+
+        Args:
+            data: Base64-строка.
+
+        Returns:
+            Временный файл с декодированными данными.
+        """
+        start = data.find(BASE64_SEPARATOR)
+        start = 0 if start < 0 else start + len(BASE64_SEPARATOR)
+        whitespace = sum(data.count(char, start) for char in BASE64_WHITESPACE)
+        padding = data[-8:].translate(BASE64_WHITESPACE_TABLE)[-2:].count('=')
+        self.check_size((len(data) - start - whitespace) // 4 * 3 - padding)
+        file = TemporaryUploadedFile(
+            name=str(uuid.uuid4()),
+            content_type=None,
+            size=0,
+            charset=None,
+        )
+        remainder = ''
+        try:
+            for position in range(start, len(data), BASE64_CHUNK_SIZE):
+                end = position + BASE64_CHUNK_SIZE
+                chunk = remainder + data[position:end].translate(
+                    BASE64_WHITESPACE_TABLE,
+                )
+                complete = len(chunk) - len(chunk) % 4
+                file.write(b64decode(chunk[:complete], validate=True))
+                remainder = chunk[complete:]
+            if remainder:
+                raise ValueError('Incomplete base64 group.')
+        except (binascii.Error, ValueError):
+            file.close()
+            self.fail('invalid_base64')
+        file.size = file.tell()
+        file.seek(0)
+        return file
+
+    def check_size(self, size: int) -> None:
+        """Функция для проверки размера файла картинки.
+
+        Args:
+            size: Размер файла в байтах.
+        """
+        if size > settings.RECIPE_IMAGE_MAX_SIZE:
+            self.fail('max_size', max_size=settings.RECIPE_IMAGE_MAX_SIZE)
+
+    def check_image(self, file: UploadedFile) -> str:
+        """Функция для проверки формата и размеров картинки по заголовку.
+
+        Args:
+            file: Файл картинки.
+
+        Returns:
+            Имя файла с расширением, соответствующим формату картинки.
+        """
+        try:
+            with Image.open(file) as image:
+                file_format, (width, height) = image.format, image.size
+        except (UnidentifiedImageError, OSError, Image.DecompressionBombError):
+            self.fail('invalid_image')
+        finally:
+            file.seek(0)
+        if file_format not in IMAGE_FORMATS:
+            self.fail(
+                'invalid_format',
+                formats=', '.join(IMAGE_FORMATS.values()),
+            )
+        if width * height > settings.RECIPE_IMAGE_MAX_PIXELS:
+            self.fail(
+                'max_pixels',
+                max_pixels=settings.RECIPE_IMAGE_MAX_PIXELS,
+            )
+        return f'{uuid.uuid4()}.{IMAGE_FORMATS[file_format]}'
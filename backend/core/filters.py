@@ -1,7 +1,66 @@
+from django.contrib.postgres.search import TrigramSimilarity
+from django.db import connections
+from django.db.models import Case, IntegerField, Q, QuerySet, Value, When
 from rest_framework import filters
+from rest_framework.request import Request
+from rest_framework.views import APIView
 
+from core.utils import normalize_name
 
-class NameStartsSearchFilter(filters.SearchFilter):
-    """Класс фильтрации с регулярными выражениями по параметру name."""
+
+class NameSearchFilter(filters.BaseFilterBackend):
+    """Класс поиска по нормализованному названию из параметра name.
+
+    Сначала выдаются объекты, название которых начинается с искомой
+    строки, затем содержащие ее. В PostgreSQL к ним добавляются похожие
+    по триграммам названия, упорядоченные по степени сходства.
+    """
 
     search_param = 'name'
+    search_field = 'search_name'
+
+    def filter_queryset(
+        self,
+        request: Request,
+        queryset: QuerySet,
+        view: APIView,
+    ) -> QuerySet:
+        """Функция для поиска объектов по названию.
+
+        Args:
+            request: Передаваемый запрос.
+            queryset: Объекты для поиска.
+            view: Представление, для которого выполняется поиск.
+
+        Returns:
+            Найденные объекты, упорядоченные по релевантности.
+        """
+        name = request.query_params.get(self.search_param)
+        if not name:
+            return queryset
+        key = normalize_name(name)
+        prefix = Q(**{f'{self.search_field}__startswith': key})
+        substring = Q(**{f'{self.search_field}__contains': key})
+        rank = Case(
+            When(prefix, then=Value(0)),
+            When(substring, then=Value(1)),
+            default=Value(2),
+            output_field=IntegerField(),
+        )
+        if connections[queryset.db].vendor != 'postgresql':
+            return (
+                queryset.filter(substring)
+                .annotate(search_rank=rank)
+                .order_by('search_rank', 'name')
+            )
+        return (
+            queryset.filter(
+                substring
+                | Q(**{f'{self.search_field}__trigram_similar': key}),
+            )
+            .annotate(
+                search_rank=rank,
+                similarity=TrigramSimilarity(self.search_field, key),
+            )
+            .order_by('search_rank', '-similarity', 'name')
+        )
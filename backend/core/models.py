@@ -1,4 +1,7 @@
 from django.db import models
+from django.utils import timezone
+
+from core.constants import DEFAULT_FIELD_LENGTH
 
 
 class UserRecipeModel(models.Model):
@@ -14,6 +17,12 @@ class UserRecipeModel(models.Model):
         on_delete=models.CASCADE,
         verbose_name='рецепт',
     )
+    created = models.DateTimeField(
+        default=timezone.now,
+        editable=False,
+        db_index=True,
+        verbose_name='дата добавления',
+    )
 
     class Meta:
         abstract = True
@@ -21,7 +30,13 @@ class UserRecipeModel(models.Model):
         constraints = [
             models.UniqueConstraint(
                 fields=['recipe', 'user'],
-                name='unique_recipe_user',
+                name='%(class)s_unique_recipe_user',
+            ),
+        ]
+        indexes = [
+            models.Index(
+                fields=['user', 'recipe'],
+                name='%(class)s_user_recipe_idx',
             ),
         ]
 
@@ -37,3 +52,26 @@ class UserRecipeModel(models.Model):
                 f'{self._meta.get_field("recipe").verbose_name}-{self.recipe}',
             ],
         )
+
+
+class DataVersion(models.Model):
+    """Модель версии данных, общей для всех процессов приложения."""
+
+    name = models.CharField(
+        max_length=DEFAULT_FIELD_LENGTH,
+        unique=True,
+        verbose_name='название',
+    )
+    version = models.BigIntegerField(verbose_name='версия')
+
+    class Meta:
+        verbose_name = 'Версия данных'
+        verbose_name_plural = 'Версии данных'
+
+    def __str__(self) -> str:
+        """Задание текстового представления версии данных.
+
+        Returns:
+            Строку вида '<название>: <версия>'.
+        """
+        return f'{self.name}: {self.version}'
@@ -1,7 +1,115 @@
-from rest_framework.pagination import PageNumberPagination
+from typing import Any, Dict, List, Optional, Sequence
+
+from django.db.models import QuerySet
+from rest_framework.pagination import CursorPagination, PageNumberPagination
+from rest_framework.request import Request
+from rest_framework.response import Response
+from rest_framework.views import APIView
 
 
 class PageLimitPagination(PageNumberPagination):
     """Класс пагинации с переменным количеством объектов на странице."""
 
     page_size_query_param = 'limit'
+
+
+class CursorLimitPagination(CursorPagination):
+    """Класс курсорной пагинации с переменным количеством объектов.
+
+    Порядок берется из атрибута cursor_ordering представления, при его
+    отсутствии - из сортировки queryset, а если queryset не отсортирован -
+    из сортировки модели по умолчанию. Если в порядке нет id, он
+    добавляется последним, чтобы объекты с одинаковыми значениями полей
+    сортировки не повторялись и не пропускались на границе страниц.
+    """
+
+    page_size_query_param = 'limit'
+
+    def get_ordering(
+        self,
+        request: Request,
+        queryset: QuerySet,
+        view: APIView,
+    ) -> Sequence[str]:
+        """Функция для получения порядка сортировки объектов.
+
+        Args:
+            request: Передаваемый запрос.
+            queryset: Объекты для пагинации.
+            view: Представление, для которого выполняется пагинация.
+
+        Returns:
+            Последовательность полей сортировки.
+        """
+        ordering = tuple(
+            getattr(view, 'cursor_ordering', None)
+            or queryset.query.order_by
+            or queryset.model._meta.ordering,
+        )
+        if not {'id', 'pk'} & {field.lstrip('-') for field in ordering}:
+            ordering += ('-id',)
+        return ordering
+
+
+class FeedPagination(PageLimitPagination):
+    """Класс пагинации по номеру страницы или по курсору.
+
+    При наличии в запросе параметра cursor (в том числе пустого) страницы
+    формируются по курсору без подсчета общего количества объектов и без
+    смещения, иначе используется пагинация по номеру страницы.
+    """
+
+    cursor_pagination_class = CursorLimitPagination
+
+    def __init__(self) -> None:
+        self.cursor_paginator: Optional[CursorLimitPagination] = None
+
+    def paginate_queryset(
+        self,
+        queryset: QuerySet,
+        request: Request,
+        view: Optional[APIView] = None,
+    ) -> Optional[List[Any]]:
+        """Функция для получения объектов текущей страницы.
+
+        Args:
+            queryset: Объекты для пагинации.
+            request: Передаваемый запрос.
+            view: Представление, для которого выполняется пагинация.
+
+        Returns:
+            Список объектов текущей страницы.
+        """
+        cursor_query_param = self.cursor_pagination_class.cursor_query_param
+        if cursor_query_param in request.query_params:
+            self.cursor_paginator = self.cursor_pagination_class()
+            return self.cursor_paginator.paginate_queryset(
+                queryset,
+                request,
+                view,
+            )
+        self.cursor_paginator = None
+        return super().paginate_queryset(queryset, request, view)
+
+    def get_paginated_response(self, data: List[Any]) -> Response:
+        """Функция для формирования ответа со страницей объектов.
+
+        Args:
+            data: Сериализованные объекты текущей страницы.
+
+        Returns:
+            Ответ со ссылками на соседние страницы и объектами.
+        """
+        if self.cursor_paginator is not None:
+            return self.cursor_paginator.get_paginated_response(data)
+        return super().get_paginated_response(data)
+
+    def get_html_context(self) -> Dict[str, Any]:
+        """Функция для формирования контекста элементов навигации.
+
+        Returns:
+            Контекст для отображения навигации в браузерном API.
+        """
+        if self.cursor_paginator is not None:
+            return self.cursor_paginator.get_html_context()
+        return super().get_html_context()
@@ -0,0 +1,57 @@
+from typing import Any, Mapping, Optional, Union
+
+from rest_framework.renderers import BaseRenderer, JSONRenderer
+
+
+class FileRenderer(BaseRenderer):
+    """Рендерер для действий, самостоятельно формирующих файл.
+
+    Нужен для выбора формата параметром format или заголовком Accept.
+    Готовое содержимое передается без изменений, а данные ответов с
+    ошибками преобразуются в JSON и отдаются с типом содержимого JSON.
+    """
+
+    def render(
+        self,
+        data: Any,
+        accepted_media_type: Optional[str] = None,
+        renderer_context: Optional[Mapping[str, Any]] = None,
+    ) -> Union[bytes, str]:
+        """Функция для преобразования данных ответа.
+
+        Args:
+            data: Данные ответа.
+            accepted_media_type: Выбранный тип содержимого.
+            renderer_context: Контекст формирования ответа.
+
+        Returns:
+            Содержимое ответа.
+        """
+        if isinstance(data, (bytes, str)):
+            return data
+        renderer = JSONRenderer()
+        response = (renderer_context or {}).get('response')
+        if response is not None:
+            response['Content-Type'] = renderer.media_type
+        return renderer.render(data)
+
+
+class PDFRenderer(FileRenderer):
+    """Рендерер файлов в формате PDF."""
+
+    media_type = 'application/pdf'
+    format = 'pdf'
+
+
+class PlainTextRenderer(FileRenderer):
+    """Рендерер файлов в текстовом формате."""
+
+    media_type = 'text/plain'
+    format = 'txt'
+
+
+class CSVRenderer(FileRenderer):
+    """Рендерер файлов в формате CSV."""
+
+    media_type = 'text/csv'
+    format = 'csv'
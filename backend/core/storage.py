@@ -0,0 +1,69 @@
+import hashlib
+from pathlib import PurePosixPath
+from typing import Any, Optional
+
+from django.apps import apps
+from django.core.files import File
+from django.core.files.storage import FileSystemStorage
+from django.db import transaction
+from django.utils.deconstruct import deconstructible
+
+
+@deconstructible
+class ContentHashStorage(FileSystemStorage):
+    """Хранилище, называющее файлы по хешу их содержимого.
+
+    Одинаковые файлы получают одно имя, поэтому повторная загрузка уже
+    сохраненного файла не создает его копию. Если передана модель учета
+    ссылок с уникальным полем name, строка файла блокируется до конца
+    транзакции: удаление файла без ссылок ждет, пока загрузка, повторно
+    использовавшая файл, не зафиксирует свою ссылку.
+    """
+
+    def __init__(
+        self,
+        reference_model: Optional[str] = None,
+        **kwargs: Any,
+    ) -> None:
+        super().__init__(**kwargs)
+        self.reference_model = reference_model
+
+    def _save(self, name: str, content: File) -> str:
+        """Функция для сохранения файла под именем из хеша содержимого.
+
+        Args:
+            name: Исходное имя файла.
+            content: Содержимое файла.
+
+        Returns:
+            Имя сохраненного или уже существующего файла.
+        """
+        digest = hashlib.sha256()
+        for chunk in content.chunks():
+            digest.update(chunk)
+        content.seek(0)
+        path = PurePosixPath(name)
+        name = str(
+            path.with_name(f'{digest.hexdigest()}{path.suffix.lower()}'),
+        )
+        if self.reference_model is None:
+            return self.save_content(name, content)
+        with transaction.atomic():
+            apps.get_model(
+                self.reference_model,
+            ).objects.select_for_update().get_or_create(name=name)
+            return self.save_content(name, content)
+
+    def save_content(self, name: str, content: File) -> str:
+        """Функция для сохранения файла, если его еще нет в хранилище.
+
+        Args:
+            name: Имя файла из хеша содержимого.
+            content: Содержимое файла.
+
+        Returns:
+            Имя сохраненного или уже существующего файла.
+        """
+        if self.exists(name):
+            return name
+        return super()._save(name, content)
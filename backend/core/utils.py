@@ -1,67 +1,316 @@
+import csv
 import io
+import json
+import tempfile
+from functools import lru_cache
+from typing import IO, Any, Callable, Dict, Iterator
 
-from django.db.models import QuerySet
-from django.http import FileResponse
+from django.core.cache import cache
+from django.db.models import Count, F, OuterRef, QuerySet, Subquery
+from django.db.models.functions import Coalesce, Greatest
+from django.http import FileResponse, StreamingHttpResponse
 from reportlab.lib.pagesizes import A4
+from reportlab.lib.utils import simpleSplit
 from reportlab.pdfbase import pdfmetrics
 from reportlab.pdfbase.ttfonts import TTFont
 from reportlab.pdfgen.canvas import Canvas
 
+from core.constants import (
+    SHOPPING_FILE_CACHE_MAX_SIZE,
+    SHOPPING_FILE_CACHE_TIMEOUT,
+    SHOPPING_FILE_MARGIN,
+    SHOPPING_FILE_MAX_MEMORY_SIZE,
+    SHOPPING_FONT_FILE,
+    SHOPPING_FONT_NAME,
+)
 
-def shopping_file(cart: QuerySet) -> FileResponse:
-    """Функция для создания файла со списком покупок.
+
+@lru_cache(maxsize=None)
+def register_shopping_font() -> str:
+    """Функция для однократной регистрации шрифта списка покупок.
+
+    Разбор TTF-файла выполняется один раз за время жизни процесса.
+
+    Returns:
+        Название зарегистрированного шрифта.
+    """
+    pdfmetrics.registerFont(
+        TTFont(SHOPPING_FONT_NAME, SHOPPING_FONT_FILE, 'UTF-8'),
+    )
+    return SHOPPING_FONT_NAME
+
+
+def render_shopping_file(cart: QuerySet) -> IO[bytes]:
+    """Функция для формирования документа со списком покупок.
+
+    Ингредиенты читаются из базы данных порциями, а документ пишется во
+    временный файл, который переносится на диск при превышении
+    SHOPPING_FILE_MAX_MEMORY_SIZE.
 
     Args:
         cart: Список ингредиентов.
 
     Returns:
-        HTTPResponse с файлом списка покупок.
+        Файл с документом, готовый к чтению с начала.
     """
-    buffer = io.BytesIO()
+    font = register_shopping_font()
+    buffer = tempfile.SpooledTemporaryFile(
+        max_size=SHOPPING_FILE_MAX_MEMORY_SIZE,
+    )
+    max_width = A4[0] - 2 * SHOPPING_FILE_MARGIN
     p = Canvas(buffer, pagesize=A4)
-    pdfmetrics.registerFont(TTFont('DejaVuSerif', 'DejaVuSerif.ttf', 'UTF-8'))
-    x_start = 40
+    x_start = SHOPPING_FILE_MARGIN
     y_start = 800
-    p.setFont('DejaVuSerif', 25)
+    p.setFont(font, 25)
     p.drawString(x_start, y_start, 'Список покупок')
     p.line(0, 790, 1000, 790)
-    if not cart:
-        p.setFont('DejaVuSerif', 16)
-        y_start -= 30
-        p.drawString(x_start, y_start, '-список пуст-')
-        p.showPage()
-        p.save()
-        buffer.seek(0)
-        return FileResponse(
-            buffer,
-            as_attachment=True,
-            filename='shopping-list.pdf',
-            content_type='application/pdf charset=utf-8',
+    p.setFont(font, 16)
+    is_empty = True
+    for purchase in cart.iterator():
+        is_empty = False
+        text = ' '.join(
+            [
+                f'·{purchase.get("ingredient__name")}',
+                f'({purchase.get("ingredient__measurement_unit")})-',
+                f'{purchase.get("amount")}',
+            ],
         )
-    p.setFont('DejaVuSerif', 16)
-    for purchase in cart:
         y_start -= 30
-        if y_start < 0:
-            p.showPage()
-            p.setFont('DejaVuSerif', 16)
-            y_start = 800
-        p.drawString(
-            x_start,
-            y_start,
-            ' '.join(
-                [
-                    f'·{purchase.get("ingredient__name")}',
-                    f'({purchase.get("ingredient__measurement_unit")})-',
-                    f'{purchase.get("amount")}',
-                ],
-            ),
-        )
+        for line in simpleSplit(text, font, 16, max_width):
+            if y_start < SHOPPING_FILE_MARGIN:
+                p.showPage()
+                p.setFont(font, 16)
+                y_start = 800
+            p.drawString(x_start, y_start, line)
+            y_start -= 20
+        y_start += 20
+    if is_empty:
+        y_start -= 30
+        p.drawString(x_start, y_start, '-список пуст-')
     p.showPage()
     p.save()
     buffer.seek(0)
+    return buffer  # type: ignore[return-value]
+
+
+def shopping_file_response(file: IO[bytes]) -> FileResponse:
+    """Функция для формирования ответа с файлом списка покупок.
+
+    Args:
+        file: Файл с документом списка покупок.
+
+    Returns:
+        HTTPResponse, отдающий файл списка покупок блоками.
+    """
     return FileResponse(
-        buffer,
+        file,
         as_attachment=True,
         filename='shopping-list.pdf',
         content_type='application/pdf charset=utf-8',
     )
+
+
+def shopping_file(cart: QuerySet) -> FileResponse:
+    """Функция для создания файла со списком покупок.
+
+    Args:
+        cart: Список ингредиентов.
+
+    Returns:
+        HTTPResponse с файлом списка покупок.
+    """
+    return shopping_file_response(render_shopping_file(cart))
+
+
+def cached_shopping_file(cart: QuerySet, cache_key: str) -> FileResponse:
+    """Функция для получения файла со списком покупок из кеша.
+
+    При отсутствии в кеше документ формируется заново и сохраняется в кеш,
+    если его размер не превышает SHOPPING_FILE_CACHE_MAX_SIZE.
+
+    Args:
+        cart: Список ингредиентов.
+        cache_key: Ключ кеша, включающий версию списка покупок.
+
+    Returns:
+        HTTPResponse с файлом списка покупок.
+    """
+    content = cache.get(cache_key)
+    if content is not None:
+        return shopping_file_response(io.BytesIO(content))
+    file = render_shopping_file(cart)
+    if file.seek(0, io.SEEK_END) <= SHOPPING_FILE_CACHE_MAX_SIZE:
+        file.seek(0)
+        cache.set(cache_key, file.read(), SHOPPING_FILE_CACHE_TIMEOUT)
+    file.seek(0)
+    return shopping_file_response(file)
+
+
+def shopping_text_lines(cart: Iterator[Dict[str, Any]]) -> Iterator[str]:
+    """Функция для построчного формирования списка покупок в тексте.
+
+    Args:
+        cart: Итератор ингредиентов списка покупок.
+
+    Yields:
+        Строки текстового списка покупок.
+    """
+    yield 'Список покупок\n'
+    for purchase in cart:
+        yield ' '.join(
+            [
+                f'·{purchase.get("ingredient__name")}',
+                f'({purchase.get("ingredient__measurement_unit")})-',
+                f'{purchase.get("amount")}\n',
+            ],
+        )
+
+
+class EchoBuffer:
+    """Буфер, возвращающий записанную строку вместо ее сохранения."""
+
+    def write(self, value: str) -> str:
+        """Функция для записи строки.
+
+        Args:
+            value: Записываемая строка.
+
+        Returns:
+            Ту же строку.
+        """
+        return value
+
+
+def shopping_csv_lines(cart: Iterator[Dict[str, Any]]) -> Iterator[str]:
+    """Функция для построчного формирования списка покупок в CSV.
+
+    Args:
+        cart: Итератор ингредиентов списка покупок.
+
+    Yields:
+        Строки CSV-файла списка покупок.
+    """
+    writer = csv.writer(EchoBuffer())
+    yield writer.writerow(['name', 'measurement_unit', 'amount'])
+    for purchase in cart:
+        yield writer.writerow(
+            [
+                purchase.get('ingredient__name'),
+                purchase.get('ingredient__measurement_unit'),
+                purchase.get('amount'),
+            ],
+        )
+
+
+def shopping_json_lines(cart: Iterator[Dict[str, Any]]) -> Iterator[str]:
+    """Функция для поэлементного формирования списка покупок в JSON.
+
+    Args:
+        cart: Итератор ингредиентов списка покупок.
+
+    Yields:
+        Части JSON-массива ингредиентов списка покупок.
+    """
+    separator = '['
+    for purchase in cart:
+        yield separator + json.dumps(
+            {
+                'name': purchase.get('ingredient__name'),
+                'measurement_unit': purchase.get(
+                    'ingredient__measurement_unit',
+                ),
+                'amount': purchase.get('amount'),
+            },
+            ensure_ascii=False,
+        )
+        separator = ','
+    yield '[]' if separator == '[' else ']'
+
+
+SHOPPING_STREAM_FORMATS: Dict[
+    str,
+    Callable[[Iterator[Dict[str, Any]]], Iterator[str]],
+] = {
+    'txt': shopping_text_lines,
+    'csv': shopping_csv_lines,
+    'json': shopping_json_lines,
+}
+
+SHOPPING_CONTENT_TYPES = {
+    'txt': 'text/plain; charset=utf-8',
+    'csv': 'text/csv; charset=utf-8',
+    'json': 'application/json',
+}
+
+
+def streaming_shopping_file(
+    cart: QuerySet,
+    file_format: str,
+) -> StreamingHttpResponse:
+    """Функция для потоковой отдачи списка покупок в текстовом формате.
+
+    Ингредиенты читаются из базы данных порциями и сразу отдаются
+    клиенту, не накапливаясь в памяти.
+
+    Args:
+        cart: Список ингредиентов.
+        file_format: Формат файла: txt, csv или json.
+
+    Returns:
+        StreamingHttpResponse с файлом списка покупок.
+    """
+    response = StreamingHttpResponse(
+        SHOPPING_STREAM_FORMATS[file_format](cart.iterator()),
+        content_type=SHOPPING_CONTENT_TYPES[file_format],
+    )
+    response['Content-Disposition'] = (
+        f'attachment; filename="shopping-list.{file_format}"'
+    )
+    return response
+
+
+def normalize_name(name: str) -> str:
+    """Функция для приведения названия к виду для поиска.
+
+    Args:
+        name: Исходное название.
+
+    Returns:
+        Название без учета регистра, в котором буква ё заменена на е.
+    """
+    return name.casefold().replace('ё', 'е')
+
+
+def change_counter(queryset: QuerySet, field: str, delta: int) -> None:
+    """Функция для изменения денормализованного счетчика.
+
+    Счетчик изменяется на стороне базы данных и не опускается ниже нуля.
+
+    Args:
+        queryset: Объекты, счетчик которых изменяется.
+        field: Название поля счетчика.
+        delta: Величина изменения счетчика.
+    """
+    queryset.update(**{field: Greatest(F(field) + delta, 0)})
+
+
+def count_related(queryset: QuerySet, field: str) -> Coalesce:
+    """Функция для подсчета связанных объектов подзапросом.
+
+    Args:
+        queryset: Связанные объекты.
+        field: Название поля связи с внешним объектом.
+
+    Returns:
+        Выражение с количеством связанных объектов.
+    """
+    return Coalesce(
+        Subquery(
+            queryset.filter(**{field: OuterRef('pk')})
+            .order_by()
+            .values(field)
+            .annotate(count=Count('pk'))
+            .values('count'),
+        ),
+        0,
+    )
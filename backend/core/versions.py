@@ -0,0 +1,120 @@
+import time
+from threading import Lock
+from typing import Callable, Dict, Generic, Optional, Tuple, TypeVar
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import F
+
+from core.models import DataVersion
+
+T = TypeVar('T')
+
+_checked_versions: Dict[str, Tuple[float, int]] = {}
+
+
+def get_version(name: str) -> int:
+    """Функция для получения общей для всех процессов версии данных.
+
+    Версия хранится в базе данных, поэтому ее изменение видно всем
+    процессам, включая management-команды. Чтобы не обращаться к базе на
+    каждом запросе, процесс перечитывает версию не чаще одного раза в
+    VERSION_CHECK_INTERVAL секунд. При отсутствии версии она создается из
+    текущего времени, чтобы не совпасть с уже известной версией.
+
+    Args:
+        name: Название версионируемых данных.
+
+    Returns:
+        Текущая версия данных.
+    """
+    now = time.monotonic()
+    checked = _checked_versions.get(name)
+    if checked is not None:
+        checked_at, version = checked
+        if now - checked_at < settings.VERSION_CHECK_INTERVAL:
+            return version
+    version = (
+        DataVersion.objects.filter(name=name)
+        .values_list('version', flat=True)
+        .first()
+    )
+    if version is None:
+        version = DataVersion.objects.get_or_create(
+            name=name,
+            defaults={'version': time.time_ns()},
+        )[0].version
+    _checked_versions[name] = (now, version)
+    return version
+
+
+def bump_version(name: str) -> None:
+    """Функция для изменения версии данных после их изменения.
+
+    Args:
+        name: Название версионируемых данных.
+    """
+    versions = DataVersion.objects.filter(name=name)
+    if not versions.update(version=F('version') + 1):
+        _, created = DataVersion.objects.get_or_create(
+            name=name,
+            defaults={'version': time.time_ns()},
+        )
+        if not created:
+            versions.update(version=F('version') + 1)
+    _checked_versions.pop(name, None)
+
+
+def bump_version_on_commit(name: str) -> None:
+    """Функция для изменения версии данных после коммита транзакции.
+
+    Другие процессы не должны загрузить данные с новой версией раньше,
+    чем изменения станут им видны.
+
+    Args:
+        name: Название версионируемых данных.
+    """
+    transaction.on_commit(lambda: bump_version(name))
+
+
+class VersionedCache(Generic[T]):
+    """Данные текущего процесса, перезагружаемые при изменении версии.
+
+    Данные загружаются при первом обращении и загружаются заново, когда
+    общая для всех процессов версия данных отличается от версии, с которой
+    они были загружены. Если передана функция update, при изменении версии
+    она получает прежние данные и возвращает обновленные вместо полной
+    загрузки.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        load: Callable[[], T],
+        update: Optional[Callable[[T], T]] = None,
+    ) -> None:
+        self.name = name
+        self.load = load
+        self.update = update
+        self.lock = Lock()
+        self.state: Optional[Tuple[int, T]] = None
+
+    def get(self) -> T:
+        """Получение актуальных данных.
+
+        Returns:
+            Данные, загруженные для текущей версии.
+        """
+        version = get_version(self.name)
+        state = self.state
+        if state is not None and state[0] == version:
+            return state[1]
+        with self.lock:
+            state = self.state
+            if state is not None and state[0] == version:
+                return state[1]
+            if state is None or self.update is None:
+                self.state = (version, self.load())
+            else:
+                self.state = (version, self.update(state[1]))
+            return self.state[1]
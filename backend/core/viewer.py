@@ -0,0 +1,124 @@
+from typing import FrozenSet, Iterable, Tuple
+
+from django.db.models import IntegerField, Value
+from django.http import HttpRequest
+
+from recipes.models import Favorite, Purchase
+from users.models import Following
+
+FAVORITE = 0
+PURCHASE = 1
+FOLLOWING = 2
+
+VIEWER_CONTEXT_ATTRIBUTE = '_viewer_context'
+
+
+class ViewerContext:
+    """Состояние текущего пользователя: избранное, покупки и подписки."""
+
+    def __init__(
+        self,
+        favorite_ids: FrozenSet[int] = frozenset(),
+        cart_ids: FrozenSet[int] = frozenset(),
+        following_ids: FrozenSet[int] = frozenset(),
+    ) -> None:
+        self.favorite_ids = favorite_ids
+        self.cart_ids = cart_ids
+        self.following_ids = following_ids
+
+    @classmethod
+    def from_rows(cls, rows: Iterable[Tuple[int, int]]) -> 'ViewerContext':
+        """Создание состояния из строк вида (тип связи, id объекта).
+
+        Args:
+            rows: Пары из типа связи и id связанного объекта.
+
+        Returns:
+            Состояние пользователя.
+        """
+        ids: Tuple[set, set, set] = (set(), set(), set())
+        for kind, object_id in rows:
+            ids[kind].add(object_id)
+        return cls(*(frozenset(group) for group in ids))
+
+    def is_favorited(self, recipe_id: int) -> bool:
+        """Проверка наличия рецепта в избранном.
+
+        Args:
+            recipe_id: id рецепта.
+
+        Returns:
+            True, если рецепт в избранном пользователя.
+        """
+        return recipe_id in self.favorite_ids
+
+    def is_in_shopping_cart(self, recipe_id: int) -> bool:
+        """Проверка наличия рецепта в списке покупок.
+
+        Args:
+            recipe_id: id рецепта.
+
+        Returns:
+            True, если рецепт в списке покупок пользователя.
+        """
+        return recipe_id in self.cart_ids
+
+    def is_subscribed(self, author_id: int) -> bool:
+        """Проверка подписки на автора.
+
+        Args:
+            author_id: id автора.
+
+        Returns:
+            True, если пользователь подписан на автора.
+        """
+        return author_id in self.following_ids
+
+
+def load_viewer_context(user_id: int) -> ViewerContext:
+    """Загрузка состояния пользователя одним запросом к базе данных.
+
+    Args:
+        user_id: id пользователя.
+
+    Returns:
+        Состояние пользователя.
+    """
+    favorites = (
+        Favorite.objects.filter(user_id=user_id)
+        .annotate(kind=Value(FAVORITE, output_field=IntegerField()))
+        .values_list('kind', 'recipe_id')
+    )
+    purchases = (
+        Purchase.objects.filter(user_id=user_id)
+        .annotate(kind=Value(PURCHASE, output_field=IntegerField()))
+        .values_list('kind', 'recipe_id')
+    )
+    followings = (
+        Following.objects.filter(user_id=user_id)
+        .annotate(kind=Value(FOLLOWING, output_field=IntegerField()))
+        .values_list('kind', 'following_id')
+    )
+    return ViewerContext.from_rows(
+        favorites.union(purchases, followings, all=True),
+    )
+
+
+def get_viewer_context(request: HttpRequest) -> ViewerContext:
+    """Получение состояния пользователя, закешированного на запросе.
+
+    Args:
+        request: Передаваемый запрос.
+
+    Returns:
+        Состояние пользователя, выполнившего запрос.
+    """
+    context = getattr(request, VIEWER_CONTEXT_ATTRIBUTE, None)
+    if context is None:
+        user = request.user
+        if user.is_authenticated:
+            context = load_viewer_context(user.id)
+        else:
+            context = ViewerContext()
+        setattr(request, VIEWER_CONTEXT_ATTRIBUTE, context)
+    return context
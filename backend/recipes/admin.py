@@ -1,7 +1,14 @@
+from typing import Any
+
 from django.contrib import admin
+from django.forms import ModelForm
+from django.http import HttpRequest
 from django.utils.safestring import SafeString, mark_safe
 
+from recipes.cart import change_recipe_in_carts, get_recipe_amounts
+from recipes.index import recipe_ingredients_changed
 from recipes.models import Ingredient, Recipe, RecipeIngredient, Tag
+from recipes.similarity import index_recipe
 
 
 @admin.register(Ingredient)
@@ -105,7 +112,7 @@ class RecipeAdmin(admin.ModelAdmin):
         Returns:
             Количество добавлений рецепта в избранное.
         """
-        return obj.favorites.all().count()
+        return obj.favorites_count
 
     @admin.display(description='Изображение')
     def show_image(self, obj: Recipe) -> SafeString:
@@ -117,4 +124,35 @@ class RecipeAdmin(admin.ModelAdmin):
         Returns:
             Количество добавлений рецепта в избранное.
         """
-        return mark_safe(f'<img src={obj.image.url} width="80" height="60">')
+        image = obj.image_thumbnail or obj.image
+        return mark_safe(f'<img src={image.url} width="80" height="60">')
+
+    def save_related(
+        self,
+        request: HttpRequest,
+        form: ModelForm,
+        formsets: Any,
+        change: bool,
+    ) -> None:
+        """Обновление индексов и списков покупок после сохранения рецепта.
+
+        Args:
+            request: Передаваемый запрос.
+            form: Форма рецепта.
+            formsets: Формы связанных моделей.
+            change: Рецепт изменен, а не создан.
+        """
+        recipe = form.instance
+        old_amounts = get_recipe_amounts(recipe.id) if change else {}
+        super().save_related(request, form, formsets, change)
+        if change:
+            change_recipe_in_carts(
+                recipe.id,
+                old_amounts,
+                get_recipe_amounts(recipe.id),
+            )
+        index_recipe(
+            recipe.id,
+            recipe.recipe_ingredient.values_list('ingredient_id', flat=True),
+        )
+        recipe_ingredients_changed([recipe.id])
@@ -6,3 +6,7 @@ class RecipesConfig(AppConfig):
 
     name = 'recipes'
     verbose_name = 'рецепты'
+
+    def ready(self) -> None:
+        """Подключение обработчиков сигналов приложения."""
+        from recipes import signals  # noqa: F401
@@ -0,0 +1,197 @@
+from collections import Counter, defaultdict
+from typing import Any, Dict, Iterable, Mapping, Optional
+
+from django.db import transaction
+from django.db.models import F, Sum
+
+from recipes.models import CartIngredient, Purchase, RecipeIngredient
+from users.models import User
+
+IngredientAmounts = Mapping[int, int]
+
+
+def get_recipe_amounts(recipe_id: int) -> Dict[int, int]:
+    """Функция для получения количества ингредиентов рецепта.
+
+    Args:
+        recipe_id: id рецепта.
+
+    Returns:
+        Словарь вида {id ингредиента: количество}.
+    """
+    return dict(
+        RecipeIngredient.objects.filter(recipe_id=recipe_id).values_list(
+            'ingredient_id',
+            'amount',
+        ),
+    )
+
+
+def bump_cart_versions(user_ids: Iterable[int]) -> None:
+    """Функция для изменения версии списков покупок пользователей.
+
+    Args:
+        user_ids: id пользователей, списки покупок которых изменились.
+    """
+    User.objects.filter(id__in=user_ids).update(
+        shopping_cart_version=F('shopping_cart_version') + 1,
+    )
+
+
+def apply_cart_deltas(
+    user_ids: Iterable[int],
+    deltas: IngredientAmounts,
+) -> None:
+    """Функция для изменения списков покупок пользователей на разницу.
+
+    Пользователи блокируются в порядке возрастания id, поэтому
+    параллельные изменения одного списка выполняются последовательно.
+
+    Args:
+        user_ids: id пользователей, списки покупок которых изменяются.
+        deltas: Словарь вида {id ингредиента: изменение количества}.
+    """
+    deltas = {
+        ingredient_id: delta
+        for ingredient_id, delta in deltas.items()
+        if delta
+    }
+    user_ids = sorted(set(user_ids))
+    if not deltas or not user_ids:
+        return
+    with transaction.atomic():
+        list(
+            User.objects.select_for_update()
+            .filter(id__in=user_ids)
+            .order_by('id')
+            .values_list('id', flat=True),
+        )
+        existing = {
+            (item.user_id, item.ingredient_id): item
+            for item in CartIngredient.objects.filter(
+                user_id__in=user_ids,
+                ingredient_id__in=deltas,
+            )
+        }
+        to_create, to_update, to_delete = [], [], []
+        for user_id in user_ids:
+            for ingredient_id, delta in deltas.items():
+                item = existing.get((user_id, ingredient_id))
+                if item is None:
+                    if delta > 0:
+                        to_create.append(
+                            CartIngredient(
+                                user_id=user_id,
+                                ingredient_id=ingredient_id,
+                                amount=delta,
+                            ),
+                        )
+                    continue
+                item.amount += delta
+                if item.amount > 0:
+                    to_update.append(item)
+                else:
+                    to_delete.append(item.id)
+        CartIngredient.objects.bulk_create(to_create)
+        CartIngredient.objects.bulk_update(to_update, ['amount'])
+        CartIngredient.objects.filter(id__in=to_delete).delete()
+        bump_cart_versions(user_ids)
+
+
+def add_recipe_to_cart(user_id: int, recipe_id: int) -> None:
+    """Функция для добавления ингредиентов рецепта в список покупок.
+
+    Args:
+        user_id: id пользователя.
+        recipe_id: id добавленного рецепта.
+    """
+    apply_cart_deltas([user_id], get_recipe_amounts(recipe_id))
+
+
+def remove_recipe_from_cart(user_id: int, recipe_id: int) -> None:
+    """Функция для удаления ингредиентов рецепта из списка покупок.
+
+    Args:
+        user_id: id пользователя.
+        recipe_id: id удаленного рецепта.
+    """
+    apply_cart_deltas(
+        [user_id],
+        {
+            ingredient_id: -amount
+            for ingredient_id, amount in get_recipe_amounts(
+                recipe_id,
+            ).items()
+        },
+    )
+
+
+def change_recipe_in_carts(
+    recipe_id: int,
+    old_amounts: IngredientAmounts,
+    new_amounts: IngredientAmounts,
+) -> None:
+    """Функция для учета изменения ингредиентов рецепта в списках покупок.
+
+    Args:
+        recipe_id: id измененного рецепта.
+        old_amounts: Ингредиенты рецепта до изменения.
+        new_amounts: Ингредиенты рецепта после изменения.
+    """
+    deltas = Counter(new_amounts)
+    deltas.subtract(old_amounts)
+    if not any(deltas.values()):
+        return
+    apply_cart_deltas(
+        Purchase.objects.filter(recipe_id=recipe_id).values_list(
+            'user_id',
+            flat=True,
+        ),
+        deltas,
+    )
+
+
+def rebuild_carts(user_ids: Optional[Iterable[int]] = None) -> int:
+    """Функция для пересчета списков покупок с нуля.
+
+    Args:
+        user_ids: id пользователей, списки которых пересчитываются.
+            Если не переданы, пересчитываются списки всех пользователей.
+
+    Returns:
+        Количество строк пересчитанных списков покупок.
+    """
+    purchases: Dict[str, Any] = {'recipe__purchases__isnull': False}
+    carts = CartIngredient.objects.all()
+    users = User.objects.all()
+    if user_ids is not None:
+        user_ids = list(user_ids)
+        purchases = {'recipe__purchases__user_id__in': user_ids}
+        carts = carts.filter(user_id__in=user_ids)
+        users = users.filter(id__in=user_ids)
+    items = RecipeIngredient.objects.filter(**purchases)
+    totals: Dict[int, Dict[int, int]] = defaultdict(dict)
+    for user_id, ingredient_id, amount in (
+        items.values_list('recipe__purchases__user_id', 'ingredient_id')
+        .annotate(total=Sum('amount'))
+        .order_by()
+        .iterator()
+    ):
+        totals[user_id][ingredient_id] = amount
+    with transaction.atomic():
+        carts.delete()
+        users.update(shopping_cart_version=F('shopping_cart_version') + 1)
+        return len(
+            CartIngredient.objects.bulk_create(
+                (
+                    CartIngredient(
+                        user_id=user_id,
+                        ingredient_id=ingredient_id,
+                        amount=amount,
+                    )
+                    for user_id, amounts in totals.items()
+                    for ingredient_id, amount in amounts.items()
+                ),
+                batch_size=1000,
+            ),
+        )
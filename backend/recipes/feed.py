@@ -0,0 +1,203 @@
+from typing import Iterable, List, Optional
+
+from django.db import connection, transaction
+from django.db.models import F, Q, QuerySet, Window
+from django.db.models.functions import RowNumber
+
+from core.constants import FEED_FANOUT_LIMIT, FEED_MAX_LENGTH
+from recipes.importers import batched
+from recipes.models import FeedEntry, Recipe
+from users.models import Following, User
+
+FEED_BATCH_SIZE = 1000
+
+FEED_ORDERING = ('-feed_created', '-id')
+
+
+def is_fanout_author(followers_count: int) -> bool:
+    """Проверка, рассылаются ли рецепты автора в ленты подписчиков.
+
+    Рецепты авторов с большим количеством подписчиков не записываются в
+    ленты, а выбираются при чтении ленты.
+
+    Args:
+        followers_count: Количество подписчиков автора.
+
+    Returns:
+        True, если рецепты автора записываются в ленты подписчиков.
+    """
+    return followers_count <= FEED_FANOUT_LIMIT
+
+
+def trim_feeds(user_ids: Iterable[int]) -> None:
+    """Функция для удаления из лент записей сверх максимальной длины.
+
+    Записи каждой ленты нумеруются оконной функцией, и записи с номером
+    больше FEED_MAX_LENGTH удаляются одним запросом.
+
+    Args:
+        user_ids: id пользователей, ленты которых обрезаются.
+    """
+    user_ids = list(user_ids)
+    if not user_ids:
+        return
+    query, params = (
+        FeedEntry.objects.filter(user_id__in=user_ids)
+        .annotate(
+            position=Window(
+                RowNumber(),
+                partition_by=[F('user_id')],
+                order_by=[F('created').desc(), F('recipe_id').desc()],
+            ),
+        )
+        .values('id', 'position')
+        .order_by()
+        .query.sql_with_params()
+    )
+    with connection.cursor() as cursor:
+        cursor.execute(
+            f'DELETE FROM {FeedEntry._meta.db_table} WHERE id IN'
+            f' (SELECT id FROM ({query}) AS ranked WHERE position > %s)',
+            (*params, FEED_MAX_LENGTH),
+        )
+
+
+def add_to_feeds(recipes: Iterable[Recipe], user_ids: Iterable[int]) -> None:
+    """Функция для записи рецептов в ленты пользователей.
+
+    Args:
+        recipes: Рецепты, записываемые в ленты.
+        user_ids: id пользователей.
+    """
+    recipes = list(recipes)
+    for batch in batched(user_ids, FEED_BATCH_SIZE):
+        with transaction.atomic():
+            FeedEntry.objects.bulk_create(
+                (
+                    FeedEntry(
+                        user_id=user_id,
+                        recipe_id=recipe.id,
+                        created=recipe.created,
+                    )
+                    for user_id in batch
+                    for recipe in recipes
+                ),
+                batch_size=FEED_BATCH_SIZE,
+                ignore_conflicts=True,
+            )
+            trim_feeds(batch)
+
+
+def fan_out_recipe(recipe: Recipe) -> None:
+    """Функция для записи нового рецепта в ленты подписчиков автора.
+
+    Args:
+        recipe: Опубликованный рецепт.
+    """
+    followers_count = (
+        User.objects.filter(id=recipe.author_id)
+        .values_list('followers_count', flat=True)
+        .first()
+    )
+    if followers_count is None or not is_fanout_author(followers_count):
+        return
+    add_to_feeds(
+        [recipe],
+        Following.objects.filter(following_id=recipe.author_id)
+        .values_list('user_id', flat=True)
+        .iterator(),
+    )
+
+
+def backfill_feed(user_id: int, author_id: int) -> None:
+    """Функция для записи последних рецептов автора в ленту подписчика.
+
+    Args:
+        user_id: id подписавшегося пользователя.
+        author_id: id автора.
+    """
+    author = User.objects.filter(id=author_id).only('followers_count').first()
+    if author is None or not is_fanout_author(author.followers_count):
+        return
+    recipes = Recipe.objects.filter(author_id=author_id).only('id', 'created')
+    add_to_feeds(recipes[:FEED_MAX_LENGTH], [user_id])
+
+
+def remove_from_feed(user_id: int, author_id: int) -> None:
+    """Функция для удаления рецептов автора из ленты бывшего подписчика.
+
+    Args:
+        user_id: id отписавшегося пользователя.
+        author_id: id автора.
+    """
+    FeedEntry.objects.filter(
+        user_id=user_id,
+        recipe__author_id=author_id,
+    ).delete()
+
+
+def rebuild_feeds(user_ids: Optional[Iterable[int]] = None) -> int:
+    """Функция для пересоздания лент с нуля.
+
+    Args:
+        user_ids: id пользователей, ленты которых пересоздаются.
+            Если не переданы, пересоздаются ленты всех пользователей.
+
+    Returns:
+        Количество записей пересозданных лент.
+    """
+    followings = Following.objects.filter(
+        following__followers_count__lte=FEED_FANOUT_LIMIT,
+    )
+    if user_ids is not None:
+        user_ids = list(user_ids)
+        followings = followings.filter(user_id__in=user_ids)
+    counter = 0
+    with transaction.atomic():
+        entries = FeedEntry.objects.all()
+        if user_ids is not None:
+            entries = entries.filter(user_id__in=user_ids)
+        entries.delete()
+        for user_id in followings.values_list('user_id', flat=True).distinct():
+            recipes: List[Recipe] = list(
+                Recipe.objects.filter(
+                    author__followers__user_id=user_id,
+                    author__followers_count__lte=FEED_FANOUT_LIMIT,
+                ).only('id', 'created')[:FEED_MAX_LENGTH],
+            )
+            add_to_feeds(recipes, [user_id])
+            counter += len(recipes)
+    return counter
+
+
+def get_feed(user: User) -> QuerySet:
+    """Функция для получения ленты рецептов пользователя.
+
+    Рецепты авторов с небольшим количеством подписчиков читаются из
+    записей ленты, а рецепты остальных авторов, на которых подписан
+    пользователь, выбираются напрямую. Рецепты упорядочены по полю
+    feed_created: если лента состоит только из записей, это дата записи,
+    поэтому порядок и курсор обслуживаются индексом записей ленты.
+
+    Args:
+        user: Пользователь, ленту которого нужно получить.
+
+    Returns:
+        Queryset рецептов ленты.
+    """
+    large_authors = list(
+        Following.objects.filter(
+            user=user,
+            following__followers_count__gt=FEED_FANOUT_LIMIT,
+        ).values_list('following_id', flat=True),
+    )
+    if not large_authors:
+        recipes = Recipe.objects.filter(feed_entries__user=user).annotate(
+            feed_created=F('feed_entries__created'),
+        )
+    else:
+        recipes = Recipe.objects.filter(
+            Q(id__in=FeedEntry.objects.filter(user=user).values('recipe_id'))
+            | Q(author_id__in=large_authors),
+        ).annotate(feed_created=F('created'))
+    return recipes.order_by(*FEED_ORDERING)
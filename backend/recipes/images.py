@@ -0,0 +1,223 @@
+import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from io import BytesIO
+from pathlib import PurePosixPath
+from typing import Dict, Optional, Tuple
+
+from django.conf import settings
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from django.db import connections, transaction
+from django.db.models import F
+from PIL import Image, ImageOps, features
+
+from core.constants import IMAGE_VARIANT_QUALITY, IMAGE_VARIANT_SIZES
+from recipes.models import Recipe, StoredImage
+
+logger = logging.getLogger(__name__)
+
+IMAGE_VARIANT_FIELDS = {
+    variant: f'image_{variant}' for variant in IMAGE_VARIANT_SIZES
+}
+
+_executor: Optional[ThreadPoolExecutor] = None
+_executor_lock = threading.Lock()
+
+
+def get_variant_format() -> Tuple[str, str]:
+    """Функция для выбора формата уменьшенных копий картинок.
+
+    Returns:
+        Формат Pillow и расширение файла: WebP, если Pillow собран с его
+        поддержкой, иначе JPEG.
+    """
+    if features.check('webp'):
+        return 'WEBP', 'webp'
+    return 'JPEG', 'jpg'
+
+
+def render_variant(image: Image.Image, size: Tuple[int, int]) -> bytes:
+    """Функция для создания уменьшенной копии картинки.
+
+    Args:
+        image: Исходная картинка.
+        size: Максимальные ширина и высота копии.
+
+    Returns:
+        Содержимое файла копии.
+    """
+    variant = image.copy()
+    variant.thumbnail(size, Image.LANCZOS)
+    file_format, _ = get_variant_format()
+    buffer = BytesIO()
+    variant.save(buffer, file_format, quality=IMAGE_VARIANT_QUALITY)
+    return buffer.getvalue()
+
+
+def get_variant_names(image_name: str) -> Dict[str, str]:
+    """Функция для получения имен файлов уменьшенных копий картинки.
+
+    Имена копий образуются из имени исходной картинки, поэтому копии
+    одинаковых картинок тоже хранятся в одном экземпляре.
+
+    Args:
+        image_name: Имя файла исходной картинки.
+
+    Returns:
+        Словарь вида {поле модели рецепта: имя файла копии}.
+    """
+    _, extension = get_variant_format()
+    path = PurePosixPath(image_name)
+    return {
+        field: str(path.with_name(f'{path.stem}_{variant}.{extension}'))
+        for variant, field in IMAGE_VARIANT_FIELDS.items()
+    }
+
+
+def process_recipe_image(recipe_id: int, image_name: str) -> None:
+    """Функция для создания уменьшенных копий картинки рецепта.
+
+    Уже существующие копии не создаются повторно. Если за время обработки
+    картинка рецепта изменилась, копии не сохраняются в рецепте.
+
+    Args:
+        recipe_id: id рецепта.
+        image_name: Имя файла картинки, для которой создаются копии.
+    """
+    names = get_variant_names(image_name)
+    missing = {
+        field: name
+        for field, name in names.items()
+        if not default_storage.exists(name)
+    }
+    if missing:
+        with default_storage.open(image_name) as file:
+            with Image.open(file) as original:
+                image = ImageOps.exif_transpose(original).convert('RGB')
+        for variant, field in IMAGE_VARIANT_FIELDS.items():
+            if field in missing:
+                names[field] = default_storage.save(
+                    missing[field],
+                    ContentFile(
+                        render_variant(image, IMAGE_VARIANT_SIZES[variant]),
+                    ),
+                )
+    Recipe.objects.filter(id=recipe_id, image=image_name).update(**names)
+
+
+def delete_image_files(image_name: str) -> None:
+    """Функция для удаления картинки и ее копий из хранилища.
+
+    Строка картинки блокируется на время удаления, поэтому загрузка того же
+    файла ждет его удаления, а удаление ждет фиксации загрузки. Файлы не
+    удаляются, если на картинку снова появились ссылки.
+
+    Args:
+        image_name: Имя файла исходной картинки.
+    """
+    with transaction.atomic():
+        image = (
+            StoredImage.objects.select_for_update()
+            .filter(name=image_name)
+            .first()
+        )
+        if image is not None and image.references > 0:
+            return
+        for name in (image_name, *get_variant_names(image_name).values()):
+            default_storage.delete(name)
+        if image is not None:
+            image.delete()
+
+
+def acquire_image(image_name: str) -> None:
+    """Функция для учета новой ссылки рецепта на картинку.
+
+    Args:
+        image_name: Имя файла картинки.
+    """
+    StoredImage.objects.get_or_create(name=image_name)
+    StoredImage.objects.filter(name=image_name).update(
+        references=F('references') + 1,
+    )
+
+
+def release_image(image_name: str) -> None:
+    """Функция для удаления ссылки рецепта на картинку.
+
+    Когда ссылок на картинку не остается, ее файлы удаляются после
+    фиксации транзакции. Строка картинки с нулем ссылок остается до
+    удаления файлов, чтобы на ней можно было взять блокировку.
+
+    Args:
+        image_name: Имя файла картинки.
+    """
+    with transaction.atomic():
+        image = (
+            StoredImage.objects.select_for_update()
+            .filter(name=image_name)
+            .first()
+        )
+        if image is None:
+            return
+        image.references = max(image.references - 1, 0)
+        image.save(update_fields=['references'])
+        if not image.references:
+            transaction.on_commit(lambda: delete_image_files(image_name))
+
+
+def run_image_processing(recipe_id: int, image_name: str) -> None:
+    """Функция для обработки картинки в потоке пула.
+
+    Args:
+        recipe_id: id рецепта.
+        image_name: Имя файла картинки.
+    """
+    try:
+        process_recipe_image(recipe_id, image_name)
+    except Exception:
+        logger.exception('Не удалось обработать картинку %s', image_name)
+    finally:
+        connections.close_all()
+
+
+def get_executor() -> ThreadPoolExecutor:
+    """Функция для получения пула потоков обработки картинок.
+
+    Returns:
+        Пул потоков, создаваемый при первом обращении.
+    """
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            _executor = ThreadPoolExecutor(
+                max_workers=settings.IMAGE_PROCESSING_WORKERS,
+                thread_name_prefix='recipe-images',
+            )
+        return _executor
+
+
+def schedule_image_processing(recipe: Recipe) -> None:
+    """Функция для постановки картинки рецепта в очередь обработки.
+
+    Обработка начинается после фиксации транзакции, чтобы поток видел
+    сохраненный рецепт. Если пул потоков отключен, копии создаются сразу.
+
+    Args:
+        recipe: Рецепт с новой картинкой.
+    """
+    if not recipe.image:
+        return
+    recipe_id, image_name = recipe.id, recipe.image.name
+    if settings.IMAGE_PROCESSING_WORKERS > 0:
+        transaction.on_commit(
+            lambda: get_executor().submit(
+                run_image_processing,
+                recipe_id,
+                image_name,
+            ),
+        )
+    else:
+        transaction.on_commit(
+            lambda: process_recipe_image(recipe_id, image_name),
+        )
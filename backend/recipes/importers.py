@@ -0,0 +1,200 @@
+import csv
+import json
+import time
+from abc import ABC, abstractmethod
+from itertools import chain, islice
+from pathlib import Path
+from typing import IO, Any, Dict, Iterable, Iterator, List, Sequence, Tuple
+
+from django.conf import settings
+from django.core.management.base import (
+    BaseCommand,
+    CommandError,
+    CommandParser,
+)
+
+CatalogRow = Dict[str, Any]
+
+READ_CHUNK_SIZE = 64 * 1024
+
+JSON_SEPARATORS = ', \t\r\n'
+
+
+def read_csv(file: IO[str], fields: Sequence[str]) -> Iterator[CatalogRow]:
+    """Функция для построчного чтения CSV-файла без заголовка.
+
+    Args:
+        file: Открытый файл.
+        fields: Названия полей в порядке столбцов.
+
+    Yields:
+        Словари с данными строк.
+    """
+    for row in csv.reader(file):
+        if row:
+            yield dict(zip(fields, row))
+
+
+def read_json(file: IO[str]) -> Iterator[CatalogRow]:
+    """Функция для поэлементного чтения JSON-массива объектов.
+
+    Файл читается блоками, поэтому в памяти не хранится весь массив.
+
+    Args:
+        file: Открытый файл.
+
+    Yields:
+        Словари с данными элементов массива.
+
+    Raises:
+        CommandError: Если файл не содержит JSON-массив объектов.
+    """
+    decoder = json.JSONDecoder()
+    buffer = file.read(READ_CHUNK_SIZE).lstrip()
+    if not buffer.startswith('['):
+        raise CommandError('Ожидался JSON-массив объектов')
+    buffer = buffer[1:]
+    for chunk in chain([''], iter(lambda: file.read(READ_CHUNK_SIZE), '')):
+        buffer = (buffer + chunk).lstrip(JSON_SEPARATORS)
+        while buffer and not buffer.startswith(']'):
+            try:
+                row, end = decoder.raw_decode(buffer)
+            except json.JSONDecodeError:
+                break
+            if not isinstance(row, dict):
+                raise CommandError('Ожидался JSON-массив объектов')
+            yield row
+            buffer = buffer[end:].lstrip(JSON_SEPARATORS)
+        if buffer.startswith(']'):
+            return
+    raise CommandError('Некорректный JSON-файл')
+
+
+def batched(rows: Iterable[CatalogRow], size: int) -> Iterator[List]:
+    """Функция для разбиения строк на порции.
+
+    Args:
+        rows: Итератор строк.
+        size: Размер порции.
+
+    Yields:
+        Списки строк длиной не более size.
+    """
+    iterator = iter(rows)
+    while True:
+        batch = list(islice(iterator, size))
+        if not batch:
+            return
+        yield batch
+
+
+class CatalogImportCommand(ABC, BaseCommand):
+    """Базовая команда для пакетного импорта справочника из файла.
+
+    Файл читается потоком и обрабатывается порциями, каждая из которых
+    записывается в базу данных одним пакетным запросом.
+    """
+
+    file_name = ''
+    fields: Sequence[str] = ()
+
+    def add_arguments(self, parser: CommandParser) -> None:
+        """Функция для добавления аргументов команды.
+
+        Args:
+            parser: Парсер аргументов команды.
+        """
+        parser.add_argument(
+            '--path',
+            help='Путь к файлу в формате CSV или JSON',
+        )
+        parser.add_argument(
+            '--format',
+            choices=('csv', 'json'),
+            dest='file_format',
+            help='Формат файла, по умолчанию определяется по расширению',
+        )
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=1000,
+            help='Количество строк, записываемых за один запрос',
+        )
+
+    def read_rows(self, file: IO[str], file_format: str) -> Iterator:
+        """Функция для чтения строк файла.
+
+        Args:
+            file: Открытый файл.
+            file_format: Формат файла.
+
+        Returns:
+            Итератор словарей с данными строк.
+        """
+        if file_format == 'json':
+            return read_json(file)
+        return read_csv(file, self.fields)
+
+    def prepare(self, options: Dict[str, Any]) -> None:
+        """Функция для загрузки существующих записей перед импортом.
+
+        Args:
+            options: Именованные аргументы команды.
+        """
+
+    @abstractmethod
+    def import_batch(
+        self,
+        rows: List[CatalogRow],
+        options: Dict[str, Any],
+    ) -> Tuple[int, int]:
+        """Функция для записи порции строк в базу данных.
+
+        Args:
+            rows: Порция строк.
+            options: Именованные аргументы команды.
+
+        Returns:
+            Количество созданных и измененных строк.
+        """
+
+    def finish(self) -> None:
+        """Функция, вызываемая после успешного импорта."""
+
+    def handle(self, *args: Any, **options: Any) -> None:
+        """Функция для импорта справочника из файла.
+
+        Args:
+            *args: Передаваемые позиционные аргументы.
+            **options: Передаваемые именованные аргументы.
+        """
+        path = Path(
+            options['path']
+            or f'{settings.DATA_IMPORT_LOCATION}/{self.file_name}',
+        )
+        file_format = options['file_format'] or path.suffix.lstrip('.')
+        if file_format not in ('csv', 'json'):
+            raise CommandError(f'Неизвестный формат файла: {path}')
+        print('Importing data from:', path)  # noqa: T201
+        started = time.perf_counter()
+        total = created = updated = 0
+        self.prepare(options)
+        with open(path, 'r', encoding='utf-8-sig') as file:
+            for batch in batched(
+                self.read_rows(file, file_format),
+                options['batch_size'],
+            ):
+                batch_created, batch_updated = self.import_batch(
+                    batch,
+                    options,
+                )
+                total += len(batch)
+                created += batch_created
+                updated += batch_updated
+        self.finish()
+        elapsed = time.perf_counter() - started
+        print(  # noqa: T201
+            f'Import complete, read {total} rows, created {created},',
+            f'updated {updated} in {elapsed:.2f} s',
+            f'({total / max(elapsed, 1e-9):.0f} rows/s)',
+        )
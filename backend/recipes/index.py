@@ -0,0 +1,389 @@
+import copy
+from collections import defaultdict
+from functools import reduce
+from operator import and_, or_
+from typing import (
+    AbstractSet,
+    Dict,
+    FrozenSet,
+    Iterable,
+    List,
+    Mapping,
+    Set,
+    Tuple,
+)
+
+from django.db.models import Max, Min
+
+from core.versions import VersionedCache, bump_version_on_commit
+from recipes.models import RecipeIngredient, RecipeIngredientChange
+
+RECIPE_INGREDIENTS_VERSION = 'recipe-ingredients'
+
+RECIPE_CHANGES_KEPT = 10000
+
+RECIPE_CHANGES_OVERLAP = 100
+
+RECIPE_CHANGES_MAX_APPLIED = 1000
+
+
+def to_bitmap(ids: Iterable[int]) -> int:
+    """Функция для упаковки набора id в битовую карту.
+
+    Args:
+        ids: Неотрицательные id.
+
+    Returns:
+        Число, в котором установлены биты с номерами из ids.
+    """
+    ids = list(ids)
+    if not ids:
+        return 0
+    bits = bytearray(max(ids) // 8 + 1)
+    for value in ids:
+        bits[value >> 3] |= 1 << (value & 7)
+    return int.from_bytes(bits, 'little')
+
+
+def from_bitmap(bitmap: int) -> List[int]:
+    """Функция для распаковки битовой карты в список id.
+
+    Args:
+        bitmap: Битовая карта.
+
+    Returns:
+        Отсортированный список номеров установленных битов.
+    """
+    return [
+        value for value, bit in enumerate(bin(bitmap)[:1:-1]) if bit == '1'
+    ]
+
+
+def count_bits(bitmaps: Iterable[int]) -> List[int]:
+    """Функция для поразрядного подсчета вхождений в битовые карты.
+
+    Для каждого номера бита считается, в скольких картах он установлен.
+    Счетчики хранятся по разрядам: i-я карта результата содержит i-й
+    двоичный разряд счетчика для всех номеров сразу.
+
+    Args:
+        bitmaps: Битовые карты.
+
+    Returns:
+        Разряды счетчиков от младшего к старшему.
+    """
+    slices: List[int] = []
+    for bitmap in bitmaps:
+        carry = bitmap
+        for level, value in enumerate(slices):
+            if not carry:
+                break
+            slices[level] = value ^ carry
+            carry &= value
+        else:
+            if carry:
+                slices.append(carry)
+    return slices
+
+
+def at_least(slices: List[int], threshold: int) -> int:
+    """Функция для выбора номеров, счетчик которых не меньше порога.
+
+    Args:
+        slices: Разряды счетчиков из count_bits.
+        threshold: Порог счетчика.
+
+    Returns:
+        Битовую карту подходящих номеров. Если подходят все номера,
+        возвращается -1, у которого установлены все биты.
+    """
+    if threshold <= 0:
+        return -1
+    if threshold >> len(slices):
+        return 0
+    greater, equal = 0, -1
+    for level in reversed(range(len(slices))):
+        if threshold >> level & 1:
+            equal &= slices[level]
+        else:
+            greater |= equal & slices[level]
+            equal &= ~slices[level]
+    return greater | equal
+
+
+def set_bit(bitmaps: Dict[int, int], key: int, bit: int) -> None:
+    """Функция для установки бита в битовой карте словаря.
+
+    Args:
+        bitmaps: Словарь битовых карт.
+        key: Ключ изменяемой карты.
+        bit: Устанавливаемый бит.
+    """
+    bitmaps[key] = bitmaps.get(key, 0) | bit
+
+
+def clear_bit(bitmaps: Dict[int, int], key: int, bit: int) -> None:
+    """Функция для сброса бита в битовой карте словаря.
+
+    Пустые карты удаляются из словаря.
+
+    Args:
+        bitmaps: Словарь битовых карт.
+        key: Ключ изменяемой карты.
+        bit: Сбрасываемый бит.
+    """
+    bitmap = bitmaps.get(key, 0) & ~bit
+    if bitmap:
+        bitmaps[key] = bitmap
+    else:
+        bitmaps.pop(key, None)
+
+
+class RecipeIngredientIndex:
+    """Инвертированный индекс рецептов по ингредиентам.
+
+    Для каждого ингредиента хранится битовая карта id рецептов, в которых
+    он используется, а для каждого количества ингредиентов - битовая
+    карта рецептов с таким количеством. Состав каждого рецепта хранится,
+    чтобы индекс можно было обновить только для измененных рецептов.
+    """
+
+    def __init__(
+        self,
+        rows: Iterable[Tuple[int, int]],
+        last_change_id: int = 0,
+    ) -> None:
+        recipes = defaultdict(set)
+        for recipe_id, ingredient_id in rows:
+            recipes[recipe_id].add(ingredient_id)
+        self.recipes: Dict[int, FrozenSet[int]] = {
+            recipe_id: frozenset(ingredient_ids)
+            for recipe_id, ingredient_ids in recipes.items()
+        }
+        recipe_ids = defaultdict(list)
+        by_size = defaultdict(list)
+        for recipe_id, ingredient_ids in self.recipes.items():
+            for ingredient_id in ingredient_ids:
+                recipe_ids[ingredient_id].append(recipe_id)
+            by_size[len(ingredient_ids)].append(recipe_id)
+        self.postings: Dict[int, int] = {
+            ingredient_id: to_bitmap(ids)
+            for ingredient_id, ids in recipe_ids.items()
+        }
+        self.sizes: Dict[int, int] = {
+            size: to_bitmap(ids) for size, ids in by_size.items()
+        }
+        self.last_change_id = last_change_id
+
+    def apply(
+        self,
+        changed: Mapping[int, AbstractSet[int]],
+        last_change_id: int,
+    ) -> 'RecipeIngredientIndex':
+        """Создание копии индекса с новым составом измененных рецептов.
+
+        Индекс не изменяется на месте, поэтому потоки, которые его читают,
+        не видят промежуточного состояния.
+
+        Args:
+            changed: Словарь вида {id рецепта: id ингредиентов}. Удаленным
+                рецептам соответствует пустой набор.
+            last_change_id: Номер последнего учтенного изменения.
+
+        Returns:
+            Обновленный индекс.
+        """
+        index = copy.copy(self)
+        index.recipes = dict(self.recipes)
+        index.postings = dict(self.postings)
+        index.sizes = dict(self.sizes)
+        index.last_change_id = last_change_id
+        for recipe_id, ingredient_ids in changed.items():
+            old_ids = index.recipes.pop(recipe_id, frozenset())
+            if ingredient_ids:
+                index.recipes[recipe_id] = frozenset(ingredient_ids)
+            if old_ids == ingredient_ids:
+                continue
+            bit = 1 << recipe_id
+            for ingredient_id in old_ids:
+                clear_bit(index.postings, ingredient_id, bit)
+            for ingredient_id in ingredient_ids:
+                set_bit(index.postings, ingredient_id, bit)
+            if old_ids:
+                clear_bit(index.sizes, len(old_ids), bit)
+            if ingredient_ids:
+                set_bit(index.sizes, len(ingredient_ids), bit)
+        return index
+
+    def with_all(self, ingredient_ids: Iterable[int]) -> List[int]:
+        """Поиск рецептов, содержащих все ингредиенты.
+
+        Args:
+            ingredient_ids: id ингредиентов.
+
+        Returns:
+            id найденных рецептов.
+        """
+        ingredient_ids = set(ingredient_ids)
+        if not ingredient_ids:
+            return []
+        return from_bitmap(
+            reduce(
+                and_,
+                (self.postings.get(value, 0) for value in ingredient_ids),
+            ),
+        )
+
+    def with_any(self, ingredient_ids: Iterable[int]) -> List[int]:
+        """Поиск рецептов, содержащих хотя бы один из ингредиентов.
+
+        Args:
+            ingredient_ids: id ингредиентов.
+
+        Returns:
+            id найденных рецептов.
+        """
+        return from_bitmap(
+            reduce(
+                or_,
+                (self.postings.get(value, 0) for value in set(ingredient_ids)),
+                0,
+            ),
+        )
+
+    def cookable(
+        self,
+        ingredient_ids: Iterable[int],
+        max_missing: int = 0,
+    ) -> List[int]:
+        """Поиск рецептов, которые можно приготовить из имеющегося.
+
+        Рецепт подходит, если в нем не больше max_missing ингредиентов,
+        которых нет среди имеющихся.
+
+        Args:
+            ingredient_ids: id имеющихся ингредиентов.
+            max_missing: Допустимое количество недостающих ингредиентов.
+
+        Returns:
+            id найденных рецептов.
+        """
+        counts = count_bits(
+            self.postings.get(value, 0) for value in set(ingredient_ids)
+        )
+        return from_bitmap(
+            reduce(
+                or_,
+                (
+                    recipes & at_least(counts, size - max_missing)
+                    for size, recipes in self.sizes.items()
+                ),
+                0,
+            ),
+        )
+
+
+def load_recipe_ingredient_index() -> RecipeIngredientIndex:
+    """Функция для построения индекса рецептов по ингредиентам.
+
+    Номер последнего изменения читается до связей, поэтому изменения,
+    сделанные во время построения, будут применены при обновлении.
+
+    Returns:
+        Индекс, построенный по всем связям рецептов и ингредиентов.
+    """
+    last_change_id = RecipeIngredientChange.objects.aggregate(
+        last=Max('id'),
+    )['last']
+    return RecipeIngredientIndex(
+        RecipeIngredient.objects.values_list('recipe_id', 'ingredient_id')
+        .order_by()
+        .iterator(),
+        last_change_id or 0,
+    )
+
+
+def update_recipe_ingredient_index(
+    index: RecipeIngredientIndex,
+) -> RecipeIngredientIndex:
+    """Функция для обновления индекса по журналу изменений состава.
+
+    Номера изменений выдаются до фиксации транзакций, поэтому изменение с
+    меньшим номером может стать видимым позже изменения с большим.
+    Последние RECIPE_CHANGES_OVERLAP изменений перечитываются повторно:
+    состав рецепта всегда читается заново, поэтому повторное применение
+    безопасно. Если нужные изменения уже удалены из журнала, их слишком
+    много или журнал очищен, индекс строится заново.
+
+    Args:
+        index: Индекс, построенный для предыдущей версии.
+
+    Returns:
+        Индекс с учетом новых изменений.
+    """
+    start = max(index.last_change_id - RECIPE_CHANGES_OVERLAP, 0)
+    bounds = RecipeIngredientChange.objects.aggregate(
+        first=Min('id'),
+        last=Max('id'),
+    )
+    if (
+        bounds['last'] is None
+        or bounds['last'] < index.last_change_id
+        or bounds['first'] > start + 1
+        or bounds['last'] - start > RECIPE_CHANGES_MAX_APPLIED
+    ):
+        return load_recipe_ingredient_index()
+    changed: Dict[int, Set[int]] = {
+        recipe_id: set()
+        for recipe_id in RecipeIngredientChange.objects.filter(
+            id__gt=start,
+            id__lte=bounds['last'],
+        ).values_list('recipe_id', flat=True)
+    }
+    for recipe_id, ingredient_id in RecipeIngredient.objects.filter(
+        recipe_id__in=changed,
+    ).values_list('recipe_id', 'ingredient_id'):
+        changed[recipe_id].add(ingredient_id)
+    return index.apply(changed, bounds['last'])
+
+
+_recipe_index = VersionedCache(
+    RECIPE_INGREDIENTS_VERSION,
+    load_recipe_ingredient_index,
+    update_recipe_ingredient_index,
+)
+
+
+def get_recipe_ingredient_index() -> RecipeIngredientIndex:
+    """Получение инвертированного индекса рецептов текущего процесса.
+
+    Индекс строится при первом обращении, а при изменении версии состава
+    рецептов обновляется только для измененных рецептов.
+
+    Returns:
+        Актуальный индекс рецептов по ингредиентам.
+    """
+    return _recipe_index.get()
+
+
+def recipe_ingredients_changed(recipe_ids: Iterable[int]) -> None:
+    """Функция для записи изменения состава рецептов в журнал.
+
+    Журнал хранит последние RECIPE_CHANGES_KEPT изменений, а версия
+    состава рецептов изменяется после коммита.
+
+    Args:
+        recipe_ids: id рецептов, состав которых изменился.
+    """
+    RecipeIngredientChange.objects.bulk_create(
+        RecipeIngredientChange(recipe_id=recipe_id)
+        for recipe_id in set(recipe_ids)
+    )
+    last_change_id = RecipeIngredientChange.objects.aggregate(
+        last=Max('id'),
+    )['last']
+    if last_change_id is not None:
+        RecipeIngredientChange.objects.filter(
+            id__lte=last_change_id - RECIPE_CHANGES_KEPT,
+        ).delete()
+    bump_version_on_commit(RECIPE_INGREDIENTS_VERSION)
@@ -0,0 +1,119 @@
+from datetime import timedelta
+from typing import Any, Set
+
+from django.core.files.storage import default_storage
+from django.core.management.base import BaseCommand, CommandParser
+from django.db import transaction
+from django.db.models import Count
+from django.utils import timezone
+
+from recipes.images import IMAGE_VARIANT_FIELDS, get_variant_names
+from recipes.models import Recipe, StoredImage
+
+IMAGES_DIRECTORY = 'recipes/images'
+
+
+class Command(BaseCommand):
+    """Команда для удаления картинок, на которые не ссылаются рецепты."""
+
+    help = 'Пересчитывает ссылки на картинки и удаляет лишние файлы'
+
+    def add_arguments(self, parser: CommandParser) -> None:
+        """Функция для добавления аргументов команды.
+
+        Args:
+            parser: Парсер аргументов команды.
+        """
+        parser.add_argument(
+            '--min-age',
+            type=int,
+            default=60 * 60,
+            help='Удалять только файлы старше заданного числа секунд',
+        )
+        parser.add_argument(
+            '--dry-run',
+            action='store_true',
+            help='Только показать файлы, которые будут удалены',
+        )
+
+    def rebuild_references(self) -> None:
+        """Функция для пересчета количества ссылок на картинки."""
+        references = dict(
+            Recipe.objects.exclude(image='')
+            .values_list('image')
+            .annotate(references=Count('id'))
+            .order_by(),
+        )
+        with transaction.atomic():
+            StoredImage.objects.exclude(name__in=references).delete()
+            existing = StoredImage.objects.in_bulk(
+                references,
+                field_name='name',
+            )
+            for image in existing.values():
+                image.references = references[image.name]
+            StoredImage.objects.bulk_update(
+                existing.values(),
+                ['references'],
+                batch_size=1000,
+            )
+            StoredImage.objects.bulk_create(
+                (
+                    StoredImage(name=name, references=count)
+                    for name, count in references.items()
+                    if name not in existing
+                ),
+                batch_size=1000,
+            )
+
+    def get_used_names(self) -> Set[str]:
+        """Функция для получения имен файлов, на которые есть ссылки.
+
+        Returns:
+            Имена картинок рецептов и их уменьшенных копий.
+        """
+        names = set()
+        for row in Recipe.objects.values_list(
+            'image',
+            *IMAGE_VARIANT_FIELDS.values(),
+        ).iterator():
+            names.update(row)
+        for name in StoredImage.objects.values_list('name', flat=True):
+            names.add(name)
+            names.update(get_variant_names(name).values())
+        return names
+
+    def handle(self, *args: Any, **options: Any) -> None:
+        """Функция для удаления картинок без ссылок.
+
+        Args:
+            *args: Передаваемые позиционные аргументы.
+            **options: Передаваемые именованные аргументы.
+        """
+        if not options['dry_run']:
+            self.rebuild_references()
+        used_names = self.get_used_names()
+        created_before = timezone.now() - timedelta(
+            seconds=options['min_age'],
+        )
+        files = []
+        if default_storage.exists(IMAGES_DIRECTORY):
+            _, files = default_storage.listdir(IMAGES_DIRECTORY)
+        counter = size = 0
+        for file_name in files:
+            name = f'{IMAGES_DIRECTORY}/{file_name}'
+            if (
+                name in used_names
+                or default_storage.get_modified_time(name) > created_before
+            ):
+                continue
+            counter += 1
+            size += default_storage.size(name)
+            if options['dry_run']:
+                print(name)  # noqa: T201
+            else:
+                default_storage.delete(name)
+        print(  # noqa: T201
+            f'Cleanup complete, found {counter} unused files',
+            f'taking {size} bytes',
+        )
@@ -1,40 +1,97 @@
-import csv
-from typing import Any
+from collections import defaultdict
+from typing import Any, Dict, List, Optional, Tuple
 
-from django.conf import settings
-from django.core.management.base import BaseCommand
+from django.core.management.base import CommandParser
 
+from core.utils import normalize_name
+from core.versions import bump_version
+from recipes.importers import CatalogImportCommand, CatalogRow
 from recipes.models import Ingredient
+from recipes.registry import REFERENCE_VERSION
 
 
-class Command(BaseCommand):
+class Command(CatalogImportCommand):
     """Команда для импорта ингредиентов из файла."""
 
-    def handle(self, *args: Any, **options: Any) -> None:
-        """Функция для импорта ингредиентов из файла.
+    help = 'Импортирует ингредиенты из CSV- или JSON-файла'
+    file_name = 'ingredients.csv'
+    fields = ('name', 'measurement_unit')
+
+    def add_arguments(self, parser: CommandParser) -> None:
+        """Функция для добавления аргументов команды.
 
         Args:
-            *args: Передаваемые позиционные аргументы.
-            **options: Передаваемые именованные аргументы.
+            parser: Парсер аргументов команды.
         """
-        print(  # noqa: T201
-            'Importing data from:',
-            settings.DATA_IMPORT_LOCATION,
+        super().add_arguments(parser)
+        parser.add_argument(
+            '--update-units',
+            action='store_true',
+            help=(
+                'Изменять единицу измерения ингредиента, если он уже есть '
+                'в базе данных с единственной другой единицей'
+            ),
         )
-        with open(
-            f'{settings.DATA_IMPORT_LOCATION}/ingredients.csv',
-            'r',
-            encoding='utf-8-sig',
-        ) as csv_file:
-            counter = 0
-            data = csv.reader(csv_file)
-            for name, measurement_unit in data:
-                _, created = Ingredient.objects.get_or_create(
+
+    def prepare(self, options: Dict[str, Any]) -> None:
+        """Функция для загрузки существующих ингредиентов.
+
+        Args:
+            options: Именованные аргументы команды.
+        """
+        self.units: Dict[str, Dict[str, Optional[int]]] = defaultdict(dict)
+        for ingredient_id, name, measurement_unit in (
+            Ingredient.objects.values_list('id', 'name', 'measurement_unit')
+            .order_by()
+            .iterator()
+        ):
+            self.units[name][measurement_unit] = ingredient_id
+
+    def import_batch(
+        self,
+        rows: List[CatalogRow],
+        options: Dict[str, Any],
+    ) -> Tuple[int, int]:
+        """Функция для записи порции ингредиентов в базу данных.
+
+        Args:
+            rows: Порция строк с полями name и measurement_unit.
+            options: Именованные аргументы команды.
+
+        Returns:
+            Количество созданных и измененных ингредиентов.
+        """
+        to_create, to_update = [], []
+        for row in rows:
+            name = row['name'].strip()
+            measurement_unit = row['measurement_unit'].strip()
+            units = self.units[name]
+            if measurement_unit in units:
+                continue
+            if options['update_units'] and len(units) == 1:
+                ((old_unit, ingredient_id),) = units.items()
+                if ingredient_id is not None:
+                    to_update.append(
+                        Ingredient(
+                            id=ingredient_id,
+                            measurement_unit=measurement_unit,
+                        ),
+                    )
+                    units.pop(old_unit)
+                    units[measurement_unit] = ingredient_id
+                    continue
+            units[measurement_unit] = None
+            to_create.append(
+                Ingredient(
                     name=name,
                     measurement_unit=measurement_unit,
-                )
-                if created:
-                    counter += 1
-            print(  # noqa: T201
-                f'Import complete, imported {counter} ingredients',
+                    search_name=normalize_name(name),
+                ),
             )
+        Ingredient.objects.bulk_create(to_create, ignore_conflicts=True)
+        Ingredient.objects.bulk_update(to_update, ['measurement_unit'])
+        return len(to_create), len(to_update)
+
+    def finish(self) -> None:
+        """Функция для сброса кешей справочников после импорта."""
+        bump_version(REFERENCE_VERSION)
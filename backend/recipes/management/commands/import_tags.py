@@ -1,41 +1,57 @@
-import csv
-from typing import Any
-
-from django.conf import settings
-from django.core.management.base import BaseCommand
+from typing import Any, Dict, List, Tuple
 
+from core.versions import bump_version
+from recipes.importers import CatalogImportCommand, CatalogRow
 from recipes.models import Tag
+from recipes.registry import REFERENCE_VERSION
+
+
+class Command(CatalogImportCommand):
+    """Команда для импорта тегов из файла."""
+
+    help = 'Импортирует теги из CSV- или JSON-файла'
+    file_name = 'tags.csv'
+    fields = ('name', 'color', 'slug')
 
+    def prepare(self, options: Dict[str, Any]) -> None:
+        """Функция для загрузки существующих тегов.
 
-class Command(BaseCommand):
-    """Команда для импорта ингредиентов из файла."""
+        Args:
+            options: Именованные аргументы команды.
+        """
+        self.names = set()
+        self.slugs = set()
+        for name, slug in Tag.objects.values_list('name', 'slug'):
+            self.names.add(name)
+            self.slugs.add(slug)
 
-    def handle(self, *args: Any, **options: Any) -> None:
-        """Функция для импорта ингредиентов из файла.
+    def import_batch(
+        self,
+        rows: List[CatalogRow],
+        options: Dict[str, Any],
+    ) -> Tuple[int, int]:
+        """Функция для записи порции тегов в базу данных.
 
         Args:
-            *args: Передаваемые позиционные аргументы.
-            **options: Передаваемые именованные аргументы.
+            rows: Порция строк с полями name, color и slug.
+            options: Именованные аргументы команды.
+
+        Returns:
+            Количество созданных и измененных тегов.
         """
-        print(  # noqa: T201
-            'Importing data from:',
-            settings.DATA_IMPORT_LOCATION,
-        )
-        with open(
-            f'{settings.DATA_IMPORT_LOCATION}/tags.csv',
-            'r',
-            encoding='utf-8-sig',
-        ) as csv_file:
-            counter = 0
-            data = csv.reader(csv_file)
-            for name, color, slug in data:
-                _, created = Tag.objects.get_or_create(
-                    name=name,
-                    color=color,
-                    slug=slug,
-                )
-                if created:
-                    counter += 1
-            print(  # noqa: T201
-                f'Import complete, imported {counter} tags',
+        to_create = []
+        for row in rows:
+            name, slug = row['name'].strip(), row['slug'].strip()
+            if name in self.names or slug in self.slugs:
+                continue
+            self.names.add(name)
+            self.slugs.add(slug)
+            to_create.append(
+                Tag(name=name, color=row['color'].strip(), slug=slug),
             )
+        Tag.objects.bulk_create(to_create, ignore_conflicts=True)
+        return len(to_create), 0
+
+    def finish(self) -> None:
+        """Функция для сброса кешей справочников после импорта."""
+        bump_version(REFERENCE_VERSION)
@@ -0,0 +1,45 @@
+from typing import Any
+
+from django.core.management.base import BaseCommand, CommandParser
+
+from recipes.images import process_recipe_image
+from recipes.models import Recipe
+
+
+class Command(BaseCommand):
+    """Команда для создания уменьшенных копий картинок рецептов."""
+
+    help = 'Создает уменьшенные копии картинок рецептов, у которых их нет'
+
+    def add_arguments(self, parser: CommandParser) -> None:
+        """Функция для добавления аргументов команды.
+
+        Args:
+            parser: Парсер аргументов команды.
+        """
+        parser.add_argument(
+            '--all',
+            action='store_true',
+            help='Пересоздать копии картинок всех рецептов',
+        )
+
+    def handle(self, *args: Any, **options: Any) -> None:
+        """Функция для создания уменьшенных копий картинок.
+
+        Args:
+            *args: Передаваемые позиционные аргументы.
+            **options: Передаваемые именованные аргументы.
+        """
+        recipes = Recipe.objects.exclude(image='')
+        if not options['all']:
+            recipes = recipes.filter(image_full='')
+        counter = 0
+        for recipe_id, image_name in recipes.values_list(
+            'id',
+            'image',
+        ).iterator():
+            process_recipe_image(recipe_id, image_name)
+            counter += 1
+        print(  # noqa: T201
+            f'Processing complete, processed {counter} recipe images',
+        )
@@ -0,0 +1,39 @@
+from typing import Any
+
+from django.core.management.base import BaseCommand, CommandParser
+
+from recipes.models import RecipeRanking
+from recipes.ranking import PERIOD_LENGTHS, rank_recipes
+
+
+class Command(BaseCommand):
+    """Команда для расчета рейтинга популярных рецептов."""
+
+    help = 'Пересчитывает рейтинг популярных рецептов за каждый период'
+
+    def add_arguments(self, parser: CommandParser) -> None:
+        """Функция для добавления аргументов команды.
+
+        Args:
+            parser: Парсер аргументов команды.
+        """
+        parser.add_argument(
+            '--period',
+            action='append',
+            dest='periods',
+            choices=[period for period, _ in RecipeRanking.PERIODS],
+            help='Период, рейтинг за который нужно пересчитать',
+        )
+
+    def handle(self, *args: Any, **options: Any) -> None:
+        """Функция для расчета рейтинга популярных рецептов.
+
+        Args:
+            *args: Передаваемые позиционные аргументы.
+            **options: Передаваемые именованные аргументы.
+        """
+        for period in options['periods'] or PERIOD_LENGTHS:
+            counter = rank_recipes(period)
+            print(  # noqa: T201
+                f'Ranking complete, ranked {counter} recipes for {period}',
+            )
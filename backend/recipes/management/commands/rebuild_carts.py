@@ -0,0 +1,37 @@
+from typing import Any
+
+from django.core.management.base import BaseCommand, CommandParser
+
+from recipes.cart import rebuild_carts
+
+
+class Command(BaseCommand):
+    """Команда для пересчета суммарных списков покупок."""
+
+    help = 'Пересчитывает суммарные списки покупок с нуля'
+
+    def add_arguments(self, parser: CommandParser) -> None:
+        """Функция для добавления аргументов команды.
+
+        Args:
+            parser: Парсер аргументов команды.
+        """
+        parser.add_argument(
+            '--user',
+            type=int,
+            action='append',
+            dest='user_ids',
+            help='id пользователя, список которого нужно пересчитать',
+        )
+
+    def handle(self, *args: Any, **options: Any) -> None:
+        """Функция для пересчета суммарных списков покупок.
+
+        Args:
+            *args: Передаваемые позиционные аргументы.
+            **options: Передаваемые именованные аргументы.
+        """
+        counter = rebuild_carts(options['user_ids'])
+        print(  # noqa: T201
+            f'Rebuild complete, stored {counter} shopping list rows',
+        )
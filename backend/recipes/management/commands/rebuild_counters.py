@@ -0,0 +1,40 @@
+from typing import Any
+
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from core.utils import count_related
+from recipes.models import Favorite, Purchase, Recipe
+from users.models import Following, User
+
+
+class Command(BaseCommand):
+    """Команда для пересчета денормализованных счетчиков."""
+
+    help = 'Пересчитывает счетчики рецептов и пользователей с нуля'
+
+    def handle(self, *args: Any, **options: Any) -> None:
+        """Функция для пересчета счетчиков рецептов и пользователей.
+
+        Args:
+            *args: Передаваемые позиционные аргументы.
+            **options: Передаваемые именованные аргументы.
+        """
+        with transaction.atomic():
+            recipes = Recipe.objects.update(
+                favorites_count=count_related(
+                    Favorite.objects.all(),
+                    'recipe',
+                ),
+                in_carts_count=count_related(Purchase.objects.all(), 'recipe'),
+            )
+            users = User.objects.update(
+                recipes_count=count_related(Recipe.objects.all(), 'author'),
+                followers_count=count_related(
+                    Following.objects.all(),
+                    'following',
+                ),
+            )
+        print(  # noqa: T201
+            f'Rebuild complete, updated {recipes} recipes and {users} users',
+        )
@@ -0,0 +1,37 @@
+from typing import Any
+
+from django.core.management.base import BaseCommand, CommandParser
+
+from recipes.feed import rebuild_feeds
+
+
+class Command(BaseCommand):
+    """Команда для пересоздания лент рецептов."""
+
+    help = 'Пересоздает ленты рецептов авторов из подписок'
+
+    def add_arguments(self, parser: CommandParser) -> None:
+        """Функция для добавления аргументов команды.
+
+        Args:
+            parser: Парсер аргументов команды.
+        """
+        parser.add_argument(
+            '--user',
+            type=int,
+            action='append',
+            dest='user_ids',
+            help='id пользователя, ленту которого нужно пересоздать',
+        )
+
+    def handle(self, *args: Any, **options: Any) -> None:
+        """Функция для пересоздания лент рецептов.
+
+        Args:
+            *args: Передаваемые позиционные аргументы.
+            **options: Передаваемые именованные аргументы.
+        """
+        counter = rebuild_feeds(options['user_ids'])
+        print(  # noqa: T201
+            f'Rebuild complete, stored {counter} feed entries',
+        )
@@ -0,0 +1,36 @@
+from typing import Any
+
+from django.core.management.base import BaseCommand, CommandParser
+
+from recipes.similarity import rebuild_similarity_index
+
+
+class Command(BaseCommand):
+    """Команда для пересоздания индекса похожих рецептов."""
+
+    help = 'Пересоздает MinHash/LSH-индекс наборов ингредиентов рецептов'
+
+    def add_arguments(self, parser: CommandParser) -> None:
+        """Функция для добавления аргументов команды.
+
+        Args:
+            parser: Парсер аргументов команды.
+        """
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=1000,
+            help='Количество корзин индекса, записываемых за один запрос',
+        )
+
+    def handle(self, *args: Any, **options: Any) -> None:
+        """Функция для пересоздания индекса похожих рецептов.
+
+        Args:
+            *args: Передаваемые позиционные аргументы.
+            **options: Передаваемые именованные аргументы.
+        """
+        counter = rebuild_similarity_index(options['batch_size'])
+        print(  # noqa: T201
+            f'Rebuild complete, indexed {counter} recipes',
+        )
@@ -0,0 +1,122 @@
+import time
+import tracemalloc
+from typing import Any
+
+from django.core.management.base import (
+    BaseCommand,
+    CommandError,
+    CommandParser,
+)
+
+from core.constants import RECOMMENDATIONS_SIZE
+
+
+class Command(BaseCommand):
+    """Команда для расчета рекомендаций по совместному избранному."""
+
+    help = (
+        'Рассчитывает для каждого рецепта рецепты, которые чаще всего '
+        'добавляют в избранное вместе с ним'
+    )
+
+    def add_arguments(self, parser: CommandParser) -> None:
+        """Функция для добавления аргументов команды.
+
+        Args:
+            parser: Парсер аргументов команды.
+        """
+        parser.add_argument(
+            '--top-k',
+            type=int,
+            default=RECOMMENDATIONS_SIZE,
+            help='Количество рекомендаций для одного рецепта',
+        )
+        parser.add_argument(
+            '--chunk-size',
+            type=int,
+            default=1000,
+            help='Количество рецептов, обрабатываемых за один раз',
+        )
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=10000,
+            help='Количество строк, читаемых и записываемых за один запрос',
+        )
+        parser.add_argument(
+            '--benchmark',
+            action='store_true',
+            help='Выполнить расчет на случайных данных без записи в базу',
+        )
+        parser.add_argument('--users', type=int, default=100000)
+        parser.add_argument('--recipes', type=int, default=20000)
+        parser.add_argument('--favorites', type=int, default=1000000)
+
+    def benchmark(self, options: Any) -> None:
+        """Функция для замера расчета рекомендаций на случайных данных.
+
+        Args:
+            options: Именованные аргументы команды.
+        """
+        from recipes.recommendations import synthetic_favorites, top_similar
+
+        tracemalloc.start()
+        started = time.perf_counter()
+        matrix, _ = synthetic_favorites(
+            options['users'],
+            options['recipes'],
+            options['favorites'],
+        )
+        built = time.perf_counter()
+        counter = sum(
+            len(columns)
+            for _, columns, _ in top_similar(
+                matrix,
+                options['top_k'],
+                options['chunk_size'],
+            )
+        )
+        finished = time.perf_counter()
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        print(  # noqa: T201
+            f'Benchmark complete: {matrix.nnz} favorites,',
+            f'{matrix.shape[0]} users, {matrix.shape[1]} recipes,',
+            f'{counter} recommendations, matrix {built - started:.2f} s,',
+            f'similarity {finished - built:.2f} s,',
+            f'peak memory {peak / 1024 / 1024:.0f} MB',
+        )
+
+    def handle(self, *args: Any, **options: Any) -> None:
+        """Функция для расчета рекомендаций.
+
+        Args:
+            *args: Передаваемые позиционные аргументы.
+            **options: Передаваемые именованные аргументы.
+
+        Raises:
+            CommandError: Не установлены numpy и scipy.
+        """
+        try:
+            from recipes.recommendations import (
+                load_favorites,
+                save_recommendations,
+                top_similar,
+            )
+        except ImportError:
+            raise CommandError('Для расчета рекомендаций нужны numpy и scipy')
+        if options['benchmark']:
+            self.benchmark(options)
+            return
+        started = time.perf_counter()
+        matrix, recipe_ids = load_favorites(options['batch_size'])
+        counter = save_recommendations(
+            top_similar(matrix, options['top_k'], options['chunk_size']),
+            recipe_ids,
+            options['batch_size'],
+        )
+        print(  # noqa: T201
+            f'Recommendations complete, stored {counter} recommendations',
+            f'for {len(recipe_ids)} recipes in',
+            f'{time.perf_counter() - started:.2f} s',
+        )
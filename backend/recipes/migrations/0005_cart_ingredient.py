@@ -0,0 +1,89 @@
+# Generated by Django 3.2.16 on 2026-10-18 01:36
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+from django.db.models import Sum
+
+
+def fill_carts(apps, schema_editor):
+    CartIngredient = apps.get_model('recipes', 'CartIngredient')
+    RecipeIngredient = apps.get_model('recipes', 'RecipeIngredient')
+    CartIngredient.objects.bulk_create(
+        (
+            CartIngredient(
+                user_id=user_id,
+                ingredient_id=ingredient_id,
+                amount=amount,
+            )
+            for user_id, ingredient_id, amount in (
+                RecipeIngredient.objects.filter(
+                    recipe__purchases__isnull=False,
+                )
+                .values_list('recipe__purchases__user_id', 'ingredient_id')
+                .annotate(total=Sum('amount'))
+                .order_by()
+            )
+        ),
+        batch_size=1000,
+    )
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ('recipes', '0004_counters'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='CartIngredient',
+            fields=[
+                (
+                    'id',
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name='ID',
+                    ),
+                ),
+                (
+                    'amount',
+                    models.PositiveIntegerField(
+                        default=0, verbose_name='количество'
+                    ),
+                ),
+                (
+                    'ingredient',
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name='cart_ingredients',
+                        to='recipes.ingredient',
+                        verbose_name='ингредиент',
+                    ),
+                ),
+                (
+                    'user',
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name='cart_ingredients',
+                        to=settings.AUTH_USER_MODEL,
+                        verbose_name='пользователь',
+                    ),
+                ),
+            ],
+            options={
+                'verbose_name': 'Ингредиент списка покупок',
+                'verbose_name_plural': 'Ингредиенты списка покупок',
+                'default_related_name': 'cart_ingredients',
+            },
+        ),
+        migrations.AddConstraint(
+            model_name='cartingredient',
+            constraint=models.UniqueConstraint(
+                fields=('user', 'ingredient'), name='unique_user_ingredient'
+            ),
+        ),
+        migrations.RunPython(fill_carts, migrations.RunPython.noop),
+    ]
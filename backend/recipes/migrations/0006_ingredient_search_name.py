@@ -0,0 +1,62 @@
+# Generated by Django 3.2.16 on 2026-10-18 01:42
+
+from django.db import migrations, models
+
+
+def fill_search_name(apps, schema_editor):
+    Ingredient = apps.get_model('recipes', 'Ingredient')
+    ingredients = list(Ingredient.objects.all())
+    for ingredient in ingredients:
+        ingredient.search_name = ingredient.name.casefold().replace('ё', 'е')
+    Ingredient.objects.bulk_update(
+        ingredients,
+        ['search_name'],
+        batch_size=1000,
+    )
+
+
+def create_trigram_index(apps, schema_editor):
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    schema_editor.execute('CREATE EXTENSION IF NOT EXISTS pg_trgm')
+    schema_editor.execute(
+        'CREATE INDEX IF NOT EXISTS ingredient_search_name_trgm_idx '
+        'ON recipes_ingredient USING gin (search_name gin_trgm_ops)',
+    )
+
+
+def drop_trigram_index(apps, schema_editor):
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    schema_editor.execute(
+        'DROP INDEX IF EXISTS ingredient_search_name_trgm_idx',
+    )
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ('recipes', '0005_cart_ingredient'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='ingredient',
+            name='search_name',
+            field=models.CharField(
+                default='',
+                editable=False,
+                max_length=200,
+                verbose_name='название для поиска',
+            ),
+        ),
+        migrations.AddIndex(
+            model_name='ingredient',
+            index=models.Index(
+                fields=['search_name'],
+                name='ingredient_search_name_idx',
+                opclasses=['text_pattern_ops'],
+            ),
+        ),
+        migrations.RunPython(fill_search_name, migrations.RunPython.noop),
+        migrations.RunPython(create_trigram_index, drop_trigram_index),
+    ]
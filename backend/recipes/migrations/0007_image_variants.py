@@ -0,0 +1,42 @@
+# Generated by Django 3.2.16 on 2026-10-18 01:48
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ('recipes', '0006_ingredient_search_name'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='recipe',
+            name='image_card',
+            field=models.ImageField(
+                blank=True,
+                editable=False,
+                upload_to='recipes/images/',
+                verbose_name='картинка для карточки',
+            ),
+        ),
+        migrations.AddField(
+            model_name='recipe',
+            name='image_full',
+            field=models.ImageField(
+                blank=True,
+                editable=False,
+                upload_to='recipes/images/',
+                verbose_name='картинка для страницы рецепта',
+            ),
+        ),
+        migrations.AddField(
+            model_name='recipe',
+            name='image_thumbnail',
+            field=models.ImageField(
+                blank=True,
+                editable=False,
+                upload_to='recipes/images/',
+                verbose_name='миниатюра картинки',
+            ),
+        ),
+    ]
@@ -0,0 +1,71 @@
+# Generated by Django 3.2.16 on 2026-10-18 01:53
+
+from django.db import migrations, models
+from django.db.models import Count
+
+import core.storage
+
+
+def fill_stored_images(apps, schema_editor):
+    Recipe = apps.get_model('recipes', 'Recipe')
+    StoredImage = apps.get_model('recipes', 'StoredImage')
+    StoredImage.objects.bulk_create(
+        (
+            StoredImage(name=name, references=references)
+            for name, references in Recipe.objects.exclude(image='')
+            .values_list('image')
+            .annotate(references=Count('id'))
+            .order_by()
+            .iterator()
+        ),
+        batch_size=1000,
+    )
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ('recipes', '0007_image_variants'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='StoredImage',
+            fields=[
+                (
+                    'id',
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name='ID',
+                    ),
+                ),
+                (
+                    'name',
+                    models.CharField(
+                        max_length=200, unique=True, verbose_name='имя файла'
+                    ),
+                ),
+                (
+                    'references',
+                    models.PositiveIntegerField(
+                        default=0, verbose_name='количество рецептов'
+                    ),
+                ),
+            ],
+            options={
+                'verbose_name': 'Файл картинки',
+                'verbose_name_plural': 'Файлы картинок',
+            },
+        ),
+        migrations.AlterField(
+            model_name='recipe',
+            name='image',
+            field=models.ImageField(
+                storage=core.storage.ContentHashStorage(),
+                upload_to='recipes/images/',
+                verbose_name='картинка',
+            ),
+        ),
+        migrations.RunPython(fill_stored_images, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,97 @@
+# Generated by Django 3.2.16 on 2026-10-18 01:57
+
+import django.db.models.deletion
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ('recipes', '0009_feed_entry'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='favorite',
+            name='created',
+            field=models.DateTimeField(
+                db_index=True,
+                default=django.utils.timezone.now,
+                editable=False,
+                verbose_name='дата добавления',
+            ),
+        ),
+        migrations.AddField(
+            model_name='purchase',
+            name='created',
+            field=models.DateTimeField(
+                db_index=True,
+                default=django.utils.timezone.now,
+                editable=False,
+                verbose_name='дата добавления',
+            ),
+        ),
+        migrations.CreateModel(
+            name='RecipeRanking',
+            fields=[
+                (
+                    'id',
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name='ID',
+                    ),
+                ),
+                (
+                    'period',
+                    models.CharField(
+                        choices=[
+                            ('day', 'сутки'),
+                            ('week', 'неделя'),
+                            ('all', 'все время'),
+                        ],
+                        max_length=8,
+                        verbose_name='период',
+                    ),
+                ),
+                (
+                    'position',
+                    models.PositiveIntegerField(verbose_name='место'),
+                ),
+                (
+                    'score',
+                    models.PositiveIntegerField(
+                        verbose_name='добавлений в избранное и список покупок'
+                    ),
+                ),
+                (
+                    'recipe',
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name='rankings',
+                        to='recipes.recipe',
+                        verbose_name='рецепт',
+                    ),
+                ),
+            ],
+            options={
+                'verbose_name': 'Место в рейтинге',
+                'verbose_name_plural': 'Рейтинг рецептов',
+                'ordering': ('position',),
+                'default_related_name': 'rankings',
+            },
+        ),
+        migrations.AddConstraint(
+            model_name='reciperanking',
+            constraint=models.UniqueConstraint(
+                fields=('period', 'position'), name='unique_period_position'
+            ),
+        ),
+        migrations.AddConstraint(
+            model_name='reciperanking',
+            constraint=models.UniqueConstraint(
+                fields=('period', 'recipe'), name='unique_period_recipe'
+            ),
+        ),
+    ]
@@ -0,0 +1,61 @@
+# Generated by Django 3.2.16 on 2026-10-18 02:00
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ('recipes', '0010_recipe_ranking'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='RecipeRecommendation',
+            fields=[
+                (
+                    'id',
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name='ID',
+                    ),
+                ),
+                (
+                    'position',
+                    models.PositiveSmallIntegerField(verbose_name='место'),
+                ),
+                ('score', models.FloatField(verbose_name='сходство')),
+                (
+                    'recipe',
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name='recommendations',
+                        to='recipes.recipe',
+                        verbose_name='рецепт',
+                    ),
+                ),
+                (
+                    'recommended',
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name='recommended_for',
+                        to='recipes.recipe',
+                        verbose_name='рекомендуемый рецепт',
+                    ),
+                ),
+            ],
+            options={
+                'verbose_name': 'Рекомендация',
+                'verbose_name_plural': 'Рекомендации',
+                'ordering': ('recipe', 'position'),
+            },
+        ),
+        migrations.AddConstraint(
+            model_name='reciperecommendation',
+            constraint=models.UniqueConstraint(
+                fields=('recipe', 'position'), name='unique_recipe_position'
+            ),
+        ),
+    ]
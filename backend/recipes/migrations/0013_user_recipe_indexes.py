@@ -0,0 +1,103 @@
+# Generated by Django 3.2.16 on 2026-10-18 02:05
+
+from django.db import migrations, models
+from django.db.models import Count, F, Min, OuterRef, Subquery, Sum
+from django.db.models.functions import Coalesce
+
+
+def count_related(model, field):
+    return Coalesce(
+        Subquery(
+            model.objects.filter(**{field: OuterRef('pk')})
+            .order_by()
+            .values(field)
+            .annotate(count=Count('pk'))
+            .values('count'),
+        ),
+        0,
+    )
+
+
+def remove_duplicates(apps, schema_editor):
+    for model_name in ('Favorite', 'Purchase'):
+        model = apps.get_model('recipes', model_name)
+        first_ids = (
+            model.objects.values('user_id', 'recipe_id')
+            .annotate(first_id=Min('id'))
+            .values('first_id')
+        )
+        model.objects.exclude(id__in=first_ids).delete()
+
+
+def rebuild_carts_and_counters(apps, schema_editor):
+    Recipe = apps.get_model('recipes', 'Recipe')
+    Favorite = apps.get_model('recipes', 'Favorite')
+    Purchase = apps.get_model('recipes', 'Purchase')
+    CartIngredient = apps.get_model('recipes', 'CartIngredient')
+    RecipeIngredient = apps.get_model('recipes', 'RecipeIngredient')
+    User = apps.get_model('users', 'User')
+    CartIngredient.objects.all().delete()
+    CartIngredient.objects.bulk_create(
+        (
+            CartIngredient(
+                user_id=user_id,
+                ingredient_id=ingredient_id,
+                amount=amount,
+            )
+            for user_id, ingredient_id, amount in (
+                RecipeIngredient.objects.filter(
+                    recipe__purchases__isnull=False,
+                )
+                .values_list('recipe__purchases__user_id', 'ingredient_id')
+                .annotate(total=Sum('amount'))
+                .order_by()
+            )
+        ),
+        batch_size=1000,
+    )
+    Recipe.objects.update(
+        favorites_count=count_related(Favorite, 'recipe'),
+        in_carts_count=count_related(Purchase, 'recipe'),
+    )
+    User.objects.filter(id__in=Purchase.objects.values('user_id')).update(
+        shopping_cart_version=F('shopping_cart_version') + 1,
+    )
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ('recipes', '0012_similarity_bucket'),
+        ('users', '0003_shopping_cart_version'),
+    ]
+
+    operations = [
+        migrations.RunPython(remove_duplicates, migrations.RunPython.noop),
+        migrations.RunPython(
+            rebuild_carts_and_counters,
+            migrations.RunPython.noop,
+        ),
+        migrations.AddIndex(
+            model_name='favorite',
+            index=models.Index(
+                fields=['user', 'recipe'], name='favorite_user_recipe_idx'
+            ),
+        ),
+        migrations.AddIndex(
+            model_name='purchase',
+            index=models.Index(
+                fields=['user', 'recipe'], name='purchase_user_recipe_idx'
+            ),
+        ),
+        migrations.AddConstraint(
+            model_name='favorite',
+            constraint=models.UniqueConstraint(
+                fields=('recipe', 'user'), name='favorite_unique_recipe_user'
+            ),
+        ),
+        migrations.AddConstraint(
+            model_name='purchase',
+            constraint=models.UniqueConstraint(
+                fields=('recipe', 'user'), name='purchase_unique_recipe_user'
+            ),
+        ),
+    ]
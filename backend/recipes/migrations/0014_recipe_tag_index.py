@@ -0,0 +1,18 @@
+# Generated by Django 3.2.16 on 2026-10-18 02:07
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ('recipes', '0013_user_recipe_indexes'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='recipetag',
+            index=models.Index(
+                fields=['tag', 'recipe'], name='recipe_tag_tag_recipe_idx'
+            ),
+        ),
+    ]
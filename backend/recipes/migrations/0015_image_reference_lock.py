@@ -0,0 +1,25 @@
+# Generated by Django 3.2.16 on 2026-10-18 02:32
+
+from django.db import migrations, models
+
+import core.storage
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ('recipes', '0014_recipe_tag_index'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='recipe',
+            name='image',
+            field=models.ImageField(
+                storage=core.storage.ContentHashStorage(
+                    reference_model='recipes.StoredImage'
+                ),
+                upload_to='recipes/images/',
+                verbose_name='картинка',
+            ),
+        ),
+    ]
@@ -1,3 +1,5 @@
+from typing import Any
+
 from colorfield.fields import ColorField
 from django.core.validators import MaxValueValidator, MinValueValidator
 from django.db import models
@@ -8,6 +10,8 @@ from core.constants import (
     MIN_POSITIVE_INTEGER_VALUE,
 )
 from core.models import UserRecipeModel
+from core.storage import ContentHashStorage
+from core.utils import normalize_name
 from users.models import User
 
 
@@ -22,6 +26,12 @@ class Ingredient(models.Model):
         max_length=DEFAULT_FIELD_LENGTH,
         verbose_name='единица измерения',
     )
+    search_name = models.CharField(
+        max_length=DEFAULT_FIELD_LENGTH,
+        editable=False,
+        default='',
+        verbose_name='название для поиска',
+    )
 
     class Meta:
         ordering = ('name',)
@@ -33,6 +43,13 @@ class Ingredient(models.Model):
                 name='unique_name_measurement',
             ),
         ]
+        indexes = [
+            models.Index(
+                fields=['search_name'],
+                name='ingredient_search_name_idx',
+                opclasses=['text_pattern_ops'],
+            ),
+        ]
 
     def __str__(self) -> str:
         """Представление модели при выводе.
@@ -42,6 +59,16 @@ class Ingredient(models.Model):
         """
         return self.name
 
+    def save(self, *args: Any, **kwargs: Any) -> None:
+        """Сохранение ингредиента с нормализованным названием для поиска.
+
+        Args:
+            *args: Передаваемые позиционные аргументы.
+            **kwargs: Передаваемые именованные аргументы.
+        """
+        self.search_name = normalize_name(self.name)
+        super().save(*args, **kwargs)
+
 
 class Tag(models.Model):
     """Модель тега."""
@@ -86,8 +113,27 @@ class Recipe(models.Model):
     )
     image = models.ImageField(
         upload_to='recipes/images/',
+        storage=ContentHashStorage(reference_model='recipes.StoredImage'),
         verbose_name='картинка',
     )
+    image_thumbnail = models.ImageField(
+        upload_to='recipes/images/',
+        blank=True,
+        editable=False,
+        verbose_name='миниатюра картинки',
+    )
+    image_card = models.ImageField(
+        upload_to='recipes/images/',
+        blank=True,
+        editable=False,
+        verbose_name='картинка для карточки',
+    )
+    image_full = models.ImageField(
+        upload_to='recipes/images/',
+        blank=True,
+        editable=False,
+        verbose_name='картинка для страницы рецепта',
+    )
     cooking_time = models.PositiveSmallIntegerField(
         validators=[
             MinValueValidator(
@@ -106,6 +152,16 @@ class Recipe(models.Model):
         verbose_name='название',
     )
     created = models.DateTimeField(auto_now_add=True, db_index=True)
+    favorites_count = models.PositiveIntegerField(
+        default=0,
+        editable=False,
+        verbose_name='добавлений в избранное',
+    )
+    in_carts_count = models.PositiveIntegerField(
+        default=0,
+        editable=False,
+        verbose_name='добавлений в список покупок',
+    )
     tags = models.ManyToManyField(
         Tag,
         through='RecipeTag',
@@ -156,6 +212,12 @@ class RecipeTag(models.Model):
                 name='unique_recipe_tag',
             ),
         ]
+        indexes = [
+            models.Index(
+                fields=['tag', 'recipe'],
+                name='recipe_tag_tag_recipe_idx',
+            ),
+        ]
 
     def __str__(self) -> str:
         """Задание текстового представления произведения.
@@ -216,7 +278,7 @@ class RecipeIngredient(models.Model):
 class Purchase(UserRecipeModel):
     """Модель покупки."""
 
-    class Meta:
+    class Meta(UserRecipeModel.Meta):
         verbose_name = 'Покупка'
         verbose_name_plural = 'Покупки'
         default_related_name = 'purchases'
@@ -228,10 +290,259 @@ Purchase._meta.get_field('recipe').verbose_name = 'покупка'
 class Favorite(UserRecipeModel):
     """Модель подписки."""
 
-    class Meta:
+    class Meta(UserRecipeModel.Meta):
         verbose_name = 'Избранное'
         verbose_name_plural = 'Избранные'
         default_related_name = 'favorites'
 
 
 Favorite._meta.get_field('recipe').verbose_name = 'избранное'
+
+
+class CartIngredient(models.Model):
+    """Модель суммарного количества ингредиента в списке покупок."""
+
+    user = models.ForeignKey(
+        User,
+        on_delete=models.CASCADE,
+        verbose_name='пользователь',
+    )
+    ingredient = models.ForeignKey(
+        Ingredient,
+        on_delete=models.CASCADE,
+        verbose_name='ингредиент',
+    )
+    amount = models.PositiveIntegerField(
+        default=0,
+        verbose_name='количество',
+    )
+
+    class Meta:
+        verbose_name = 'Ингредиент списка покупок'
+        verbose_name_plural = 'Ингредиенты списка покупок'
+        default_related_name = 'cart_ingredients'
+        constraints = [
+            models.UniqueConstraint(
+                fields=['user', 'ingredient'],
+                name='unique_user_ingredient',
+            ),
+        ]
+
+    def __str__(self) -> str:
+        """Задание текстового представления ингредиента списка покупок.
+
+        Returns:
+            Строковое представление ингредиента в списке пользователя.
+        """
+        return f'{self.user}, ингредиент - {self.ingredient.name}'
+
+
+class StoredImage(models.Model):
+    """Модель учета ссылок рецептов на файл картинки."""
+
+    name = models.CharField(
+        max_length=DEFAULT_FIELD_LENGTH,
+        unique=True,
+        verbose_name='имя файла',
+    )
+    references = models.PositiveIntegerField(
+        default=0,
+        verbose_name='количество рецептов',
+    )
+
+    class Meta:
+        verbose_name = 'Файл картинки'
+        verbose_name_plural = 'Файлы картинок'
+
+    def __str__(self) -> str:
+        """Задание текстового представления файла картинки.
+
+        Returns:
+            Поле name данного файла.
+        """
+        return self.name
+
+
+class FeedEntry(models.Model):
+    """Модель записи ленты рецептов авторов, на которых подписан пользователь.
+
+    Записи создаются при публикации рецепта для каждого подписчика автора,
+    поэтому лента читается без обхода подписок.
+    """
+
+    user = models.ForeignKey(
+        User,
+        on_delete=models.CASCADE,
+        verbose_name='пользователь',
+    )
+    recipe = models.ForeignKey(
+        Recipe,
+        on_delete=models.CASCADE,
+        verbose_name='рецепт',
+    )
+    created = models.DateTimeField(verbose_name='дата публикации рецепта')
+
+    class Meta:
+        verbose_name = 'Запись ленты'
+        verbose_name_plural = 'Записи ленты'
+        default_related_name = 'feed_entries'
+        constraints = [
+            models.UniqueConstraint(
+                fields=['user', 'recipe'],
+                name='unique_feed_user_recipe',
+            ),
+        ]
+        indexes = [
+            models.Index(
+                fields=['user', '-created'],
+                name='feed_user_created_idx',
+            ),
+        ]
+
+    def __str__(self) -> str:
+        """Задание текстового представления записи ленты.
+
+        Returns:
+            Строку вида 'Лента <пользователь>: <рецепт>'
+        """
+        return f'Лента {self.user}: {self.recipe}'
+
+
+class RecipeRanking(models.Model):
+    """Модель места рецепта в рейтинге популярности за период."""
+
+    DAY = 'day'
+    WEEK = 'week'
+    ALL = 'all'
+    PERIODS = (
+        (DAY, 'сутки'),
+        (WEEK, 'неделя'),
+        (ALL, 'все время'),
+    )
+
+    period = models.CharField(
+        max_length=8,
+        choices=PERIODS,
+        verbose_name='период',
+    )
+    position = models.PositiveIntegerField(verbose_name='место')
+    recipe = models.ForeignKey(
+        Recipe,
+        on_delete=models.CASCADE,
+        verbose_name='рецепт',
+    )
+    score = models.PositiveIntegerField(
+        verbose_name='добавлений в избранное и список покупок',
+    )
+
+    class Meta:
+        ordering = ('position',)
+        verbose_name = 'Место в рейтинге'
+        verbose_name_plural = 'Рейтинг рецептов'
+        default_related_name = 'rankings'
+        constraints = [
+            models.UniqueConstraint(
+                fields=['period', 'position'],
+                name='unique_period_position',
+            ),
+            models.UniqueConstraint(
+                fields=['period', 'recipe'],
+                name='unique_period_recipe',
+            ),
+        ]
+
+    def __str__(self) -> str:
+        """Задание текстового представления места в рейтинге.
+
+        Returns:
+            Строку вида '<период>: <место>. <рецепт>'
+        """
+        return f'{self.get_period_display()}: {self.position}. {self.recipe}'
+
+
+class RecipeRecommendation(models.Model):
+    """Модель рецепта, который добавляют в избранное вместе с другим."""
+
+    recipe = models.ForeignKey(
+        Recipe,
+        on_delete=models.CASCADE,
+        related_name='recommendations',
+        verbose_name='рецепт',
+    )
+    recommended = models.ForeignKey(
+        Recipe,
+        on_delete=models.CASCADE,
+        related_name='recommended_for',
+        verbose_name='рекомендуемый рецепт',
+    )
+    position = models.PositiveSmallIntegerField(verbose_name='место')
+    score = models.FloatField(verbose_name='сходство')
+
+    class Meta:
+        ordering = ('recipe', 'position')
+        verbose_name = 'Рекомендация'
+        verbose_name_plural = 'Рекомендации'
+        constraints = [
+            models.UniqueConstraint(
+                fields=['recipe', 'position'],
+                name='unique_recipe_position',
+            ),
+        ]
+
+    def __str__(self) -> str:
+        """Задание текстового представления рекомендации.
+
+        Returns:
+            Строку вида '<рецепт> -> <рекомендуемый рецепт>'
+        """
+        return f'{self.recipe} -> {self.recommended}'
+
+
+class SimilarityBucket(models.Model):
+    """Модель корзины LSH-индекса наборов ингредиентов рецептов.
+
+    Рецепты с похожими наборами ингредиентов с большой вероятностью
+    попадают хотя бы в одну общую корзину.
+    """
+
+    recipe = models.ForeignKey(
+        Recipe,
+        on_delete=models.CASCADE,
+        verbose_name='рецепт',
+    )
+    key = models.BigIntegerField(db_index=True, verbose_name='корзина')
+
+    class Meta:
+        verbose_name = 'Корзина похожих рецептов'
+        verbose_name_plural = 'Корзины похожих рецептов'
+        default_related_name = 'similarity_buckets'
+
+    def __str__(self) -> str:
+        """Задание текстового представления корзины.
+
+        Returns:
+            Строку вида '<корзина>: <рецепт>'
+        """
+        return f'{self.key}: {self.recipe}'
+
+
+class RecipeIngredientChange(models.Model):
+    """Модель журнала изменений состава рецептов.
+
+    По журналу процессы обновляют индекс рецептов по ингредиентам только
+    для измененных рецептов, не перестраивая его целиком.
+    """
+
+    recipe_id = models.BigIntegerField(verbose_name='id рецепта')
+
+    class Meta:
+        verbose_name = 'Изменение состава рецепта'
+        verbose_name_plural = 'Изменения состава рецептов'
+
+    def __str__(self) -> str:
+        """Задание текстового представления изменения.
+
+        Returns:
+            Строку вида '<номер изменения>: <id рецепта>'
+        """
+        return f'{self.id}: {self.recipe_id}'
@@ -0,0 +1,70 @@
+from collections import defaultdict
+from typing import Dict, Iterable, List, Optional
+
+from django.db.models import F, Window
+from django.db.models.functions import RowNumber
+
+from recipes.models import Recipe
+
+PREVIEW_FIELDS = (
+    'id',
+    'author_id',
+    'name',
+    'image',
+    'image_thumbnail',
+    'image_card',
+    'image_full',
+    'cooking_time',
+)
+
+
+def load_recipe_previews(
+    author_ids: Iterable[int],
+    limit: Optional[int] = None,
+) -> Dict[int, List[Recipe]]:
+    """Функция для загрузки рецептов нескольких авторов одним запросом.
+
+    Если задано ограничение, рецепты каждого автора нумеруются оконной
+    функцией ROW_NUMBER() OVER (PARTITION BY author_id), и из результата
+    выбираются только первые limit рецептов каждого автора.
+
+    Args:
+        author_ids: id авторов.
+        limit: Максимальное количество рецептов одного автора.
+
+    Returns:
+        Словарь вида {id автора: список рецептов в порядке сортировки}.
+    """
+    previews: Dict[int, List[Recipe]] = defaultdict(list)
+    author_ids = list(author_ids)
+    if not author_ids or (limit is not None and limit <= 0):
+        return previews
+    recipes = Recipe.objects.filter(author_id__in=author_ids).only(
+        *PREVIEW_FIELDS,
+    )
+    if limit is None:
+        recipes = recipes.order_by('author_id', *Recipe._meta.ordering)
+    else:
+        ordering = [
+            F(field[1:]).desc() if field.startswith('-') else F(field)
+            for field in Recipe._meta.ordering
+        ]
+        query, params = (
+            recipes.annotate(
+                position=Window(
+                    RowNumber(),
+                    partition_by=[F('author_id')],
+                    order_by=ordering,
+                ),
+            )
+            .order_by()
+            .query.sql_with_params()
+        )
+        recipes = Recipe.objects.raw(
+            f'SELECT * FROM ({query}) AS ranked'
+            ' WHERE position <= %s ORDER BY author_id, position',
+            (*params, limit),
+        )
+    for recipe in recipes:
+        previews[recipe.author_id].append(recipe)
+    return previews
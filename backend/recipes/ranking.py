@@ -0,0 +1,99 @@
+import heapq
+from collections import Counter
+from datetime import datetime, timedelta
+from typing import Dict, List, Optional, Tuple, Type
+
+from django.db import transaction
+from django.db.models import Count, F
+from django.utils import timezone
+
+from core.constants import POPULAR_RANKING_SIZE
+from core.models import UserRecipeModel
+from recipes.models import Favorite, Purchase, Recipe, RecipeRanking
+
+PERIOD_LENGTHS: Dict[str, Optional[timedelta]] = {
+    RecipeRanking.DAY: timedelta(days=1),
+    RecipeRanking.WEEK: timedelta(days=7),
+    RecipeRanking.ALL: None,
+}
+
+
+def count_additions(
+    model: Type[UserRecipeModel],
+    since: datetime,
+) -> Counter:
+    """Функция для подсчета добавлений рецептов за период.
+
+    Args:
+        model: Модель связи пользователя и рецепта.
+        since: Начало периода.
+
+    Returns:
+        Счетчик вида {id рецепта: количество добавлений}.
+    """
+    return Counter(
+        dict(
+            model.objects.filter(created__gte=since)
+            .values_list('recipe_id')
+            .annotate(total=Count('id'))
+            .order_by(),
+        ),
+    )
+
+
+def get_scores(period: str) -> List[Tuple[int, int]]:
+    """Функция для расчета лучших рецептов за период.
+
+    Рейтинг за все время строится по счетчикам рецептов, а за остальные
+    периоды - по добавлениям в избранное и список покупок за период.
+
+    Args:
+        period: Период рейтинга.
+
+    Returns:
+        Список пар (id рецепта, количество добавлений) в порядке рейтинга.
+    """
+    length = PERIOD_LENGTHS[period]
+    if length is None:
+        return list(
+            Recipe.objects.annotate(
+                score=F('favorites_count') + F('in_carts_count'),
+            )
+            .filter(score__gt=0)
+            .order_by('-score', '-id')
+            .values_list('id', 'score')[:POPULAR_RANKING_SIZE],
+        )
+    since = timezone.now() - length
+    scores = count_additions(Favorite, since) + count_additions(
+        Purchase,
+        since,
+    )
+    return heapq.nlargest(
+        POPULAR_RANKING_SIZE,
+        scores.items(),
+        key=lambda item: (item[1], item[0]),
+    )
+
+
+def rank_recipes(period: str) -> int:
+    """Функция для сохранения рейтинга рецептов за период.
+
+    Args:
+        period: Период рейтинга.
+
+    Returns:
+        Количество рецептов в рейтинге.
+    """
+    scores = get_scores(period)
+    with transaction.atomic():
+        RecipeRanking.objects.filter(period=period).delete()
+        RecipeRanking.objects.bulk_create(
+            RecipeRanking(
+                period=period,
+                position=position,
+                recipe_id=recipe_id,
+                score=score,
+            )
+            for position, (recipe_id, score) in enumerate(scores, start=1)
+        )
+    return len(scores)
@@ -0,0 +1,195 @@
+from itertools import islice
+from typing import Iterable, Iterator, Tuple
+
+import numpy as np
+from django.db import transaction
+from scipy import sparse
+
+from recipes.models import Favorite, RecipeRecommendation
+
+Similarities = Iterator[Tuple[int, np.ndarray, np.ndarray]]
+
+
+def read_pairs(
+    pairs: Iterable[Tuple[int, int]],
+    chunk_size: int,
+) -> Tuple[np.ndarray, np.ndarray]:
+    """Функция для чтения пар (пользователь, рецепт) в массивы частями.
+
+    Args:
+        pairs: Итератор пар id пользователя и id рецепта.
+        chunk_size: Количество пар, читаемых за один раз.
+
+    Returns:
+        Массивы id пользователей и id рецептов.
+    """
+    iterator = iter(pairs)
+    users, recipes = [], []
+    while True:
+        chunk = np.fromiter(
+            (value for pair in islice(iterator, chunk_size) for value in pair),
+            dtype=np.int64,
+        )
+        if not chunk.size:
+            break
+        users.append(chunk[::2])
+        recipes.append(chunk[1::2])
+    if not users:
+        return np.empty(0, np.int64), np.empty(0, np.int64)
+    return np.concatenate(users), np.concatenate(recipes)
+
+
+def build_matrix(
+    users: np.ndarray,
+    recipes: np.ndarray,
+) -> Tuple[sparse.csr_matrix, np.ndarray]:
+    """Функция для построения разреженной матрицы пользователь x рецепт.
+
+    Args:
+        users: id пользователей.
+        recipes: id рецептов.
+
+    Returns:
+        Бинарную матрицу добавлений в избранное и массив id рецептов,
+        соответствующих ее столбцам.
+    """
+    _, user_index = np.unique(users, return_inverse=True)
+    recipe_ids, recipe_index = np.unique(recipes, return_inverse=True)
+    matrix = sparse.csr_matrix(
+        (np.ones(len(users), dtype=np.float32), (user_index, recipe_index)),
+        shape=(user_index.max(initial=-1) + 1, len(recipe_ids)),
+    )
+    matrix.data[:] = 1
+    return matrix, recipe_ids
+
+
+def load_favorites(chunk_size: int) -> Tuple[sparse.csr_matrix, np.ndarray]:
+    """Функция для загрузки избранного в разреженную матрицу.
+
+    Args:
+        chunk_size: Количество строк избранного, читаемых за один раз.
+
+    Returns:
+        Матрицу пользователь x рецепт и массив id рецептов ее столбцов.
+    """
+    return build_matrix(
+        *read_pairs(
+            Favorite.objects.values_list('user_id', 'recipe_id')
+            .order_by()
+            .iterator(chunk_size=chunk_size),
+            chunk_size,
+        ),
+    )
+
+
+def top_similar(
+    matrix: sparse.csr_matrix,
+    top_k: int,
+    chunk_size: int,
+) -> Similarities:
+    """Функция для поиска самых похожих рецептов по косинусной мере.
+
+    Совместные добавления считаются произведением транспонированной
+    матрицы на исходную для блока из chunk_size рецептов, поэтому в
+    памяти одновременно хранится только часть матрицы сходства.
+
+    Args:
+        matrix: Бинарная матрица пользователь x рецепт.
+        top_k: Количество похожих рецептов для каждого рецепта.
+        chunk_size: Количество рецептов в блоке.
+
+    Yields:
+        Номер столбца рецепта, номера столбцов похожих рецептов и их
+        сходство в порядке убывания сходства.
+    """
+    norms = np.sqrt(np.asarray(matrix.sum(axis=0)).ravel())
+    transposed = matrix.T.tocsr()
+    for start in range(0, matrix.shape[1], chunk_size):
+        end = min(start + chunk_size, matrix.shape[1])
+        block = (transposed[start:end] @ matrix).tocsr()
+        rows = np.repeat(np.arange(block.shape[0]), np.diff(block.indptr))
+        block.data /= norms[start + rows] * norms[block.indices]
+        block.data[block.indices == start + rows] = 0
+        block.eliminate_zeros()
+        for row in range(block.shape[0]):
+            first, last = block.indptr[row], block.indptr[row + 1]
+            if first == last:
+                continue
+            scores = block.data[first:last]
+            columns = block.indices[first:last]
+            if len(scores) > top_k:
+                best = np.argpartition(-scores, top_k)[:top_k]
+                scores, columns = scores[best], columns[best]
+            order = np.lexsort((columns, -scores))
+            yield start + row, columns[order], scores[order]
+
+
+def save_recommendations(
+    similarities: Similarities,
+    recipe_ids: np.ndarray,
+    batch_size: int,
+) -> int:
+    """Функция для замены сохраненных рекомендаций новыми.
+
+    Args:
+        similarities: Похожие рецепты для каждого рецепта.
+        recipe_ids: id рецептов, соответствующие номерам столбцов.
+        batch_size: Количество рекомендаций, записываемых за один запрос.
+
+    Returns:
+        Количество сохраненных рекомендаций.
+    """
+    counter = 0
+    recommendations = (
+        RecipeRecommendation(
+            recipe_id=int(recipe_ids[column]),
+            recommended_id=int(recipe_ids[similar]),
+            position=position,
+            score=float(score),
+        )
+        for column, similar_columns, scores in similarities
+        for position, (similar, score) in enumerate(
+            zip(similar_columns, scores),
+            start=1,
+        )
+    )
+    with transaction.atomic():
+        RecipeRecommendation.objects.all().delete()
+        while True:
+            batch = list(islice(recommendations, batch_size))
+            if not batch:
+                return counter
+            RecipeRecommendation.objects.bulk_create(batch)
+            counter += len(batch)
+
+
+def synthetic_favorites(
+    users: int,
+    recipes: int,
+    favorites: int,
+    seed: int = 0,
+) -> Tuple[sparse.csr_matrix, np.ndarray]:
+    """Функция для создания случайной матрицы избранного для замеров.
+
+    Популярность рецептов убывает по степенному закону, как у реальных
+    данных, где немногие рецепты собирают большую часть добавлений.
+
+    Args:
+        users: Количество пользователей.
+        recipes: Количество рецептов.
+        favorites: Количество добавлений в избранное.
+        seed: Начальное значение генератора случайных чисел.
+
+    Returns:
+        Матрицу пользователь x рецепт и массив id рецептов ее столбцов.
+    """
+    generator = np.random.default_rng(seed)
+    popularity = 1 / np.arange(1, recipes + 1) ** 0.8
+    return build_matrix(
+        generator.integers(0, users, size=favorites),
+        generator.choice(
+            recipes,
+            size=favorites,
+            p=popularity / popularity.sum(),
+        ),
+    )
@@ -0,0 +1,125 @@
+from bisect import bisect_left
+from typing import Any, Dict, Iterable, List, Tuple
+
+from core.utils import normalize_name
+from core.versions import VersionedCache
+from recipes.models import Ingredient, Tag
+
+REFERENCE_VERSION = 'reference'
+
+IngredientData = Dict[str, Any]
+TagData = Dict[str, Any]
+
+
+class IngredientIndex:
+    """Отсортированный по нормализованному названию индекс ингредиентов."""
+
+    def __init__(self, rows: Iterable[Tuple[int, str, str]]) -> None:
+        entries = sorted(
+            (normalize_name(name), name, measurement_unit, ingredient_id)
+            for ingredient_id, name, measurement_unit in rows
+        )
+        self.keys = [entry[0] for entry in entries]
+        self.items: List[IngredientData] = [
+            {'id': ingredient_id, 'name': name, 'measurement_unit': unit}
+            for _, name, unit, ingredient_id in entries
+        ]
+        self.by_id = {item['id']: item for item in self.items}
+
+    def search(self, prefix: str, limit: int) -> List[IngredientData]:
+        """Поиск ингредиентов, название которых начинается с префикса.
+
+        Args:
+            prefix: Начало названия ингредиента.
+            limit: Максимальное количество найденных ингредиентов.
+
+        Returns:
+            Список найденных ингредиентов.
+        """
+        key = normalize_name(prefix)
+        start = bisect_left(self.keys, key)
+        end = start
+        stop = min(start + limit, len(self.keys))
+        while end < stop and self.keys[end].startswith(key):
+            end += 1
+        return self.items[start:end]
+
+    def all(self) -> List[IngredientData]:
+        """Получение всех ингредиентов индекса.
+
+        Returns:
+            Список всех ингредиентов.
+        """
+        return self.items
+
+
+class TagIndex:
+    """Упорядоченный по названию справочник тегов."""
+
+    def __init__(self, rows: Iterable[Tuple[int, str, str, str]]) -> None:
+        self.items: List[TagData] = [
+            {'id': tag_id, 'name': name, 'color': color, 'slug': slug}
+            for tag_id, name, color, slug in rows
+        ]
+        self.by_id = {item['id']: item for item in self.items}
+        self.ids = {item['slug']: item['id'] for item in self.items}
+        self.choices = [(item['slug'], item['name']) for item in self.items]
+
+    def get_ids(self, slugs: Iterable[str]) -> List[int]:
+        """Получение id тегов по слагам.
+
+        Args:
+            slugs: Слаги тегов.
+
+        Returns:
+            id известных тегов, неизвестные слаги пропускаются.
+        """
+        return [self.ids[slug] for slug in slugs if slug in self.ids]
+
+    def all(self) -> List[TagData]:
+        """Получение всех тегов справочника.
+
+        Returns:
+            Список всех тегов.
+        """
+        return self.items
+
+
+class Registry:
+    """Справочники тегов и ингредиентов, загруженные в память процесса."""
+
+    def __init__(self) -> None:
+        self.ingredients = IngredientIndex(
+            Ingredient.objects.values_list(
+                'id',
+                'name',
+                'measurement_unit',
+            ).iterator(),
+        )
+        self.tags = TagIndex(
+            Tag.objects.values_list('id', 'name', 'color', 'slug'),
+        )
+
+
+_registry = VersionedCache(REFERENCE_VERSION, Registry)
+
+
+def get_registry() -> Registry:
+    """Получение справочников тегов и ингредиентов текущего процесса.
+
+    Справочники загружаются при первом обращении и загружаются заново,
+    когда версия справочников в общем кеше изменяется.
+
+    Returns:
+        Актуальные справочники.
+    """
+    return _registry.get()
+
+
+def get_tag_choices() -> List[Tuple[str, str]]:
+    """Получение вариантов выбора тегов для фильтров.
+
+    Returns:
+        Список пар (слаг, название) тегов.
+    """
+    return get_registry().tags.choices
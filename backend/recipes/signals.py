@@ -0,0 +1,371 @@
+from typing import Any, Dict, FrozenSet, Optional, Tuple, Type
+
+from django.db import transaction
+from django.db.models import Model
+from django.db.models.signals import (
+    post_delete,
+    post_init,
+    post_save,
+    pre_delete,
+    pre_save,
+)
+from django.dispatch import receiver
+
+from core.utils import change_counter
+from core.versions import bump_version_on_commit
+from recipes.cart import add_recipe_to_cart, remove_recipe_from_cart
+from recipes.feed import backfill_feed, fan_out_recipe, remove_from_feed
+from recipes.images import acquire_image, release_image
+from recipes.index import recipe_ingredients_changed
+from recipes.models import (
+    Favorite,
+    Ingredient,
+    Purchase,
+    Recipe,
+    RecipeIngredient,
+    Tag,
+)
+from recipes.registry import REFERENCE_VERSION
+from users.models import Following, User
+
+COUNTED_MODELS: Dict[Type[Model], Tuple[str, Type[Model], str]] = {
+    Favorite: ('recipe_id', Recipe, 'favorites_count'),
+    Purchase: ('recipe_id', Recipe, 'in_carts_count'),
+    Recipe: ('author_id', User, 'recipes_count'),
+    Following: ('following_id', User, 'followers_count'),
+}
+
+
+@receiver(post_save, sender=Ingredient)
+@receiver(post_delete, sender=Ingredient)
+@receiver(post_save, sender=Tag)
+@receiver(post_delete, sender=Tag)
+def reference_data_changed(sender: Any, **kwargs: Any) -> None:
+    """Изменение версии справочников при изменении тегов и ингредиентов.
+
+    Args:
+        sender: Модель, отправившая сигнал.
+        **kwargs: Передаваемые именованные аргументы.
+    """
+    bump_version_on_commit(REFERENCE_VERSION)
+
+
+@receiver(post_init, sender=Recipe)
+def remember_recipe_image(
+    sender: Any,
+    instance: Recipe,
+    **kwargs: Any,
+) -> None:
+    """Запоминание картинки загруженного рецепта.
+
+    Если картинка не загружалась из базы данных, она будет прочитана перед
+    сохранением рецепта.
+
+    Args:
+        sender: Модель, отправившая сигнал.
+        instance: Загруженный рецепт.
+        **kwargs: Передаваемые именованные аргументы.
+    """
+    if instance.pk is None:
+        instance._saved_image = None
+    elif 'image' in instance.__dict__:
+        image = instance.__dict__['image']
+        instance._saved_image = getattr(image, 'name', image) or None
+
+
+@receiver(pre_save, sender=Recipe)
+def load_recipe_image(
+    sender: Any,
+    instance: Recipe,
+    **kwargs: Any,
+) -> None:
+    """Чтение картинки рецепта, загруженного без поля картинки.
+
+    Args:
+        sender: Модель, отправившая сигнал.
+        instance: Сохраняемый рецепт.
+        **kwargs: Передаваемые именованные аргументы.
+    """
+    if instance.pk is not None and not hasattr(instance, '_saved_image'):
+        instance._saved_image = (
+            Recipe.objects.filter(pk=instance.pk)
+            .values_list('image', flat=True)
+            .first()
+        ) or None
+
+
+@receiver(post_save, sender=Recipe)
+def recipe_image_saved(
+    sender: Any,
+    instance: Recipe,
+    update_fields: Optional[FrozenSet[str]],
+    **kwargs: Any,
+) -> None:
+    """Учет ссылок на картинки при изменении картинки рецепта.
+
+    Args:
+        sender: Модель, отправившая сигнал.
+        instance: Сохраненный рецепт.
+        update_fields: Сохраненные поля, если сохранялись не все.
+        **kwargs: Передаваемые именованные аргументы.
+    """
+    if update_fields is not None and 'image' not in update_fields:
+        return
+    saved_image = getattr(instance, '_saved_image', None)
+    image = instance.image.name or None
+    if image == saved_image:
+        return
+    if image:
+        acquire_image(image)
+    if saved_image:
+        release_image(saved_image)
+    instance._saved_image = image
+
+
+@receiver(post_delete, sender=Recipe)
+def recipe_image_deleted(
+    sender: Any,
+    instance: Recipe,
+    **kwargs: Any,
+) -> None:
+    """Удаление ссылки на картинку при удалении рецепта.
+
+    Args:
+        sender: Модель, отправившая сигнал.
+        instance: Удаленный рецепт.
+        **kwargs: Передаваемые именованные аргументы.
+    """
+    if instance.image:
+        release_image(instance.image.name)
+
+
+@receiver(post_save, sender=Recipe)
+def recipe_published(
+    sender: Any,
+    instance: Recipe,
+    created: bool,
+    **kwargs: Any,
+) -> None:
+    """Запись нового рецепта в ленты подписчиков автора.
+
+    Рецепт записывается после фиксации транзакции, чтобы не удерживать
+    транзакцию создания рецепта на время записи в ленты.
+
+    Args:
+        sender: Модель, отправившая сигнал.
+        instance: Сохраненный рецепт.
+        created: Рецепт создан, а не изменен.
+        **kwargs: Передаваемые именованные аргументы.
+    """
+    if created:
+        transaction.on_commit(lambda: fan_out_recipe(instance))
+
+
+@receiver(post_save, sender=Following)
+def following_created(
+    sender: Any,
+    instance: Following,
+    created: bool,
+    **kwargs: Any,
+) -> None:
+    """Запись последних рецептов автора в ленту нового подписчика.
+
+    Args:
+        sender: Модель, отправившая сигнал.
+        instance: Сохраненная подписка.
+        created: Подписка создана, а не изменена.
+        **kwargs: Передаваемые именованные аргументы.
+    """
+    if created:
+        backfill_feed(instance.user_id, instance.following_id)
+
+
+@receiver(post_delete, sender=Following)
+def following_deleted(
+    sender: Any,
+    instance: Following,
+    **kwargs: Any,
+) -> None:
+    """Удаление рецептов автора из ленты бывшего подписчика.
+
+    Args:
+        sender: Модель, отправившая сигнал.
+        instance: Удаленная подписка.
+        **kwargs: Передаваемые именованные аргументы.
+    """
+    remove_from_feed(instance.user_id, instance.following_id)
+
+
+@receiver(post_delete, sender=Recipe)
+def recipe_deleted(sender: Any, instance: Recipe, **kwargs: Any) -> None:
+    """Запись изменения состава рецептов при удалении рецепта.
+
+    Args:
+        sender: Модель, отправившая сигнал.
+        instance: Удаленный рецепт.
+        **kwargs: Передаваемые именованные аргументы.
+    """
+    recipe_ingredients_changed([instance.id])
+
+
+@receiver(pre_delete, sender=Ingredient)
+def ingredient_deleted(
+    sender: Any,
+    instance: Ingredient,
+    **kwargs: Any,
+) -> None:
+    """Запись изменения состава рецептов, из которых удаляется ингредиент.
+
+    Args:
+        sender: Модель, отправившая сигнал.
+        instance: Удаляемый ингредиент.
+        **kwargs: Передаваемые именованные аргументы.
+    """
+    recipe_ids = list(
+        RecipeIngredient.objects.filter(ingredient=instance).values_list(
+            'recipe_id',
+            flat=True,
+        ),
+    )
+    if recipe_ids:
+        recipe_ingredients_changed(recipe_ids)
+
+
+@receiver(post_init, sender=Favorite)
+@receiver(post_init, sender=Purchase)
+@receiver(post_init, sender=Recipe)
+@receiver(post_init, sender=Following)
+def counted_object_loaded(sender: Any, instance: Model, **kwargs: Any) -> None:
+    """Запоминание id объекта со счетчиком при загрузке модели.
+
+    Args:
+        sender: Модель, отправившая сигнал.
+        instance: Загруженный объект.
+        **kwargs: Передаваемые именованные аргументы.
+    """
+    field, _, _ = COUNTED_MODELS[sender]
+    instance._counted_id = instance.__dict__.get(field)
+
+
+@receiver(post_save, sender=Favorite)
+@receiver(post_save, sender=Purchase)
+@receiver(post_save, sender=Recipe)
+@receiver(post_save, sender=Following)
+def counted_object_saved(
+    sender: Any,
+    instance: Model,
+    created: bool,
+    **kwargs: Any,
+) -> None:
+    """Изменение денормализованных счетчиков при сохранении объекта.
+
+    Счетчики изменяются в той же транзакции, что и сам объект, поэтому
+    учитываются изменения из API, админки и management-команд, а при
+    откате транзакции откатываются и счетчики.
+
+    Args:
+        sender: Модель, отправившая сигнал.
+        instance: Сохраненный объект.
+        created: Объект создан, а не изменен.
+        **kwargs: Передаваемые именованные аргументы.
+    """
+    field, model, counter = COUNTED_MODELS[sender]
+    counted_id = getattr(instance, field)
+    previous_id = getattr(instance, '_counted_id', None)
+    if created:
+        change_counter(
+            model.objects.filter(id=counted_id),
+            counter,
+            1,
+        )
+    elif previous_id is not None and previous_id != counted_id:
+        change_counter(
+            model.objects.filter(id=previous_id),
+            counter,
+            -1,
+        )
+        change_counter(
+            model.objects.filter(id=counted_id),
+            counter,
+            1,
+        )
+    instance._counted_id = counted_id
+
+
+@receiver(post_delete, sender=Favorite)
+@receiver(post_delete, sender=Purchase)
+@receiver(post_delete, sender=Recipe)
+@receiver(post_delete, sender=Following)
+def counted_object_deleted(
+    sender: Any,
+    instance: Model,
+    **kwargs: Any,
+) -> None:
+    """Изменение денормализованных счетчиков при удалении объекта.
+
+    Args:
+        sender: Модель, отправившая сигнал.
+        instance: Удаленный объект.
+        **kwargs: Передаваемые именованные аргументы.
+    """
+    field, model, counter = COUNTED_MODELS[sender]
+    change_counter(
+        model.objects.filter(id=getattr(instance, field)),
+        counter,
+        -1,
+    )
+
+
+@receiver(post_init, sender=Purchase)
+def remember_purchase(sender: Any, instance: Purchase, **kwargs: Any) -> None:
+    """Запоминание пользователя и рецепта загруженной покупки.
+
+    Args:
+        sender: Модель, отправившая сигнал.
+        instance: Загруженная покупка.
+        **kwargs: Передаваемые именованные аргументы.
+    """
+    instance._saved_purchase = (
+        instance.__dict__.get('user_id'),
+        instance.__dict__.get('recipe_id'),
+    )
+
+
+@receiver(post_save, sender=Purchase)
+def purchase_saved(
+    sender: Any,
+    instance: Purchase,
+    created: bool,
+    **kwargs: Any,
+) -> None:
+    """Учет ингредиентов рецепта в списке покупок при сохранении покупки.
+
+    Args:
+        sender: Модель, отправившая сигнал.
+        instance: Сохраненная покупка.
+        created: Покупка создана, а не изменена.
+        **kwargs: Передаваемые именованные аргументы.
+    """
+    purchase = (instance.user_id, instance.recipe_id)
+    user_id, recipe_id = getattr(instance, '_saved_purchase', (None, None))
+    if not created and (purchase == (user_id, recipe_id) or user_id is None):
+        return
+    if not created:
+        remove_recipe_from_cart(user_id, recipe_id)
+    add_recipe_to_cart(*purchase)
+    instance._saved_purchase = purchase
+
+
+@receiver(pre_delete, sender=Purchase)
+def purchase_deleted(sender: Any, instance: Purchase, **kwargs: Any) -> None:
+    """Удаление ингредиентов рецепта из списка покупок при удалении покупки.
+
+    Сигнал отправляется до удаления ингредиентов рецепта, в том числе при
+    каскадном удалении рецепта, поэтому количество еще можно прочитать.
+
+    Args:
+        sender: Модель, отправившая сигнал.
+        instance: Удаляемая покупка.
+        **kwargs: Передаваемые именованные аргументы.
+    """
+    remove_recipe_from_cart(instance.user_id, instance.recipe_id)
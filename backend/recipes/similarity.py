@@ -0,0 +1,165 @@
+import hashlib
+import random
+from collections import defaultdict
+from itertools import groupby
+from operator import itemgetter
+from typing import Dict, Iterable, List, Set, Tuple
+
+from django.db import transaction
+from django.db.models import Count
+
+from core.constants import (
+    MINHASH_BANDS,
+    MINHASH_PERMUTATIONS,
+    SIMILAR_RECIPES_CANDIDATES,
+    SIMILAR_RECIPES_SIZE,
+)
+from recipes.models import RecipeIngredient, SimilarityBucket
+
+MERSENNE_PRIME = (1 << 61) - 1
+
+_random = random.Random(MINHASH_PERMUTATIONS)
+PERMUTATIONS = [
+    (_random.randrange(1, MERSENNE_PRIME), _random.randrange(MERSENNE_PRIME))
+    for _ in range(MINHASH_PERMUTATIONS)
+]
+
+BAND_ROWS = MINHASH_PERMUTATIONS // MINHASH_BANDS
+
+
+def get_signature(ingredient_ids: Iterable[int]) -> List[int]:
+    """Функция для расчета MinHash-подписи набора ингредиентов.
+
+    Args:
+        ingredient_ids: id ингредиентов рецепта.
+
+    Returns:
+        Минимальные значения хеш-функций на наборе ингредиентов.
+    """
+    ingredient_ids = list(ingredient_ids)
+    return [
+        min((a * value + b) % MERSENNE_PRIME for value in ingredient_ids)
+        for a, b in PERMUTATIONS
+    ]
+
+
+def get_bucket_keys(ingredient_ids: Iterable[int]) -> Set[int]:
+    """Функция для получения корзин LSH-индекса для набора ингредиентов.
+
+    Подпись делится на полосы, и каждая полоса вместе со своим номером
+    хешируется в 63-битный ключ корзины.
+
+    Args:
+        ingredient_ids: id ингредиентов рецепта.
+
+    Returns:
+        Ключи корзин, в которые попадает рецепт.
+    """
+    ingredient_ids = list(ingredient_ids)
+    if not ingredient_ids:
+        return set()
+    signature = get_signature(ingredient_ids)
+    keys = set()
+    for band in range(MINHASH_BANDS):
+        first, last = band * BAND_ROWS, (band + 1) * BAND_ROWS
+        rows = signature[first:last]
+        digest = hashlib.blake2b(
+            repr((band, rows)).encode(),
+            digest_size=8,
+        ).digest()
+        keys.add(int.from_bytes(digest, 'big') >> 1)
+    return keys
+
+
+def index_recipe(recipe_id: int, ingredient_ids: Iterable[int]) -> None:
+    """Функция для обновления корзин LSH-индекса одного рецепта.
+
+    Args:
+        recipe_id: id рецепта.
+        ingredient_ids: id ингредиентов рецепта.
+    """
+    with transaction.atomic():
+        SimilarityBucket.objects.filter(recipe_id=recipe_id).delete()
+        SimilarityBucket.objects.bulk_create(
+            SimilarityBucket(recipe_id=recipe_id, key=key)
+            for key in get_bucket_keys(ingredient_ids)
+        )
+
+
+def rebuild_similarity_index(batch_size: int = 1000) -> int:
+    """Функция для пересоздания LSH-индекса всех рецептов.
+
+    Ингредиенты читаются потоком в порядке id рецептов, поэтому в памяти
+    хранится только порция корзин.
+
+    Args:
+        batch_size: Количество корзин, записываемых за один запрос.
+
+    Returns:
+        Количество проиндексированных рецептов.
+    """
+    counter = 0
+    buckets: List[SimilarityBucket] = []
+    rows = (
+        RecipeIngredient.objects.values_list('recipe_id', 'ingredient_id')
+        .order_by('recipe_id')
+        .iterator(chunk_size=batch_size)
+    )
+    with transaction.atomic():
+        SimilarityBucket.objects.all().delete()
+        for recipe_id, group in groupby(rows, key=itemgetter(0)):
+            counter += 1
+            buckets.extend(
+                SimilarityBucket(recipe_id=recipe_id, key=key)
+                for key in get_bucket_keys(item[1] for item in group)
+            )
+            if len(buckets) >= batch_size:
+                SimilarityBucket.objects.bulk_create(buckets)
+                buckets = []
+        SimilarityBucket.objects.bulk_create(buckets)
+    return counter
+
+
+def find_similar(recipe_id: int) -> List[Tuple[int, float]]:
+    """Функция для поиска рецептов с похожим набором ингредиентов.
+
+    Кандидаты выбираются по количеству общих корзин LSH-индекса, после
+    чего для них считается точный коэффициент Жаккара.
+
+    Args:
+        recipe_id: id рецепта.
+
+    Returns:
+        Список пар (id рецепта, коэффициент Жаккара) в порядке убывания
+        сходства.
+    """
+    candidates = list(
+        SimilarityBucket.objects.filter(
+            key__in=SimilarityBucket.objects.filter(
+                recipe_id=recipe_id,
+            ).values('key'),
+        )
+        .exclude(recipe_id=recipe_id)
+        .values('recipe_id')
+        .annotate(shared=Count('id'))
+        .order_by('-shared', 'recipe_id')
+        .values_list('recipe_id', flat=True)[:SIMILAR_RECIPES_CANDIDATES],
+    )
+    if not candidates:
+        return []
+    ingredients: Dict[int, Set[int]] = defaultdict(set)
+    for candidate_id, ingredient_id in RecipeIngredient.objects.filter(
+        recipe_id__in=[recipe_id, *candidates],
+    ).values_list('recipe_id', 'ingredient_id'):
+        ingredients[candidate_id].add(ingredient_id)
+    source = ingredients[recipe_id]
+    scores = [
+        (
+            candidate_id,
+            len(source & ingredients[candidate_id])
+            / len(source | ingredients[candidate_id]),
+        )
+        for candidate_id in candidates
+    ]
+    scores.sort(key=lambda item: (-item[1], item[0]))
+    return scores[:SIMILAR_RECIPES_SIZE]
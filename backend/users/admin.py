@@ -3,12 +3,13 @@ from typing import Any, Dict, Optional
 from django.contrib import admin
 from django.contrib.auth.admin import UserAdmin as DefaultUserAdmin
 from django.contrib.auth.models import Group
-from django.db.models import Q
+from django.db.models import Q, QuerySet
 from django.db.models.fields.related import ForeignKey
 from django.forms import ModelChoiceField
 from django.http import HttpRequest
 from django.urls import resolve
 
+from core.utils import count_related
 from recipes.models import Favorite, Purchase
 from users.models import Following, User
 
@@ -91,13 +92,37 @@ class UserAdmin(DefaultUserAdmin):
         'get_favorites',
         'get_followings',
         'get_purchases',
+        'recipes_count',
+        'followers_count',
     )
     search_fields = ('username', 'email')
     list_filter = ('username', 'email')
-    readonly_fields = ('id',)
+    readonly_fields = ('id', 'recipes_count', 'followers_count')
     empty_value_display = '-пусто-'
     inlines = [FavoriteInlineAdmin, FollowingInlineAdmin, PurchaseInlineAdmin]
 
+    def get_queryset(self, request: HttpRequest) -> QuerySet:
+        """Функция для добавления к пользователям количества связей.
+
+        Args:
+            request: Передаваемый запрос.
+
+        Returns:
+            QuerySet, содержащий пользователей с количеством связей.
+        """
+        return (
+            super()
+            .get_queryset(request)
+            .annotate(
+                favorites_total=count_related(Favorite.objects.all(), 'user'),
+                followings_total=count_related(
+                    Following.objects.all(),
+                    'user',
+                ),
+                purchases_total=count_related(Purchase.objects.all(), 'user'),
+            )
+        )
+
     @admin.display(description='Избранное')
     def get_favorites(self, obj: User) -> int:
         """Отображение списка избранного пользователя.
@@ -108,7 +133,7 @@ class UserAdmin(DefaultUserAdmin):
         Returns:
             Список избранных рецептов пользователя.
         """
-        return obj.favorites.all().count()
+        return obj.favorites_total  # type:ignore[attr-defined]
 
     @admin.display(description='Подписки')
     def get_followings(self, obj: User) -> int:
@@ -120,7 +145,7 @@ class UserAdmin(DefaultUserAdmin):
         Returns:
             Список подписок пользователя.
         """
-        return obj.followings.all().count()
+        return obj.followings_total  # type:ignore[attr-defined]
 
     @admin.display(description='Список покупок')
     def get_purchases(self, obj: User) -> int:
@@ -132,7 +157,7 @@ class UserAdmin(DefaultUserAdmin):
         Returns:
             Список покупок пользователя.
         """
-        return obj.purchases.all().count()
+        return obj.purchases_total  # type:ignore[attr-defined]
 
 
 admin.site.unregister(Group)
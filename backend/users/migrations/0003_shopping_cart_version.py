@@ -0,0 +1,19 @@
+# Generated by Django 3.2.16 on 2026-10-18 01:38
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ('users', '0002_counters'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='user',
+            name='shopping_cart_version',
+            field=models.PositiveIntegerField(
+                default=0, editable=False, verbose_name='версия списка покупок'
+            ),
+        ),
+    ]
@@ -3,6 +3,7 @@ from typing import Dict, List, Union
 from rest_framework import serializers
 
 from core.types import SerializerStrData
+from core.viewer import get_viewer_context
 from recipes.serializers import RecipeNestedSerializer
 from users.models import User
 
@@ -62,14 +63,16 @@ class UserReadSerializer(serializers.ModelSerializer):
         Returns:
             Наличие подписки текущего пользователя на данного.
         """
-        return self.context['request'].user in obj.followers.all()
+        return get_viewer_context(self.context['request']).is_subscribed(
+            obj.id,
+        )
 
 
 class FollowingSerializer(serializers.ModelSerializer):
     """Сериализатор для отображения подписки."""
 
     recipes = serializers.SerializerMethodField('paginated_recipes')
-    recipes_count = serializers.IntegerField(source='recipes.count')
+    recipes_count = serializers.IntegerField(read_only=True)
     is_subscribed = serializers.SerializerMethodField()
 
     class Meta:
@@ -94,7 +97,9 @@ class FollowingSerializer(serializers.ModelSerializer):
         Returns:
             Наличие подписки текущего пользователя на данного.
         """
-        return self.context['request'].user in obj.followers.all()
+        return get_viewer_context(self.context['request']).is_subscribed(
+            obj.id,
+        )
 
     def paginated_recipes(self, obj: User) -> List[Dict[str, Union[str, int]]]:
         """Формирование списка рецептов пользователя.
@@ -0,0 +1,119 @@
+import base64
+import io
+from typing import Callable, Dict, List, Optional
+
+import pytest
+from PIL import Image
+from rest_framework.test import APIClient
+
+from recipes.models import Ingredient, Tag
+from users.models import User
+
+
+def png_base64(size: tuple = (10, 10), color: tuple = (255, 0, 0)) -> str:
+    buffer = io.BytesIO()
+    Image.new('RGB', size, color).save(buffer, 'PNG')
+    encoded = base64.b64encode(buffer.getvalue()).decode()
+    return f'data:image/png;base64,{encoded}'
+
+
+@pytest.fixture(autouse=True)
+def isolated_settings(settings, tmp_path) -> None:
+    from django.core.cache import cache
+
+    settings.MEDIA_ROOT = str(tmp_path)
+    settings.IMAGE_PROCESSING_WORKERS = 0
+    settings.VERSION_CHECK_INTERVAL = 0
+    cache.clear()
+
+
+@pytest.fixture
+def user(django_user_model) -> User:
+    return django_user_model.objects.create_user(
+        email='cook@foodgram.ru',
+        username='cook',
+        first_name='Повар',
+        last_name='Поваров',
+        password='Secret12345!',
+    )
+
+
+@pytest.fixture
+def other_user(django_user_model) -> User:
+    return django_user_model.objects.create_user(
+        email='guest@foodgram.ru',
+        username='guest',
+        first_name='Гость',
+        last_name='Гостев',
+        password='Secret12345!',
+    )
+
+
+@pytest.fixture
+def client(user) -> APIClient:
+    client = APIClient()
+    client.force_authenticate(user)
+    return client
+
+
+@pytest.fixture
+def tags(django_capture_on_commit_callbacks) -> List[Tag]:
+    with django_capture_on_commit_callbacks(execute=True):
+        return [
+            Tag.objects.create(
+                name=f'Тег {index}',
+                color='#FFFFFF',
+                slug=f'tag{index}',
+            )
+            for index in range(3)
+        ]
+
+
+@pytest.fixture
+def ingredients(django_capture_on_commit_callbacks) -> List[Ingredient]:
+    with django_capture_on_commit_callbacks(execute=True):
+        return [
+            Ingredient.objects.create(
+                name=f'Ингредиент {index:03d}',
+                measurement_unit='г',
+            )
+            for index in range(60)
+        ]
+
+
+@pytest.fixture
+def recipe_data(tags, ingredients) -> Callable[..., Dict]:
+    def make(count: int = 3, **fields) -> Dict:
+        data = {
+            'ingredients': [
+                {'id': ingredient.id, 'amount': 10 + index}
+                for index, ingredient in enumerate(ingredients[:count])
+            ],
+            'tags': [tags[0].id, tags[1].id],
+            'image': png_base64(),
+            'name': 'Рецепт',
+            'text': 'Описание',
+            'cooking_time': 5,
+        }
+        data.update(fields)
+        return data
+
+    return make
+
+
+@pytest.fixture
+def make_recipe(client, recipe_data) -> Callable[..., Dict]:
+    def make(
+        count: int = 3,
+        api_client: Optional[APIClient] = None,
+        **fields,
+    ) -> Dict:
+        response = (api_client or client).post(
+            '/api/recipes/',
+            recipe_data(count, **fields),
+            format='json',
+        )
+        assert response.status_code == 201, response.content
+        return response.json()
+
+    return make
@@ -0,0 +1,70 @@
+import pytest
+
+from recipes.models import CartIngredient, Purchase, Recipe
+
+pytestmark = pytest.mark.django_db
+
+
+def get_cart(user) -> dict:
+    return dict(
+        CartIngredient.objects.filter(user=user).values_list(
+            'ingredient_id',
+            'amount',
+        ),
+    )
+
+
+def test_cart_follows_purchases_outside_api(
+    client,
+    user,
+    make_recipe,
+    ingredients,
+) -> None:
+    first = make_recipe(count=2)['id']
+    second = make_recipe(count=3)['id']
+    client.post(f'/api/recipes/{first}/shopping_cart/')
+    purchase = Purchase.objects.create(user=user, recipe_id=second)
+    assert get_cart(user) == {
+        ingredients[0].id: 20,
+        ingredients[1].id: 22,
+        ingredients[2].id: 12,
+    }
+
+    purchase.recipe_id = first
+    Purchase.objects.filter(recipe_id=first).delete()
+    purchase.save()
+    assert get_cart(user) == {ingredients[0].id: 10, ingredients[1].id: 11}
+
+    Recipe.objects.get(id=first).delete()
+    assert get_cart(user) == {}
+    assert not CartIngredient.objects.exists()
+
+
+def test_shopping_file_etag_follows_reference_and_cart_changes(
+    client,
+    user,
+    make_recipe,
+    ingredients,
+    django_capture_on_commit_callbacks,
+) -> None:
+    first = make_recipe(count=2)['id']
+    second = make_recipe(count=1)['id']
+    client.post(f'/api/recipes/{first}/shopping_cart/')
+    client.post(f'/api/recipes/{second}/shopping_cart/')
+    url = '/api/recipes/download_shopping_cart/?format=txt'
+    user.refresh_from_db()
+    etag = client.get(url)['ETag']
+    assert client.get(url, HTTP_IF_NONE_MATCH=etag).status_code == 304
+
+    with django_capture_on_commit_callbacks(execute=True):
+        ingredients[0].name = 'Переименованный ингредиент'
+        ingredients[0].save()
+    response = client.get(url, HTTP_IF_NONE_MATCH=etag)
+    assert response.status_code == 200
+    content = b''.join(response.streaming_content).decode()
+    assert 'Переименованный ингредиент' in content
+
+    etag = response['ETag']
+    Recipe.objects.get(id=first).delete()
+    user.refresh_from_db()
+    assert client.get(url, HTTP_IF_NONE_MATCH=etag).status_code == 200
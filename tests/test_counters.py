@@ -0,0 +1,55 @@
+import pytest
+from django.db import transaction
+
+from recipes.models import Favorite, Purchase, Recipe
+from users.models import Following, User
+
+pytestmark = pytest.mark.django_db
+
+
+def test_counters_follow_api_and_cascades(
+    client,
+    user,
+    other_user,
+    make_recipe,
+    django_capture_on_commit_callbacks,
+) -> None:
+    with django_capture_on_commit_callbacks(execute=True):
+        recipe_id = make_recipe()['id']
+        client.post(f'/api/recipes/{recipe_id}/favorite/')
+        client.post(f'/api/recipes/{recipe_id}/shopping_cart/')
+        Following.objects.create(user=other_user, following=user)
+    recipe = Recipe.objects.get(id=recipe_id)
+    author = User.objects.get(id=user.id)
+    assert (recipe.favorites_count, recipe.in_carts_count) == (1, 1)
+    assert (author.recipes_count, author.followers_count) == (1, 1)
+
+    with django_capture_on_commit_callbacks(execute=True):
+        Purchase.objects.filter(recipe_id=recipe_id).delete()
+        other_user.delete()
+    recipe.refresh_from_db()
+    author.refresh_from_db()
+    assert recipe.in_carts_count == 0
+    assert author.followers_count == 0
+
+    with django_capture_on_commit_callbacks(execute=True):
+        recipe.delete()
+    author.refresh_from_db()
+    assert author.recipes_count == 0
+    assert not Favorite.objects.exists()
+
+
+def test_counters_change_inside_the_transaction(
+    other_user,
+    make_recipe,
+) -> None:
+    recipe = Recipe.objects.get(id=make_recipe()['id'])
+    with pytest.raises(RuntimeError):
+        with transaction.atomic():
+            Favorite.objects.create(user=other_user, recipe=recipe)
+            recipe.refresh_from_db()
+            assert recipe.favorites_count == 1
+            raise RuntimeError
+    recipe.refresh_from_db()
+    assert recipe.favorites_count == 0
+    assert not Favorite.objects.exists()
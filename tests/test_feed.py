@@ -0,0 +1,36 @@
+import pytest
+from rest_framework.test import APIClient
+
+from recipes.feed import get_feed
+from recipes.models import FeedEntry
+
+pytestmark = pytest.mark.django_db
+
+
+def test_feed_is_ordered_and_paginated_by_feed_entries(
+    client,
+    user,
+    other_user,
+    make_recipe,
+    django_capture_on_commit_callbacks,
+) -> None:
+    author = APIClient()
+    author.force_authenticate(other_user)
+    with django_capture_on_commit_callbacks(execute=True):
+        client.post(f'/api/users/{other_user.id}/subscribe/')
+        recipe_ids = [make_recipe(api_client=author)['id'] for _ in range(5)]
+    assert FeedEntry.objects.filter(user=user).count() == 5
+
+    query = str(get_feed(user).query)
+    table = FeedEntry._meta.db_table
+    assert query.count('JOIN') == 1
+    assert f'"{table}"."created" AS "feed_created"' in query
+    assert 'ORDER BY "feed_created" DESC' in query
+
+    received = []
+    url = '/api/recipes/feed/?limit=2'
+    while url:
+        page = client.get(url).json()
+        received.extend(recipe['id'] for recipe in page['results'])
+        url = page['next']
+    assert received == recipe_ids[::-1]
@@ -0,0 +1,37 @@
+import pytest
+from django.core.files.storage import default_storage
+
+from recipes.models import Recipe, StoredImage
+
+pytestmark = pytest.mark.django_db
+
+
+def test_pending_delete_keeps_file_reused_by_new_upload(
+    make_recipe,
+    django_capture_on_commit_callbacks,
+) -> None:
+    recipe = Recipe.objects.get(id=make_recipe()['id'])
+    image_name = recipe.image.name
+    with django_capture_on_commit_callbacks() as callbacks:
+        recipe.delete()
+    assert StoredImage.objects.get(name=image_name).references == 0
+
+    reused = Recipe.objects.get(id=make_recipe()['id'])
+    assert reused.image.name == image_name
+    for callback in callbacks:
+        callback()
+    assert default_storage.exists(image_name)
+    assert StoredImage.objects.get(name=image_name).references == 1
+
+    with django_capture_on_commit_callbacks(execute=True):
+        reused.delete()
+    assert not default_storage.exists(image_name)
+    assert not StoredImage.objects.filter(name=image_name).exists()
+
+
+def test_saving_other_fields_does_not_touch_references(make_recipe) -> None:
+    recipe = Recipe.objects.get(id=make_recipe()['id'])
+    recipe.name = 'Новое название'
+    recipe.save()
+    Recipe.objects.only('id').get(id=recipe.id).save()
+    assert StoredImage.objects.get(name=recipe.image.name).references == 1
@@ -0,0 +1,71 @@
+import base64
+import io
+import os
+import textwrap
+import threading
+import tracemalloc
+
+import pytest
+from PIL import Image
+from rest_framework.exceptions import ValidationError
+
+from core.fields import StreamingImageField
+
+CONCURRENT_UPLOADS = 4
+
+
+def make_png(size: tuple) -> bytes:
+    buffer = io.BytesIO()
+    Image.frombytes('RGB', size, os.urandom(size[0] * size[1] * 3)).save(
+        buffer,
+        'PNG',
+    )
+    return buffer.getvalue()
+
+
+def encode(content: bytes, separator: str = '\n') -> str:
+    encoded = base64.b64encode(content).decode()
+    wrapped = separator.join(textwrap.wrap(encoded, 76))
+    return f'data:image/png;base64,{wrapped}{separator}'
+
+
+@pytest.mark.parametrize('separator', ['', '\n', '\r\n'])
+def test_line_wrapped_base64_is_decoded(separator) -> None:
+    content = make_png((300, 200))
+    file = StreamingImageField().to_internal_value(encode(content, separator))
+    assert file.size == len(content)
+    assert file.read() == content
+
+
+def test_incomplete_base64_is_rejected() -> None:
+    with pytest.raises(ValidationError):
+        StreamingImageField().to_internal_value(
+            encode(make_png((10, 10)))[:-3],
+        )
+
+
+def test_concurrent_uploads_peak_memory() -> None:
+    content = make_png((600, 600))
+    payload = encode(content)
+    errors = []
+
+    def upload() -> None:
+        try:
+            StreamingImageField().to_internal_value(payload).close()
+        except Exception as error:
+            errors.append(error)
+
+    threads = [
+        threading.Thread(target=upload) for _ in range(CONCURRENT_UPLOADS)
+    ]
+    tracemalloc.start()
+    try:
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    assert not errors
+    assert peak < len(content)
@@ -0,0 +1,78 @@
+import json
+
+import pytest
+from django.core.management import call_command
+
+from recipes.models import Ingredient, Tag
+
+pytestmark = pytest.mark.django_db
+
+
+def ingredient_rows() -> list:
+    return sorted(
+        Ingredient.objects.values_list(
+            'name',
+            'measurement_unit',
+            'search_name',
+        ),
+    )
+
+
+def test_ingredient_import_is_idempotent(tmp_path) -> None:
+    path = tmp_path / 'ingredients.csv'
+    path.write_text(
+        'Ёжевика,г\nмолоко,мл\nмолоко,мл\nмолоко,г\n',
+        encoding='utf-8',
+    )
+    for _ in range(2):
+        call_command('import_ingredients', path=str(path), batch_size=2)
+    assert ingredient_rows() == [
+        ('Ёжевика', 'г', 'ежевика'),
+        ('молоко', 'г', 'молоко'),
+        ('молоко', 'мл', 'молоко'),
+    ]
+
+
+def test_ingredient_import_updates_units(tmp_path) -> None:
+    salt = Ingredient.objects.create(name='соль', measurement_unit='кг')
+    Ingredient.objects.create(name='сахар', measurement_unit='г')
+    Ingredient.objects.create(name='сахар', measurement_unit='кг')
+    path = tmp_path / 'ingredients.json'
+    path.write_text(
+        json.dumps(
+            [
+                {'name': 'соль', 'measurement_unit': 'г'},
+                {'name': 'сахар', 'measurement_unit': 'ст. л.'},
+            ],
+            ensure_ascii=False,
+        ),
+        encoding='utf-8',
+    )
+    call_command('import_ingredients', path=str(path), update_units=True)
+    assert [row[:2] for row in ingredient_rows()] == [
+        ('сахар', 'г'),
+        ('сахар', 'кг'),
+        ('сахар', 'ст. л.'),
+        ('соль', 'г'),
+    ]
+
+    call_command('import_ingredients', path=str(path))
+    assert len(ingredient_rows()) == 4
+    salt.refresh_from_db()
+    assert salt.measurement_unit == 'г'
+
+
+def test_tag_import_is_idempotent(tmp_path) -> None:
+    path = tmp_path / 'tags.csv'
+    path.write_text(
+        'Завтрак,#E26C2D,breakfast\nОбед,#49B64E,lunch\n',
+        encoding='utf-8',
+    )
+    for _ in range(2):
+        call_command('import_tags', path=str(path))
+    assert list(
+        Tag.objects.order_by('slug').values_list('slug', flat=True)
+    ) == [
+        'breakfast',
+        'lunch',
+    ]
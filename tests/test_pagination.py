@@ -0,0 +1,94 @@
+from datetime import timedelta
+from typing import List, Optional
+
+import pytest
+from django.utils import timezone
+
+from recipes.models import Recipe
+
+pytestmark = pytest.mark.django_db
+
+RECIPE_COUNT = 30
+
+
+def create_recipes(user, per_minute: int) -> None:
+    Recipe.objects.bulk_create(
+        Recipe(
+            author=user,
+            name='Рецепт',
+            text='Описание',
+            cooking_time=5,
+            image='recipes/images/image.png',
+        )
+        for _ in range(RECIPE_COUNT)
+    )
+    now = timezone.now()
+    for position, recipe_id in enumerate(
+        Recipe.objects.order_by('id').values_list('id', flat=True),
+    ):
+        Recipe.objects.filter(id=recipe_id).update(
+            created=now - timedelta(minutes=position // per_minute),
+        )
+
+
+def get_page(client, url: str) -> dict:
+    response = client.get(url)
+    assert response.status_code == 200
+    return response.json()
+
+
+def walk_cursor(client, limit: int) -> List[List[int]]:
+    pages = []
+    url: Optional[str] = f'/api/recipes/?cursor=&limit={limit}'
+    while url:
+        page = get_page(client, url)
+        pages.append([recipe['id'] for recipe in page['results']])
+        url = page['next']
+    return pages
+
+
+def test_cursor_breaks_ties_by_id(client, user) -> None:
+    create_recipes(user, 3)
+    pages = walk_cursor(client, 2)
+    ids = [recipe_id for page in pages for recipe_id in page]
+    expected = [
+        recipe.id
+        for recipe in sorted(
+            Recipe.objects.all(),
+            key=lambda recipe: (recipe.created, recipe.id),
+            reverse=True,
+        )
+    ]
+    assert ids == expected
+    assert any(
+        Recipe.objects.get(id=page[-1]).created
+        == Recipe.objects.get(id=next_page[0]).created
+        for page, next_page in zip(pages, pages[1:])
+    )
+
+
+def test_deep_cursor_page_has_constant_queries(
+    client,
+    user,
+    django_assert_num_queries,
+) -> None:
+    create_recipes(user, 1)
+    first_url = '/api/recipes/?cursor=&limit=2'
+    url = get_page(client, first_url)['next']
+    for _ in range(RECIPE_COUNT // 2 - 2):
+        url = get_page(client, url)['next']
+
+    with django_assert_num_queries(5) as first:
+        get_page(client, first_url)
+    with django_assert_num_queries(5) as deep:
+        page = get_page(client, url)
+    assert page['next'] is None
+    for captured in (first, deep):
+        assert not any(
+            ' OFFSET ' in query['sql'] or '__count' in query['sql']
+            for query in captured.captured_queries
+        )
+
+    with django_assert_num_queries(6) as numbered:
+        get_page(client, f'/api/recipes/?page={RECIPE_COUNT // 2}&limit=2')
+    assert any('OFFSET' in query['sql'] for query in numbered.captured_queries)
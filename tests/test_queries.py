@@ -0,0 +1,25 @@
+import pytest
+
+pytestmark = pytest.mark.django_db
+
+RECIPE_LIST_QUERIES = 6
+
+
+def test_recipe_list_query_budget(
+    client,
+    make_recipe,
+    django_assert_num_queries,
+) -> None:
+    for _ in range(2):
+        make_recipe()
+    with django_assert_num_queries(RECIPE_LIST_QUERIES):
+        response = client.get('/api/recipes/?limit=2')
+    assert response.status_code == 200
+    assert len(response.json()['results']) == 2
+
+    for _ in range(8):
+        make_recipe()
+    with django_assert_num_queries(RECIPE_LIST_QUERIES):
+        response = client.get('/api/recipes/?limit=10')
+    assert response.status_code == 200
+    assert len(response.json()['results']) == 10
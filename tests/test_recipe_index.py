@@ -0,0 +1,76 @@
+import pytest
+
+from recipes import index
+from recipes.models import Ingredient
+
+pytestmark = pytest.mark.django_db(transaction=True)
+
+
+def get_ids(client, query: str) -> set:
+    response = client.get(f'/api/recipes/?limit=100&{query}')
+    assert response.status_code == 200
+    return {recipe['id'] for recipe in response.json()['results']}
+
+
+def test_index_is_updated_incrementally(
+    client,
+    make_recipe,
+    ingredients,
+    monkeypatch,
+) -> None:
+    first = make_recipe(3)['id']
+    second = make_recipe(5)['id']
+    query = f'ingredients={ingredients[4].id}'
+    assert get_ids(client, query) == {second}
+
+    def fail() -> None:
+        raise AssertionError('Индекс построен заново')
+
+    monkeypatch.setattr(index._recipe_index, 'load', fail)
+    response = client.patch(
+        f'/api/recipes/{first}/',
+        {
+            'ingredients': [
+                {'id': ingredients[0].id, 'amount': 1},
+                {'id': ingredients[4].id, 'amount': 1},
+            ],
+        },
+        format='json',
+    )
+    assert response.status_code == 200
+    assert get_ids(client, query) == {first, second}
+    assert get_ids(client, f'exclude_ingredients={ingredients[1].id}') == {
+        first,
+    }
+
+    Ingredient.objects.filter(id=ingredients[4].id).delete()
+    assert get_ids(client, query) == set()
+    assert client.delete(f'/api/recipes/{second}/').status_code == 204
+    assert get_ids(client, f'pantry={ingredients[0].id}') == {
+        first,
+    }
+
+
+@pytest.mark.parametrize(
+    'query',
+    [
+        'ingredients={0},{1}',
+        'exclude_ingredients={3}',
+        'pantry={0},{1},{2}',
+        'pantry={0}&max_missing=2',
+    ],
+)
+def test_large_results_use_subquery(
+    client,
+    make_recipe,
+    ingredients,
+    monkeypatch,
+    query,
+) -> None:
+    for count in (2, 3, 5):
+        make_recipe(count)
+    query = query.format(*(ingredient.id for ingredient in ingredients))
+    expected = get_ids(client, query)
+    assert expected
+    monkeypatch.setattr('api.v1.filters.INGREDIENT_FILTER_ID_LIMIT', 0)
+    assert get_ids(client, query) == expected
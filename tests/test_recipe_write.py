@@ -0,0 +1,71 @@
+import pytest
+
+pytestmark = pytest.mark.django_db
+
+RECIPE_CREATE_QUERIES = 26
+
+RECIPE_UPDATE_QUERIES = 15
+
+
+@pytest.mark.parametrize('count', [1, 50])
+def test_recipe_update_query_budget(
+    client,
+    make_recipe,
+    recipe_data,
+    django_assert_num_queries,
+    count,
+) -> None:
+    recipe_id = make_recipe(count=count)['id']
+    data = recipe_data(count, text='Исправленное описание')
+    del data['image']
+    for item in data['ingredients']:
+        item['amount'] += 1
+    with django_assert_num_queries(RECIPE_UPDATE_QUERIES):
+        response = client.patch(
+            f'/api/recipes/{recipe_id}/',
+            data,
+            format='json',
+        )
+    assert response.status_code == 200
+    assert [item['amount'] for item in response.json()['ingredients']] == [
+        item['amount'] for item in data['ingredients']
+    ]
+
+
+@pytest.mark.parametrize('count, tag_count', [(1, 1), (50, 3)])
+def test_recipe_create_query_budget(
+    client,
+    tags,
+    recipe_data,
+    django_assert_num_queries,
+    count,
+    tag_count,
+) -> None:
+    client.get('/api/tags/')
+    data = recipe_data(count, tags=[tag.id for tag in tags[:tag_count]])
+    with django_assert_num_queries(RECIPE_CREATE_QUERIES):
+        response = client.post('/api/recipes/', data, format='json')
+    assert response.status_code == 201, response.content
+    assert len(response.json()['ingredients']) == count
+    assert len(response.json()['tags']) == tag_count
+
+
+def test_unknown_ingredients_are_reported_together(
+    client,
+    recipe_data,
+    django_assert_max_num_queries,
+) -> None:
+    data = recipe_data(2)
+    data['ingredients'] += [
+        {'id': 999998, 'amount': 1},
+        {'id': 999999, 'amount': 1},
+    ]
+    data['tags'].append(999999)
+    client.get('/api/tags/')
+    with django_assert_max_num_queries(3):
+        response = client.post('/api/recipes/', data, format='json')
+    assert response.status_code == 400
+    assert response.json() == {
+        'ingredients': ['Ингредиенты не найдены: нет id 999998, 999999'],
+        'tags': ['Теги не найдены: нет id 999999'],
+    }
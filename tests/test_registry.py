@@ -0,0 +1,68 @@
+import pytest
+
+from recipes.models import Ingredient, Tag
+
+pytestmark = pytest.mark.django_db
+
+
+@pytest.fixture
+def stale_registry(client, tags, ingredients) -> None:
+    assert client.get('/api/ingredients/').status_code == 200
+    Ingredient.objects.create(name='Ёжевика', measurement_unit='г')
+    Tag.objects.create(name='Новый тег', color='#000000', slug='new')
+
+
+def test_retrieve_falls_back_to_database(client, stale_registry) -> None:
+    ingredient = Ingredient.objects.get(name='Ёжевика')
+    tag = Tag.objects.get(slug='new')
+    response = client.get(f'/api/ingredients/{ingredient.id}/')
+    assert response.status_code == 200
+    assert response.json() == {
+        'id': ingredient.id,
+        'name': 'Ёжевика',
+        'measurement_unit': 'г',
+    }
+    response = client.get(f'/api/tags/{tag.id}/')
+    assert response.status_code == 200
+    assert response.json()['slug'] == 'new'
+    assert client.get('/api/ingredients/999999/').status_code == 404
+    assert client.get('/api/tags/999999/').status_code == 404
+
+
+def test_recipe_accepts_new_reference_objects(
+    client,
+    recipe_data,
+    stale_registry,
+) -> None:
+    ingredient = Ingredient.objects.get(name='Ёжевика')
+    tag = Tag.objects.get(slug='new')
+    data = recipe_data(
+        2,
+        tags=[tag.id],
+        ingredients=[{'id': ingredient.id, 'amount': 5}],
+    )
+    response = client.post('/api/recipes/', data, format='json')
+    assert response.status_code == 201, response.content
+    data['ingredients'].append({'id': 999999, 'amount': 5})
+    response = client.post('/api/recipes/', data, format='json')
+    assert response.status_code == 400
+    assert '999999' in response.json()['ingredients'][0]
+
+
+def test_memory_search_uses_registry_only(
+    client,
+    settings,
+    ingredients,
+    django_assert_num_queries,
+    django_capture_on_commit_callbacks,
+) -> None:
+    settings.INGREDIENT_SEARCH_BACKEND = 'memory'
+    settings.VERSION_CHECK_INTERVAL = 60
+    assert client.get('/api/ingredients/?name=еже').json() == []
+    with django_capture_on_commit_callbacks(execute=True):
+        Ingredient.objects.create(name='Ёжевика', measurement_unit='г')
+    response = client.get('/api/ingredients/?name=еже')
+    assert [item['name'] for item in response.json()] == ['Ёжевика']
+    with django_assert_num_queries(0):
+        response = client.get('/api/ingredients/?name=ежев')
+    assert [item['name'] for item in response.json()] == ['Ёжевика']
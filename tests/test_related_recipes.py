@@ -0,0 +1,102 @@
+import io
+
+import pytest
+from django.core.management import call_command
+
+from recipes.models import Favorite
+
+pytestmark = pytest.mark.django_db
+
+
+@pytest.mark.parametrize('action', ['similar', 'recommendations'])
+def test_related_recipes_of_missing_recipe(client, action) -> None:
+    assert client.get(f'/api/recipes/999/{action}/').status_code == 404
+
+
+@pytest.mark.parametrize('action', ['similar', 'recommendations'])
+def test_related_recipes_of_existing_recipe(
+    client,
+    make_recipe,
+    action,
+) -> None:
+    recipe_id = make_recipe()['id']
+    response = client.get(f'/api/recipes/{recipe_id}/{action}/')
+    assert response.status_code == 200
+    assert response.json() == []
+
+
+def ingredient_items(ingredients, indexes) -> list:
+    return [{'id': ingredients[index].id, 'amount': 1} for index in indexes]
+
+
+def test_similar_recipes_follow_ingredient_changes(
+    client,
+    make_recipe,
+    ingredients,
+) -> None:
+    base = make_recipe(
+        ingredients=ingredient_items(ingredients, range(10)),
+    )['id']
+    close = make_recipe(
+        ingredients=ingredient_items(ingredients, [*range(9), 20]),
+    )['id']
+    far = make_recipe(
+        ingredients=ingredient_items(ingredients, [0, 1, *range(30, 38)]),
+    )['id']
+    unrelated = make_recipe(
+        ingredients=ingredient_items(ingredients, range(40, 50)),
+    )['id']
+
+    similar = [
+        recipe['id']
+        for recipe in client.get(f'/api/recipes/{base}/similar/').json()
+    ]
+    assert similar[0] == close
+    assert unrelated not in similar
+    if far in similar:
+        assert similar.index(far) > similar.index(close)
+
+    response = client.patch(
+        f'/api/recipes/{far}/',
+        {'ingredients': ingredient_items(ingredients, range(10))},
+        format='json',
+    )
+    assert response.status_code == 200
+    similar = [
+        recipe['id']
+        for recipe in client.get(f'/api/recipes/{base}/similar/').json()
+    ]
+    assert similar == [far, close]
+
+
+def test_recommendations_follow_co_favorites(
+    client,
+    user,
+    other_user,
+    django_user_model,
+    make_recipe,
+) -> None:
+    first, second, third, fourth = (make_recipe()['id'] for _ in range(4))
+    third_user = django_user_model.objects.create_user(
+        email='critic@foodgram.ru',
+        username='critic',
+        first_name='Критик',
+        last_name='Критиков',
+        password='Secret12345!',
+    )
+    for favorite_user, recipe_ids in (
+        (user, [first, second]),
+        (other_user, [first, second, third]),
+        (third_user, [third, fourth]),
+    ):
+        Favorite.objects.bulk_create(
+            Favorite(user=favorite_user, recipe_id=recipe_id)
+            for recipe_id in recipe_ids
+        )
+    for _ in range(2):
+        call_command('recommend_recipes', stdout=io.StringIO())
+        response = client.get(f'/api/recipes/{first}/recommendations/')
+        assert [recipe['id'] for recipe in response.json()] == [
+            second,
+            third,
+        ]
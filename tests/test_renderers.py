@@ -0,0 +1,71 @@
+import re
+
+import pytest
+from reportlab.lib.pagesizes import A4
+from reportlab.pdfbase.pdfmetrics import stringWidth
+from reportlab.pdfgen.canvas import Canvas
+from rest_framework.test import APIClient
+
+from core.constants import SHOPPING_FILE_MARGIN, SHOPPING_FONT_NAME
+from recipes.models import CartIngredient
+
+pytestmark = pytest.mark.django_db
+
+
+@pytest.mark.parametrize('file_format', ['pdf', 'txt', 'csv'])
+def test_file_errors_are_rendered_as_json(file_format) -> None:
+    response = APIClient().get(
+        f'/api/recipes/download_shopping_cart/?format={file_format}',
+    )
+    assert response.status_code == 401
+    assert response['Content-Type'] == 'application/json'
+    assert 'detail' in response.json()
+
+
+@pytest.fixture
+def long_cart(user, ingredients) -> None:
+    for ingredient in ingredients:
+        ingredient.name = f'{ingredient.name} ' + 'очень длинное название ' * 5
+        ingredient.save()
+        CartIngredient.objects.create(
+            user=user,
+            ingredient=ingredient,
+            amount=100,
+        )
+    user.refresh_from_db()
+
+
+def test_long_shopping_list_is_wrapped_onto_pages(
+    client,
+    long_cart,
+    monkeypatch,
+) -> None:
+    lines = []
+    draw_string = Canvas.drawString
+
+    def record_line(canvas, x, y, text, *args, **kwargs):
+        lines.append((x, y, text))
+        return draw_string(canvas, x, y, text, *args, **kwargs)
+
+    monkeypatch.setattr(Canvas, 'drawString', record_line)
+    response = client.get('/api/recipes/download_shopping_cart/?format=pdf')
+    assert response.status_code == 200
+    content = b''.join(response.streaming_content)
+    page_count = len(re.findall(rb'/Type /Page\b(?!s)', content))
+    assert page_count > 1
+
+    max_width = A4[0] - SHOPPING_FILE_MARGIN
+    item_lines = lines[1:]
+    assert len(item_lines) > len(CartIngredient.objects.all())
+    for x, y, text in item_lines:
+        assert y >= SHOPPING_FILE_MARGIN
+        assert x + stringWidth(text, SHOPPING_FONT_NAME, 16) <= max_width
+
+
+def test_matching_etag_returns_not_modified(client, long_cart) -> None:
+    url = '/api/recipes/download_shopping_cart/?format=pdf'
+    response = client.get(url)
+    assert response.status_code == 200
+    response = client.get(url, HTTP_IF_NONE_MATCH=response['ETag'])
+    assert response.status_code == 304
+    assert not response.content
@@ -0,0 +1,151 @@
+import re
+
+import pytest
+from django.db import connection
+from django.db.migrations.executor import MigrationExecutor
+from django.http import QueryDict
+from django.test import RequestFactory
+
+from api.v1.filters import RecipeFilterSet
+from recipes.models import Recipe
+
+
+def migrate(target: str):
+    targets = [
+        ('recipes', target),
+        ('users', '0003_shopping_cart_version'),
+    ]
+    executor = MigrationExecutor(connection)
+    executor.migrate(targets)
+    executor.loader.build_graph()
+    return executor.loader.project_state(targets).apps
+
+
+@pytest.mark.django_db(transaction=True)
+def test_migration_rebuilds_carts_and_counters() -> None:
+    apps = migrate('0012_similarity_bucket')
+    User = apps.get_model('users', 'User')
+    Recipe = apps.get_model('recipes', 'Recipe')
+    Ingredient = apps.get_model('recipes', 'Ingredient')
+    RecipeIngredient = apps.get_model('recipes', 'RecipeIngredient')
+    Favorite = apps.get_model('recipes', 'Favorite')
+    Purchase = apps.get_model('recipes', 'Purchase')
+    CartIngredient = apps.get_model('recipes', 'CartIngredient')
+    user = User.objects.create(
+        email='cook@foodgram.ru',
+        username='cook',
+        first_name='Повар',
+        last_name='Поваров',
+    )
+    ingredient = Ingredient.objects.create(name='Соль', measurement_unit='г')
+    recipe = Recipe.objects.create(
+        author=user,
+        name='Рецепт',
+        text='Описание',
+        cooking_time=5,
+        image='recipes/images/image.png',
+    )
+    RecipeIngredient.objects.create(
+        recipe=recipe,
+        ingredient=ingredient,
+        amount=10,
+    )
+    for _ in range(2):
+        Favorite.objects.create(user=user, recipe=recipe)
+        Purchase.objects.create(user=user, recipe=recipe)
+    CartIngredient.objects.create(user=user, ingredient=ingredient, amount=20)
+    Recipe.objects.update(favorites_count=2, in_carts_count=2)
+
+    apps = migrate('0013_user_recipe_indexes')
+    recipe = apps.get_model('recipes', 'Recipe').objects.get()
+    assert (recipe.favorites_count, recipe.in_carts_count) == (1, 1)
+    assert list(
+        apps.get_model('recipes', 'CartIngredient').objects.values_list(
+            'amount',
+            flat=True,
+        ),
+    ) == [10]
+    user = apps.get_model('users', 'User').objects.get()
+    assert user.shopping_cart_version == 1
+    executor = MigrationExecutor(connection)
+    executor.migrate(executor.loader.graph.leaf_nodes())
+
+
+def get_plan(user, query: str) -> str:
+    request = RequestFactory().get('/api/recipes/')
+    request.user = user
+    queryset = RecipeFilterSet(
+        data=QueryDict(query),
+        queryset=Recipe.objects.all(),
+        request=request,
+    ).qs
+    with connection.cursor() as cursor:
+        if connection.vendor == 'postgresql':
+            cursor.execute('SET enable_seqscan = off')
+        plan = queryset.explain()
+        if connection.vendor == 'postgresql':
+            cursor.execute('RESET enable_seqscan')
+    return plan
+
+
+@pytest.mark.django_db
+@pytest.mark.parametrize(
+    'field, table',
+    [
+        ('is_favorited', 'recipes_favorite'),
+        ('is_in_shopping_cart', 'recipes_purchase'),
+    ],
+)
+def test_user_recipe_filters_use_index(user, field, table) -> None:
+    plan = get_plan(user, f'{field}=1')
+    index_name = f'{table.split("_")[-1]}_user_recipe_idx'
+    if connection.vendor == 'sqlite':
+        assert f'SEARCH {table} USING COVERING INDEX {index_name}' in plan
+    else:
+        assert index_name in plan
+
+
+@pytest.mark.django_db
+@pytest.mark.parametrize(
+    'field, table',
+    [
+        ('is_favorited', 'recipes_favorite'),
+        ('is_in_shopping_cart', 'recipes_purchase'),
+    ],
+)
+def test_negated_user_recipe_filters_use_index(user, field, table) -> None:
+    plan = get_plan(user, f'{field}=0')
+    if connection.vendor == 'sqlite':
+        assert re.search(
+            r'SEARCH \w+ USING COVERING INDEX \w+ '
+            r'\((recipe_id=\? AND user_id=\?|user_id=\? AND recipe_id=\?)\)',
+            plan,
+        )
+    else:
+        assert f'Seq Scan on {table}' not in plan
+
+
+@pytest.mark.django_db
+def test_tag_filter_uses_index_without_duplicates(
+    client,
+    user,
+    tags,
+    make_recipe,
+) -> None:
+    plan = get_plan(user, f'tags={tags[0].slug}&tags={tags[1].slug}')
+    if connection.vendor == 'sqlite':
+        assert re.search(
+            r'SEARCH \w+ USING COVERING INDEX recipe_tag_tag_recipe_idx '
+            r'\(tag_id=\?\)',
+            plan,
+        )
+    else:
+        assert 'recipe_tag_tag_recipe_idx' in plan
+
+    recipe_id = make_recipe()['id']
+    response = client.get(
+        f'/api/recipes/?tags={tags[0].slug}&tags={tags[1].slug}',
+    )
+    assert [recipe['id'] for recipe in response.json()['results']] == [
+        recipe_id,
+    ]
@@ -0,0 +1,24 @@
+import pytest
+from django.db.models import F
+
+from core.models import DataVersion
+from core.versions import bump_version, get_version
+
+pytestmark = pytest.mark.django_db
+
+
+def test_version_changes_from_other_processes_are_visible() -> None:
+    version = get_version('test')
+    DataVersion.objects.filter(name='test').update(version=F('version') + 1)
+    assert get_version('test') == version + 1
+
+
+def test_version_checks_are_throttled(settings) -> None:
+    settings.VERSION_CHECK_INTERVAL = 60
+    version = get_version('throttled')
+    DataVersion.objects.filter(name='throttled').update(
+        version=F('version') + 1,
+    )
+    assert get_version('throttled') == version
+    bump_version('throttled')
+    assert get_version('throttled') == version + 2